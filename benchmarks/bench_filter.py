@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for --where filters on metadata bitmaps.
+
+Builds the bitmap index over synthetic entry records, times saving it to
+and loading it from a temporary cache directory (what a cold search.py run
+pays), then times parsing plus bitmap evaluation of filters of increasing
+complexity and decoding the result to entry ids.
+
+Usage:
+    python benchmarks/bench_filter.py                 # 100k entries
+    python benchmarks/bench_filter.py --count 10000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from bitmap_index import bitmap_ids, build_bitmaps, evaluate, load_bitmaps, parse_filter, save_bitmaps
+
+TAGS = [f"tag{i}" for i in range(2000)] + ["edfa", "kafka", "netconf", "telemetry", "ml"]
+DOMAINS = ["optical-networking", "software-engineering", "ml-ai", "devops", "research-methods", "general"]
+TYPES = ["pattern", "decision", "domain", "integration", "debugging", "tool", "research"]
+CONFIDENCE = ["low", "medium", "high"]
+
+QUERIES = [
+    "tag:edfa",
+    "tag:edfa AND domain:devops",
+    "tag:edfa AND (tag:kafka OR domain:devops) NOT confidence:low",
+    "(tag:edfa OR tag:kafka OR tag:netconf) AND NOT (type:tool OR type:research) AND confidence:high",
+]
+
+
+def synthetic_records(count: int, seed: int):
+    """Yield cache-style records with random metadata."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield {"frontmatter": {
+            "tags": rng.sample(TAGS, rng.randint(2, 7)),
+            "domain": rng.choice(DOMAINS),
+            "type": rng.choice(TYPES),
+            "confidence": rng.choice(CONFIDENCE),
+        }}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark bitmap --where filters.")
+    parser.add_argument("--count", type=int, default=100_000, help="Synthetic entries (default: 100000)")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed runs per query (default: 200)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    records = list(synthetic_records(args.count, args.seed))
+    start = time.perf_counter()
+    index = build_bitmaps(records)
+    print(f"{args.count} entries, postings built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    with tempfile.TemporaryDirectory(prefix="kf_bench_filter_") as tmp:
+        start = time.perf_counter()
+        save_bitmaps(Path(tmp), index, "bench")
+        save_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        index = load_bitmaps(Path(tmp), "bench")
+        load_ms = (time.perf_counter() - start) * 1000
+    print(f"  saved in {save_ms:.1f} ms, loaded in {load_ms:.1f} ms")
+
+    for query in QUERIES:
+        ast = parse_filter(query)
+        evaluate(index, ast)  # memoize the bitmaps used, as a warm process would
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            bitmap = evaluate(index, parse_filter(query))
+        eval_us = (time.perf_counter() - start) / args.repeat * 1e6
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            ids = bitmap_ids(bitmap)
+        decode_us = (time.perf_counter() - start) / args.repeat * 1e6
+        print(f"  {len(ids):>6} hits  parse+eval {eval_us:8.1f} us  decode {decode_us:8.1f} us  {query}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Benchmark near-duplicate tag detection in lint_tags.py.
+
+Generates a synthetic tag vocabulary (multi-word kebab-case tags with
+plurals, typos and shared prefixes, like a corpus written by many people)
+and times find_near_duplicates at each size. Up to --verify-max tags the
+result is also compared with the all-pairs reference, which is quadratic.
+
+Usage:
+    python benchmarks/bench_lint_tags.py                  # 1k, 10k and 50k tags
+    python benchmarks/bench_lint_tags.py --counts 2000 --verify-max 2000
+"""
+
+import argparse
+import difflib
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from lint_tags import NEAR_DUP_RATIO, find_near_duplicates
+
+WORDS = ["optical", "network", "kafka", "agent", "multi", "edfa", "gain", "power", "yang", "netconf",
+         "digital", "twin", "latex", "paper", "retry", "queue", "docker", "deploy", "test", "mock",
+         "python", "async", "cache", "index", "search", "model", "train", "vector", "embed", "graph",
+         "topology", "ring", "mesh", "amplifier", "telemetry", "stream", "batch", "schema", "config", "ci"]
+CONSONANTS = "bcdfghjklmnpqrstvwxz"
+VOWELS = "aeiouy"
+
+
+def vocabulary(size: int, rng: random.Random) -> List[str]:
+    """Return WORDS plus pronounceable pseudo-words, `size` in total."""
+    words = list(WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4)))
+        if rng.random() < 0.5:
+            word += rng.choice(CONSONANTS)
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def synthetic_tags(count: int, seed: int) -> Set[str]:
+    """Return `count` distinct tags, about a fifth of them variants of others.
+
+    Tags join one to three words from a vocabulary that grows with count,
+    as it would with more people writing entries.
+    """
+    rng = random.Random(seed)
+    words = vocabulary(max(len(WORDS), count // 10), rng)
+    tags: List[str] = []
+    seen: Set[str] = set()
+    while len(tags) < count:
+        if tags and rng.random() < 0.2:
+            tag = rng.choice(tags)
+            kind = rng.randrange(3)
+            if kind == 0:
+                tag += "s"
+            elif kind == 1 and len(tag) > 4:
+                i = rng.randrange(len(tag) - 1)
+                tag = tag[:i] + tag[i + 1] + tag[i] + tag[i + 2:]
+            else:
+                tag += "-" + rng.choice(words)
+        else:
+            tag = "-".join(rng.choice(words) for _ in range(rng.choice((1, 2, 2, 3))))
+        if tag not in seen:
+            seen.add(tag)
+            tags.append(tag)
+    return seen
+
+
+def all_pairs_near_duplicates(all_tags: Set[str]) -> List[Tuple[str, str, str]]:
+    """Reference: check every pair, as lint_tags.py used to."""
+    tag_list = sorted(all_tags)
+    pairs = []
+    for i, a in enumerate(tag_list):
+        for b in tag_list[i + 1:]:
+            if a + "s" == b or b + "s" == a:
+                reason = "plural/singular"
+            elif len(a) >= 3 and len(b) >= 3 and (a in b or b in a):
+                reason = "substring"
+            else:
+                ratio = difflib.SequenceMatcher(None, a, b).ratio()
+                if ratio < NEAR_DUP_RATIO:
+                    continue
+                reason = f"similar (ratio={ratio:.2f})"
+            pairs.append((a, b, reason))
+    return pairs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate tag detection.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10_000, 50_000],
+                        help="Tag counts to test (default: 1000 10000 50000)")
+    parser.add_argument("--verify-max", type=int, default=1000,
+                        help="Compare with the all-pairs reference up to this many tags (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    for count in args.counts:
+        tags = synthetic_tags(count, args.seed)
+        start = time.perf_counter()
+        pairs = find_near_duplicates(tags)
+        elapsed = time.perf_counter() - start
+        line = f"{count:>7} tags  {elapsed:8.2f} s  {len(pairs):>7} pairs"
+
+        if count <= args.verify_max:
+            start = time.perf_counter()
+            reference = all_pairs_near_duplicates(tags)
+            reference_time = time.perf_counter() - start
+            identical = "identical" if pairs == reference else "DIFFERENT"
+            line += f"  all-pairs {reference_time:8.2f} s  {identical}"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for the shared entry parser.
+
+Generates synthetic entries in memory and reports the per-entry cost of
+parse_entry (single pass: frontmatter, sections, Problem summary, body) and
+of parse_frontmatter alone.
+
+Usage:
+    python benchmarks/bench_parse.py                    # 10k and 100k entries
+    python benchmarks/bench_parse.py --counts 1000 5000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from entry_parser import parse_entry, parse_frontmatter
+
+
+TAGS = ["edfa", "kafka", "netconf", "digital-twin", "optical", "ml", "telemetry",
+        "multi-agent", "latex", "ci-cd", "sdk", "topology", "debugging", "yang"]
+DOMAINS = ["optical-networking", "software-engineering", "ml-ai", "devops"]
+SECTIONS = ["Context", "Approach", "Key Decisions", "Pitfalls & Gotchas", "Recipe", "Verification"]
+
+
+def synthetic_entry(rng: random.Random, i: int) -> str:
+    """Return the text of one synthetic standard entry."""
+    tags = ", ".join(rng.sample(TAGS, rng.randint(2, 6)))
+    lines = [
+        "---",
+        f'title: "Synthetic entry {i}"',
+        "type: pattern",
+        f"tags: [{tags}]",
+        f"domain: {rng.choice(DOMAINS)}",
+        "created: 2026-01-01",
+        "confidence: medium  # synthetic",
+        "---",
+        "",
+        f"# Synthetic entry {i}",
+        "",
+        "## Problem",
+        "",
+        "A synthetic problem statement that is long enough to need truncation in the index table.",
+        "",
+    ]
+    for section in SECTIONS:
+        lines.append(f"## {section}")
+        lines.append("")
+        for _ in range(rng.randint(3, 12)):
+            lines.append("Body text " * rng.randint(4, 12))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def bench(label: str, fn: Callable[[str], object], texts: List[str]) -> None:
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    elapsed = time.perf_counter() - start
+    per_entry_us = elapsed / len(texts) * 1e6
+    print(f"  {label:<20} {elapsed:8.3f} s total  {per_entry_us:8.2f} us/entry")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the shared entry parser.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10_000, 100_000],
+                        help="Synthetic corpus sizes to benchmark (default: 10000 100000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for count in args.counts:
+        texts = [synthetic_entry(rng, i) for i in range(count)]
+        avg_kb = sum(len(t) for t in texts) / count / 1024
+        print(f"{count} entries (avg {avg_kb:.1f} KiB)")
+        bench("parse_frontmatter", parse_frontmatter, texts)
+        bench("parse_entry", parse_entry, texts)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
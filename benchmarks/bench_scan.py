@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark cold entry scans on one core versus a process pool.
+
+Writes a synthetic entries/ tree to a temporary directory, then times a
+cold scan (cache bypassed, every file read and parsed) with each --jobs
+value. It also checks that every run yields the same records and a
+byte-identical index (index.md and its shards) and tags.md.
+
+Usage:
+    python benchmarks/bench_scan.py                      # 200k entries, jobs 1 and CPU count
+    python benchmarks/bench_scan.py --count 20000 --jobs 1 2 4
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from bench_parse import synthetic_entry
+from entry_cache import DEFAULT_JOBS, scan
+from rebuild_index import generate_index, generate_tags, scan_entries
+
+CATEGORIES = ["patterns", "decisions", "domain", "integrations", "debugging", "tools", "research"]
+
+
+def write_tree(root: Path, count: int, seed: int) -> None:
+    """Write `count` synthetic entries spread over the category folders."""
+    rng = random.Random(seed)
+    for category in CATEGORIES:
+        (root / "entries" / category).mkdir(parents=True)
+    for i in range(count):
+        path = root / "entries" / CATEGORIES[i % len(CATEGORIES)] / f"entry_{i:06d}.md"
+        path.write_text(synthetic_entry(rng, i), encoding="utf-8")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark serial vs parallel cold scans.")
+    parser.add_argument("--count", type=int, default=200_000, help="Synthetic entries (default: 200000)")
+    parser.add_argument("--jobs", type=int, nargs="+", default=sorted({1, DEFAULT_JOBS}),
+                        help=f"Worker counts to compare (default: 1 and CPU count, {DEFAULT_JOBS})")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    os.environ["KF_NO_CACHE"] = "1"
+    with tempfile.TemporaryDirectory(prefix="kf_bench_scan_") as tmp:
+        root = Path(tmp)
+        start = time.perf_counter()
+        write_tree(root, args.count, args.seed)
+        print(f"{args.count} entries written in {time.perf_counter() - start:.1f} s")
+
+        baseline = None
+        serial_time = None
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            scanned = scan(root, jobs=jobs)
+            elapsed = time.perf_counter() - start
+
+            entries = scan_entries(root, scanned)
+            output = (generate_index(entries), generate_tags(entries))
+            if baseline is None:
+                baseline = output
+            identical = "identical" if output == baseline else "DIFFERENT"
+            if serial_time is None:
+                serial_time = elapsed
+            print(f"  jobs {jobs:>3}  {elapsed:8.2f} s  {elapsed / args.count * 1e6:7.1f} us/entry"
+                  f"  speedup {serial_time / elapsed:5.2f}x  index/tags {identical}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for BM25 ranking over the inverted index.
+
+Builds an in-memory index over synthetic entries whose terms follow a Zipf
+distribution, then times top-k queries for rare, mid-frequency and very
+common terms.
+
+Usage:
+    python benchmarks/bench_search.py                 # 100k entries
+    python benchmarks/bench_search.py --count 10000
+"""
+
+import argparse
+import random
+import sys
+import time
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from search_index import bm25_search, build_postings
+
+
+def synthetic_index(count: int, vocab_size: int, doc_terms: int, seed: int) -> Dict:
+    """Return an index dict over `count` synthetic entries of ~doc_terms terms."""
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(vocab_size)]
+    cum_weights = list(accumulate(1.0 / (i + 1) for i in range(vocab_size)))
+
+    term_docs: Dict[str, List[Tuple[int, float]]] = {}
+    lengths: List[float] = []
+    for doc_id in range(count):
+        length = rng.randint(doc_terms // 4, doc_terms * 2)
+        tfs: Dict[str, float] = {}
+        for term in rng.choices(vocab, cum_weights=cum_weights, k=length):
+            tfs[term] = tfs.get(term, 0.0) + 1.0
+        lengths.append(float(length))
+        for term, tf in tfs.items():
+            term_docs.setdefault(term, []).append((doc_id, tf))
+
+    return {
+        "paths": [f"entries/synthetic/e{i:06d}.md" for i in range(count)],
+        "postings": build_postings(term_docs, lengths),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark BM25 top-k search.")
+    parser.add_argument("--count", type=int, default=100_000, help="Synthetic entries (default: 100000)")
+    parser.add_argument("--limit", type=int, default=10, help="Top-k size (default: 10)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = synthetic_index(args.count, vocab_size=20_000, doc_terms=150, seed=args.seed)
+    print(f"{args.count} entries, {len(index['postings'])} terms "
+          f"(built in {time.perf_counter() - start:.1f} s)")
+
+    for query in ("w5000 w7000", "w50 w300", "w1 w2", "w1 w2 w3 w4"):
+        df = max(len(index["postings"][t][0]) for t in query.split())
+        for count_total in (False, True):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                bm25_search(index, query, limit=args.limit, count_total=count_total)
+            elapsed_ms = (time.perf_counter() - start) / args.repeat * 1000
+            label = "top-k + total" if count_total else "top-k"
+            print(f"  {query:<14} max df {df:>7}  {label:<14} {elapsed_ms:8.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark of the scripts on a synthetic corpus.
+
+Generates a corpus with corpus.py (in a temporary directory unless --root
+is given), then runs each command as a user would, in a fresh interpreter,
+and times it cold and warm:
+
+  cold  .kf_cache/ removed first, so every entry is parsed and every index
+        built (the OS page cache is not dropped)
+  warm  the same command again right after, with the cache in place
+
+Both are repeated --repeat times and the medians are reported.
+
+curate.py runs last because it moves drafts into entries/; each of its runs
+gets a fresh batch of --inbox drafts.
+
+Results are written as JSON (default: benchmarks/results/<commit>-<count>.json)
+together with the commit, the interpreter, the platform and the corpus
+options. --compare BASELINE compares the run with an earlier results file
+and exits with status 1 if any timing grew by more than --threshold (and by
+at least --min-delta seconds, to ignore noise on fast commands). Given two
+files, --compare only compares them.
+
+Usage:
+    python benchmarks/bench_suite.py                              # 10k entries
+    python benchmarks/bench_suite.py --count 100000 --repeat 5
+    python benchmarks/bench_suite.py --commands search validate --compare benchmarks/results/abc123-10000.json
+    python benchmarks/bench_suite.py --compare old.json new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from corpus import REPO_ROOT, add_corpus_arguments, corpus_options, generate_corpus, write_inbox
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+RESULTS_VERSION = 1
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+
+# (name, script and arguments), in run order; curate.py must stay last
+COMMANDS: List[Tuple[str, List[str]]] = [
+    ("rebuild_index", ["rebuild_index.py"]),
+    ("search", ["search.py", "--no-daemon", "--query", "amplifier telemetry"]),
+    ("stats", ["stats.py"]),
+    ("lint_tags", ["lint_tags.py"]),
+    ("validate", ["validate.py", "--all"]),
+    ("curate", ["curate.py"]),
+]
+COMMAND_NAMES = [name for name, _ in COMMANDS]
+
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+def run_command(root: Path, argv: List[str], jobs: Optional[int]) -> Tuple[float, int]:
+    """Run one script under root and return (wall seconds, exit status)."""
+    cmd = [sys.executable, str(root / "scripts" / argv[0]), *argv[1:]]
+    if jobs is not None:
+        cmd += ["--jobs", str(jobs)]
+    env = dict(os.environ)
+    env.pop("KF_NO_CACHE", None)
+    start = time.perf_counter()
+    completed = subprocess.run(cmd, cwd=root, env=env, stdin=subprocess.DEVNULL,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    # Failing entries make validate.py and lint_tags.py exit 1 by design
+    if completed.returncode > 1:
+        print(f"WARNING: {' '.join(argv)} exited {completed.returncode}: {completed.stderr.strip()[-500:]}",
+              file=sys.stderr)
+    return elapsed, completed.returncode
+
+
+def clear_cache(root: Path) -> None:
+    """Remove the metadata cache and every derived index under root."""
+    shutil.rmtree(root / ".kf_cache", ignore_errors=True)
+
+
+def run_suite(root: Path, corpus: Dict, names: List[str], repeat: int, jobs: Optional[int]) -> Dict[str, Dict]:
+    """Time each named command `repeat` times cold and warm; report medians."""
+    results: Dict[str, Dict] = {}
+    inbox_batch = 0
+    for name, argv in COMMANDS:
+        if name not in names:
+            continue
+        runs: Dict[str, List[float]] = {"cold": [], "warm": []}
+        status = 0
+        for _ in range(repeat):
+            for phase in ("cold", "warm"):
+                if phase == "cold":
+                    clear_cache(root)
+                if name == "curate" and (runs["cold"] or phase == "warm"):
+                    inbox_batch += 1
+                    write_inbox(root, corpus, corpus["spec"]["inbox"], inbox_batch)
+                elapsed, status = run_command(root, argv, jobs)
+                runs[phase].append(elapsed)
+        results[name] = {
+            "cold": round(statistics.median(runs["cold"]), 4),
+            "warm": round(statistics.median(runs["warm"]), 4),
+            "runs": {phase: [round(t, 4) for t in times] for phase, times in runs.items()},
+            "exit": status,
+        }
+        print(f"  {name:<14} cold {results[name]['cold']:8.3f} s  warm {results[name]['warm']:8.3f} s", flush=True)
+    return results
+
+
+def git_commit() -> Tuple[str, bool]:
+    """Return (HEAD commit of the repo, True if the working tree has changes)."""
+    def git(*args: str) -> str:
+        return subprocess.run(["git", "-C", str(REPO_ROOT), *args], check=True,
+                              capture_output=True, text=True).stdout.strip()
+    try:
+        return git("rev-parse", "HEAD"), bool(git("status", "--porcelain", "--untracked-files=no"))
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+# ---------------------------------------------------------------------------
+# Comparing
+# ---------------------------------------------------------------------------
+
+def compare(baseline: Dict, current: Dict, threshold: float, min_delta: float) -> int:
+    """Print per-command changes between two results files; return the regression count."""
+    if baseline.get("corpus") != current.get("corpus"):
+        print("WARNING: the results were measured on different corpora; timings are not comparable\n")
+    print(f"baseline {baseline.get('commit', 'unknown')[:12]}  current {current.get('commit', 'unknown')[:12]}")
+    print(f"  {'command':<14} {'phase':<5} {'baseline':>9} {'current':>9} {'change':>8}")
+    regressions = 0
+    for name in COMMAND_NAMES:
+        old, new = baseline["results"].get(name), current["results"].get(name)
+        if old is None or new is None:
+            continue
+        for phase in ("cold", "warm"):
+            before, after = old.get(phase), new.get(phase)
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            flag = ""
+            if change > threshold and after - before >= min_delta:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"  {name:<14} {phase:<5} {before:8.3f}s {after:8.3f}s {change:+8.1%}{flag}")
+    print(f"\n{regressions} regression(s) above {threshold:.0%}")
+    return regressions
+
+
+def load_results(path: Path) -> Optional[Dict]:
+    """Load a results file, or print an error and return None."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"ERROR: cannot read results file {path}: {e}", file=sys.stderr)
+        return None
+    if not isinstance(data, dict) or data.get("version") != RESULTS_VERSION or "results" not in data:
+        print(f"ERROR: {path} is not a version {RESULTS_VERSION} results file", file=sys.stderr)
+        return None
+    return data
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time every script cold and warm on a synthetic corpus.")
+    add_corpus_arguments(parser)
+    parser.add_argument("--commands", nargs="+", choices=COMMAND_NAMES, default=COMMAND_NAMES,
+                        help="Commands to time (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Cold and warm runs per command (default: 3)")
+    parser.add_argument("--jobs", type=int, help="Pass --jobs N to every command")
+    parser.add_argument("--root", help="Generate the corpus here and keep it (must not exist)")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>-<count>.json)")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS",
+                        help="Compare with a baseline results file; with two files, compare them without running")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown reported as a regression (default: 0.2)")
+    parser.add_argument("--min-delta", type=float, default=0.05,
+                        help="Smallest slowdown in seconds reported as a regression (default: 0.05)")
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes one or two results files")
+    baseline = None
+    if args.compare:
+        baseline = load_results(Path(args.compare[0]))
+        if baseline is None:
+            return 1
+        if len(args.compare) == 2:
+            current = load_results(Path(args.compare[1]))
+            if current is None:
+                return 1
+            return 1 if compare(baseline, current, args.threshold, args.min_delta) else 0
+
+    if args.root and Path(args.root).exists():
+        print(f"ERROR: {args.root} already exists", file=sys.stderr)
+        return 1
+
+    commit, dirty = git_commit()
+    options = corpus_options(args)
+    tmp = None if args.root else tempfile.TemporaryDirectory(prefix="kf_bench_suite_")
+    root = Path(args.root) if args.root else Path(tmp.name)
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        corpus = generate_corpus(root, **options)
+        generate_seconds = time.perf_counter() - start
+        print(f"{args.count} entries and {args.inbox} drafts generated in {generate_seconds:.1f} s")
+        results = run_suite(root, corpus, args.commands, args.repeat, args.jobs)
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    data = {
+        "version": RESULTS_VERSION,
+        "commit": commit,
+        "dirty": dirty,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "corpus": options,
+        "repeat": args.repeat,
+        "jobs": args.jobs,
+        "generate_seconds": round(generate_seconds, 3),
+        "results": results,
+    }
+    out_path = Path(args.output) if args.output else RESULTS_DIR / f"{commit[:12]}-{args.count}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    print(f"Results written to {out_path}")
+
+    if baseline is not None:
+        print()
+        return 1 if compare(baseline, data, args.threshold, args.min_delta) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""Deterministic synthetic corpus generator for end-to-end benchmarks.
+
+Writes a knowledge framework tree (entries/, _inbox/, _review/ and a copy
+of scripts/ and templates/, so the scripts treat it as their root) whose
+entries follow templates/standard.md and templates/quick.md: the same
+frontmatter fields in the same order and the same section headings, with
+the guidance text replaced by generated prose.
+
+Body words and tags are drawn from Zipf-distributed vocabularies, like a
+corpus written by many people about a few recurring topics. Quick entries
+(the debugging and tool types) use the quick template. A fraction of the
+entries and drafts break a rule on purpose, so validate.py and curate.py
+see failures, and some drafts copy the body of an existing entry, so
+curate.py sees near-duplicates. The same options and seed always produce
+byte-identical trees.
+
+Usage:
+    python benchmarks/corpus.py /tmp/kf_corpus                  # 10k entries, 100 drafts
+    python benchmarks/corpus.py /tmp/kf_corpus --count 1000000 --tags 20000 --body-words 150
+    python benchmarks/corpus.py /tmp/kf_corpus --count 1000 --inbox 500 --vocabulary 500
+
+Usage (as a library):
+    from corpus import CORPUS_DEFAULTS, generate_corpus, write_inbox
+"""
+
+import argparse
+import random
+import re
+import shutil
+import sys
+import time
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+from curate import TYPE_TO_CATEGORY, slugify
+from validate import QUICK_TYPES, VALID_CONFIDENCE, VALID_DOMAINS, VALID_TYPES
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+TEMPLATES_DIR = REPO_ROOT / "templates"
+
+CORPUS_DEFAULTS = {
+    "count": 10_000,
+    "seed": 0,
+    "tags": 2_000,
+    "vocabulary": 5_000,
+    "body_words": 400,
+    "inbox": 100,
+    "quick_ratio": 0.3,
+    "invalid_ratio": 0.02,
+    "duplicate_ratio": 0.05,
+}
+
+SEED_WORDS = ["optical", "network", "kafka", "agent", "multi", "edfa", "gain", "power", "yang", "netconf",
+              "digital", "twin", "latex", "paper", "retry", "queue", "docker", "deploy", "test", "mock",
+              "python", "async", "cache", "index", "search", "model", "train", "vector", "embed", "graph",
+              "topology", "ring", "mesh", "amplifier", "telemetry", "stream", "batch", "schema", "config", "ci"]
+CONSONANTS = "bcdfghjklmnpqrstvwxz"
+VOWELS = "aeiouy"
+FIRST_DAY = date(2023, 1, 1)
+DAY_SPAN = 1300
+
+
+# ---------------------------------------------------------------------------
+# Templates
+# ---------------------------------------------------------------------------
+
+def template_layout(path: Path) -> Tuple[List[str], List[str]]:
+    """Return (frontmatter field names, ## section headings) of a template, in order."""
+    lines = path.read_text(encoding="utf-8").split("\n")
+    end = lines.index("---", 1)
+    fields = [line.split(":", 1)[0] for line in lines[1:end] if re.match(r"^[a-z_]+:", line)]
+    sections = [line[3:].strip() for line in lines[end + 1:] if line.startswith("## ")]
+    return fields, sections
+
+
+# ---------------------------------------------------------------------------
+# Vocabularies
+# ---------------------------------------------------------------------------
+
+def pseudo_words(size: int, rng: random.Random) -> List[str]:
+    """Return SEED_WORDS plus pronounceable pseudo-words, `size` in total."""
+    words = list(SEED_WORDS[:size])
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4)))
+        if rng.random() < 0.5:
+            word += rng.choice(CONSONANTS)
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def zipf_weights(size: int) -> List[float]:
+    """Return cumulative Zipf (s=1) weights for ranks 1..size."""
+    return list(accumulate(1.0 / rank for rank in range(1, size + 1)))
+
+
+class Vocabulary:
+    """Body words and tags with Zipf-distributed frequencies."""
+
+    def __init__(self, rng: random.Random, words: int, tags: int) -> None:
+        self.words = pseudo_words(max(words, 1), rng)
+        self.word_weights = zipf_weights(len(self.words))
+        tag_words = self.words[:max(len(SEED_WORDS), tags // 4)]
+        tag_set = set()
+        self.tags: List[str] = []
+        while len(self.tags) < max(tags, 1):
+            tag = "-".join(rng.choice(tag_words) for _ in range(rng.choice((1, 1, 2, 2, 3))))
+            if tag not in tag_set:
+                tag_set.add(tag)
+                self.tags.append(tag)
+        self.tag_weights = zipf_weights(len(self.tags))
+
+    def sample_words(self, rng: random.Random, k: int) -> List[str]:
+        """Return k body words (with repetition)."""
+        return rng.choices(self.words, cum_weights=self.word_weights, k=k)
+
+    def sample_tags(self, rng: random.Random, k: int) -> List[str]:
+        """Return k distinct tags."""
+        tags: List[str] = []
+        while len(tags) < min(k, len(self.tags)):
+            tag = rng.choices(self.tags, cum_weights=self.tag_weights)[0]
+            if tag not in tags:
+                tags.append(tag)
+        return tags
+
+
+# ---------------------------------------------------------------------------
+# Entries
+# ---------------------------------------------------------------------------
+
+def prose(rng: random.Random, vocab: Vocabulary, words: int) -> str:
+    """Return `words` words of sentence-shaped text, wrapped in paragraphs."""
+    sampled = vocab.sample_words(rng, max(words, 1))
+    sentences: List[str] = []
+    i = 0
+    while i < len(sampled):
+        n = rng.randint(6, 18)
+        sentence = " ".join(sampled[i:i + n])
+        sentences.append(sentence[:1].upper() + sentence[1:] + ".")
+        i += n
+    paragraphs = []
+    for start in range(0, len(sentences), 4):
+        paragraphs.append(" ".join(sentences[start:start + 4]))
+    return "\n\n".join(paragraphs)
+
+
+def entry_text(
+    rng: random.Random,
+    vocab: Vocabulary,
+    layouts: Dict[str, Tuple[List[str], List[str]]],
+    title: str,
+    entry_type: str,
+    related: List[str],
+    body_words: int,
+    invalid: bool,
+    body: Optional[str] = None,
+) -> Tuple[str, str]:
+    """Return (entry text, body) for one entry laid out like its template.
+
+    body, if given, replaces the generated sections (near-duplicate drafts).
+    """
+    quick = entry_type in QUICK_TYPES
+    fields, sections = layouts["quick" if quick else "standard"]
+    created = FIRST_DAY + timedelta(days=rng.randrange(DAY_SPAN))
+    updated = created + timedelta(days=rng.randrange(120)) if rng.random() < 0.5 else None
+    values = {
+        "title": f'"{title}"',
+        "type": entry_type,
+        "tags": "[" + ", ".join(vocab.sample_tags(rng, rng.randint(2, 5))) + "]",
+        "domain": rng.choice(sorted(VALID_DOMAINS)),
+        "created": created.isoformat(),
+        "updated": updated.isoformat() if updated else "",
+        "confidence": rng.choice(sorted(VALID_CONFIDENCE)),
+        "complexity": "low" if quick else rng.choice(("medium", "medium", "high")),
+        "related": "[" + ", ".join(related) + "]",
+    }
+    if invalid:
+        # One realistic mistake: an unknown domain or a missing section
+        if rng.random() < 0.5:
+            values["domain"] = "networking"
+        else:
+            sections = [s for s in sections if s != ("Solution" if quick else "Recipe")]
+
+    lines = ["---"]
+    for field in fields:
+        value = values.get(field, "")
+        lines.append(f"{field}: {value}" if value else f"{field}:")
+    lines += ["---", "", f"# {title}", ""]
+
+    if body is None:
+        per_section = max(body_words // len(sections), 1)
+        parts = []
+        for section in sections:
+            parts += [f"## {section}", "", prose(rng, vocab, rng.randint(per_section // 2, per_section * 3 // 2 + 1)), ""]
+        body = "\n".join(parts)
+    return "\n".join(lines) + "\n" + body, body
+
+
+def new_title(rng: random.Random, vocab: Vocabulary, taken: set) -> Tuple[str, str]:
+    """Return a (title, slug) whose slug is not in taken, and reserve the slug."""
+    while True:
+        words = vocab.sample_words(rng, rng.randint(4, 8))
+        title = " ".join(word.capitalize() for word in words)
+        slug = slugify(title)
+        if slug not in taken:
+            taken.add(slug)
+            return title, slug
+
+
+def copy_framework(root: Path) -> None:
+    """Copy scripts/ and templates/ so the scripts under root operate on root."""
+    for name in ("scripts", "templates"):
+        shutil.rmtree(root / name, ignore_errors=True)
+        shutil.copytree(REPO_ROOT / name, root / name, ignore=shutil.ignore_patterns("__pycache__"))
+
+
+def generate_corpus(root: Path, **options) -> Dict:
+    """Write a synthetic tree under root (see CORPUS_DEFAULTS for options).
+
+    Returns the corpus state needed to add inbox drafts later (see
+    write_inbox()): the options, vocabulary, layouts, taken slugs and a
+    sample of entry bodies.
+    """
+    spec = dict(CORPUS_DEFAULTS, **options)
+    rng = random.Random(spec["seed"])
+    vocab = Vocabulary(rng, spec["vocabulary"], spec["tags"])
+    layouts = {name: template_layout(TEMPLATES_DIR / f"{name}.md") for name in ("standard", "quick")}
+    quick_types = sorted(QUICK_TYPES)
+    standard_types = sorted(VALID_TYPES - QUICK_TYPES)
+
+    for category in sorted(set(TYPE_TO_CATEGORY.values())):
+        (root / "entries" / category).mkdir(parents=True, exist_ok=True)
+    for name in ("_inbox", "_review"):
+        (root / name).mkdir(exist_ok=True)
+    copy_framework(root)
+
+    taken: set = set()
+    slugs: List[str] = []
+    bodies: List[str] = []
+    for i in range(spec["count"]):
+        entry_type = rng.choice(quick_types if rng.random() < spec["quick_ratio"] else standard_types)
+        title, slug = new_title(rng, vocab, taken)
+        related = rng.sample(slugs[-1000:], min(len(slugs), rng.randint(1, 2))) if slugs and rng.random() < 0.3 else []
+        text, body = entry_text(rng, vocab, layouts, title, entry_type, related, spec["body_words"],
+                                rng.random() < spec["invalid_ratio"])
+        path = root / "entries" / TYPE_TO_CATEGORY[entry_type] / f"{slug}.md"
+        path.write_text(text, encoding="utf-8")
+        slugs.append(slug)
+        # Keep a bounded reservoir of bodies for near-duplicate drafts
+        if len(bodies) < 1000:
+            bodies.append(body)
+        elif rng.random() < 1000 / (i + 1):
+            bodies[rng.randrange(1000)] = body
+
+    corpus = {"spec": spec, "vocab": vocab, "layouts": layouts, "taken": taken, "bodies": bodies}
+    write_inbox(root, corpus, spec["inbox"], batch=0)
+    return corpus
+
+
+def write_inbox(root: Path, corpus: Dict, count: int, batch: int) -> None:
+    """Write `count` drafts to root/_inbox; each batch number gives different drafts."""
+    spec = corpus["spec"]
+    rng = random.Random(f"{spec['seed']}-inbox-{batch}")
+    vocab, layouts = corpus["vocab"], corpus["layouts"]
+    (root / "_inbox").mkdir(exist_ok=True)
+    for i in range(count):
+        entry_type = rng.choice(sorted(VALID_TYPES))
+        title, slug = new_title(rng, vocab, corpus["taken"])
+        body = rng.choice(corpus["bodies"]) if corpus["bodies"] and rng.random() < spec["duplicate_ratio"] else None
+        text, _ = entry_text(rng, vocab, layouts, title, entry_type, [], spec["body_words"],
+                             rng.random() < spec["invalid_ratio"], body)
+        (root / "_inbox" / f"draft_{batch:03d}_{i:06d}_{slug[:40]}.md").write_text(text, encoding="utf-8")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def add_corpus_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the corpus shape options shared with bench_suite.py."""
+    d = CORPUS_DEFAULTS
+    parser.add_argument("--count", type=int, default=d["count"], help=f"Entries (default: {d['count']})")
+    parser.add_argument("--seed", type=int, default=d["seed"], help="Random seed")
+    parser.add_argument("--tags", type=int, default=d["tags"], help=f"Distinct tags (default: {d['tags']})")
+    parser.add_argument("--vocabulary", type=int, default=d["vocabulary"],
+                        help=f"Distinct body words (default: {d['vocabulary']})")
+    parser.add_argument("--body-words", type=int, default=d["body_words"],
+                        help=f"Mean body words per entry (default: {d['body_words']})")
+    parser.add_argument("--inbox", type=int, default=d["inbox"], help=f"Drafts in _inbox/ (default: {d['inbox']})")
+    parser.add_argument("--quick-ratio", type=float, default=d["quick_ratio"],
+                        help=f"Share of quick (debugging/tool) entries (default: {d['quick_ratio']})")
+    parser.add_argument("--invalid-ratio", type=float, default=d["invalid_ratio"],
+                        help=f"Share of entries and drafts that fail validation (default: {d['invalid_ratio']})")
+    parser.add_argument("--duplicate-ratio", type=float, default=d["duplicate_ratio"],
+                        help=f"Share of drafts copying an entry's body (default: {d['duplicate_ratio']})")
+
+
+def corpus_options(args: argparse.Namespace) -> Dict:
+    """Return the generate_corpus() options from parsed arguments."""
+    return {name: getattr(args, name) for name in CORPUS_DEFAULTS}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic knowledge corpus.")
+    parser.add_argument("root", help="Directory to write the corpus into (must not contain entries/)")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    if (root / "entries").exists():
+        print(f"ERROR: {root / 'entries'} already exists", file=sys.stderr)
+        return 1
+    root.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    generate_corpus(root, **corpus_options(args))
+    print(f"{args.count} entries and {args.inbox} drafts written to {root} in {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
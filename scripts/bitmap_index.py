@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""Metadata bitmaps and the boolean filter language for search.py --where.
+
+Entries are numbered 0..n-1 in scan (path) order. For each field in FIELDS
+every lowercased value maps to the entries carrying it, as a Python int
+with bit i set for entry i. Filters are then plain integer AND / OR / NOT,
+which costs microseconds even at 100k entries.
+
+The index is saved to .kf_cache/bitmaps.json, keyed by the corpus signature
+(all entry stat keys), and rebuilt from the metadata cache when entries
+change. Values held by many entries are stored as hex bitmaps, rare ones as
+base64 id arrays that are unpacked into a bitmap the first time they are
+used, so loading the file costs little more than reading it.
+
+Filter language (keywords are case-insensitive, values are matched
+case-insensitively):
+
+    expr     := or_expr
+    or_expr  := and_expr ( OR and_expr )*
+    and_expr := unary ( [AND] unary | NOT unary )*    # "a NOT b" = a AND NOT b
+    unary    := NOT unary | atom
+    atom     := "(" expr ")" | field ":" value        # value may be "quoted"
+
+    tag:edfa AND (tag:kafka OR domain:devops) NOT confidence:low
+
+Usage (as a library):
+    from bitmap_index import ensure_bitmaps, parse_filter, evaluate, bitmap_ids
+"""
+
+import base64
+import json
+import re
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from entry_cache import atomic_write_text, cache_enabled, get_cache_dir
+from instrument import timed
+from search_index import corpus_signature
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+BITMAP_FILE_NAME = "bitmaps.json"
+# Bump when value normalisation or the file layout changes
+BITMAP_VERSION = 2
+FIELDS = ("tag", "domain", "type", "confidence")
+# Values held by at least 1/DENSE_RATIO of entries are saved as hex bitmaps
+DENSE_RATIO = 24
+
+FILTER_TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<open>\()
+      | (?P<close>\))
+      | (?P<field>[A-Za-z_]+):(?P<value>"(?:[^"\\]|\\.)*"|[^\s()"]+)
+      | (?P<word>[^\s()]+)
+    )""",
+    re.VERBOSE,
+)
+KEYWORDS = {"and", "or", "not"}
+
+
+class FilterError(ValueError):
+    """Raised for a malformed --where expression."""
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def build_bitmaps(records: Iterable[Dict]) -> Dict:
+    """Build the index from cache records (with frontmatter) in entry id order.
+
+    The index holds count, postings {field: {value: [ids]}} and bitmaps
+    {"field:value": int}, filled on demand by lookup(). Postings loaded by
+    load_bitmaps() hold pack_ids() strings instead of lists.
+    """
+    postings: Dict[str, Dict[str, List[int]]] = {field: {} for field in FIELDS}
+    tag_postings = postings["tag"]
+    scalar_postings = [(field, postings[field]) for field in FIELDS if field != "tag"]
+    count = 0
+    for entry_id, record in enumerate(records):
+        fm = record["frontmatter"]
+        tags = fm.get("tags")
+        if tags:
+            for value in {str(t).lower() for t in (tags if isinstance(tags, list) else [tags])}:
+                ids = tag_postings.get(value)
+                if ids is None:
+                    tag_postings[value] = [entry_id]
+                else:
+                    ids.append(entry_id)
+        for field, field_postings in scalar_postings:
+            value = fm.get(field)
+            if value:
+                value = str(value).lower()
+                ids = field_postings.get(value)
+                if ids is None:
+                    field_postings[value] = [entry_id]
+                else:
+                    ids.append(entry_id)
+        count = entry_id + 1
+    return {"count": count, "postings": postings, "bitmaps": {}}
+
+
+def ids_to_bitmap(ids: List[int], count: int) -> int:
+    """Pack ascending entry ids into an int with those bits set."""
+    buf = bytearray((count + 7) // 8)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def bitmap_ids(bitmap: int) -> List[int]:
+    """Return the ids of the set bits in ascending order."""
+    words = array("Q", bitmap.to_bytes((bitmap.bit_length() + 63) // 64 * 8, "little"))
+    if sys.byteorder == "big":
+        words.byteswap()
+    ids = []
+    for word_index, word in enumerate(words):
+        if not word:
+            continue
+        base = word_index << 6
+        while word:
+            low = word & -word
+            ids.append(base + low.bit_length() - 1)
+            word ^= low
+    return ids
+
+
+def pack_ids(ids: List[int]) -> str:
+    """Encode entry ids as base64 little-endian uint32s."""
+    packed = array("I", ids)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+def unpack_ids(text: str) -> List[int]:
+    """Inverse of pack_ids()."""
+    packed = array("I")
+    packed.frombytes(base64.b64decode(text))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tolist()
+
+
+def lookup(index: Dict, field: str, value: str) -> int:
+    """Return the bitmap of entries whose field has value (memoized)."""
+    if field not in FIELDS:
+        raise FilterError(f"unknown field '{field}' (expected one of: {', '.join(FIELDS)})")
+    key = f"{field}:{value.lower()}"
+    bitmap = index["bitmaps"].get(key)
+    if bitmap is None:
+        ids = index["postings"][field].get(value.lower(), [])
+        if isinstance(ids, str):
+            ids = unpack_ids(ids)
+        bitmap = index["bitmaps"][key] = ids_to_bitmap(ids, index["count"])
+    return bitmap
+
+
+# ---------------------------------------------------------------------------
+# Load / save
+# ---------------------------------------------------------------------------
+
+def save_bitmaps(root: Path, index: Dict, signature: str) -> None:
+    """Persist the index. Failures (read-only checkout) are ignored."""
+    threshold = max(1, index["count"] // DENSE_RATIO)
+    dense: Dict[str, Dict[str, str]] = {}
+    sparse: Dict[str, Dict[str, str]] = {}
+    for field, field_postings in index["postings"].items():
+        dense[field] = {}
+        sparse[field] = {}
+        for value, ids in field_postings.items():
+            if len(ids) >= threshold:
+                dense[field][value] = format(lookup(index, field, value), "x")
+            else:
+                sparse[field][value] = pack_ids(ids)
+    data = {"version": BITMAP_VERSION, "signature": signature, "count": index["count"],
+            "dense": dense, "sparse": sparse}
+    try:
+        atomic_write_text(get_cache_dir(root) / BITMAP_FILE_NAME, json.dumps(data, separators=(",", ":")))
+    except OSError:
+        pass
+
+
+def load_bitmaps(root: Path, signature: str) -> Optional[Dict]:
+    """Load the saved index if it matches signature, else None."""
+    try:
+        data = json.loads((get_cache_dir(root) / BITMAP_FILE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != BITMAP_VERSION or data.get("signature") != signature:
+        return None
+
+    # Sparse postings stay packed until lookup() needs them
+    index: Dict = {"count": data["count"], "postings": data["sparse"], "bitmaps": {}}
+    for field, values in data["dense"].items():
+        for value, hex_bitmap in values.items():
+            index["bitmaps"][f"{field}:{value}"] = int(hex_bitmap, 16)
+    return index
+
+
+@timed("index")
+def ensure_bitmaps(root: Path, entries: List[Tuple[Path, Dict]], stats: Dict[str, List[int]]) -> Dict:
+    """Return the index for entries, loading it from the cache when current."""
+    signature = corpus_signature(stats)
+    index = load_bitmaps(root, signature) if cache_enabled() else None
+    if index is None:
+        index = build_bitmaps(record for _, record in entries)
+        if cache_enabled():
+            save_bitmaps(root, index, signature)
+    return index
+
+
+def all_entries(index: Dict) -> int:
+    """Return the bitmap with every entry set."""
+    return (1 << index["count"]) - 1
+
+
+# ---------------------------------------------------------------------------
+# Filter language
+# ---------------------------------------------------------------------------
+
+def tokenize_filter(text: str) -> List[Tuple[str, ...]]:
+    """Split a filter expression into ("(",), (")",), ("op", kw), ("term", field, value)."""
+    tokens: List[Tuple[str, ...]] = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = FILTER_TOKEN_RE.match(text, pos)
+        if match is None or match.end() == pos:
+            raise FilterError(f"unexpected input at position {pos}: {text[pos:]!r}")
+        pos = match.end()
+        if match.group("open"):
+            tokens.append(("(",))
+        elif match.group("close"):
+            tokens.append((")",))
+        elif match.group("field"):
+            value = match.group("value")
+            if value.startswith('"'):
+                value = re.sub(r"\\(.)", r"\1", value[1:-1])
+            tokens.append(("term", match.group("field").lower(), value))
+        else:
+            word = match.group("word")
+            if word.lower() not in KEYWORDS:
+                raise FilterError(f"expected field:value, AND, OR or NOT, got {word!r}")
+            tokens.append(("op", word.lower()))
+    return tokens
+
+
+def parse_filter(text: str) -> Tuple:
+    """Parse a filter expression into a tuple AST.
+
+    Nodes: ("term", field, value), ("and", a, b), ("or", a, b), ("not", a).
+    Raises FilterError for syntax errors or unknown fields.
+    """
+    tokens = tokenize_filter(text)
+    pos = 0
+
+    def peek() -> Optional[Tuple[str, ...]]:
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take() -> Tuple[str, ...]:
+        nonlocal pos
+        token = tokens[pos]
+        pos += 1
+        return token
+
+    def parse_or() -> Tuple:
+        node = parse_and()
+        while peek() == ("op", "or"):
+            take()
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and() -> Tuple:
+        node = parse_unary()
+        while True:
+            token = peek()
+            if token == ("op", "and"):
+                take()
+                node = ("and", node, parse_unary())
+            elif token == ("op", "not"):
+                take()
+                node = ("and", node, ("not", parse_unary()))
+            elif token is not None and token[0] in ("term", "("):
+                node = ("and", node, parse_unary())
+            else:
+                return node
+
+    def parse_unary() -> Tuple:
+        token = peek()
+        if token == ("op", "not"):
+            take()
+            return ("not", parse_unary())
+        if token is None:
+            raise FilterError("unexpected end of expression")
+        take()
+        if token[0] == "(":
+            node = parse_or()
+            if peek() != (")",):
+                raise FilterError("missing closing parenthesis")
+            take()
+            return node
+        if token[0] == "term":
+            if token[1] not in FIELDS:
+                raise FilterError(f"unknown field '{token[1]}' (expected one of: {', '.join(FIELDS)})")
+            return token
+        raise FilterError(f"unexpected {token[-1]!r}")
+
+    if not tokens:
+        raise FilterError("empty expression")
+    ast = parse_or()
+    if peek() is not None:
+        raise FilterError(f"unexpected {peek()[-1]!r}")
+    return ast
+
+
+def filter_values(ast: Optional[Tuple], field: str) -> Set[str]:
+    """Return the lowercased values a filter AST names for field."""
+    if ast is None:
+        return set()
+    if ast[0] == "term":
+        return {ast[2].lower()} if ast[1] == field else set()
+    return set().union(*(filter_values(child, field) for child in ast[1:]))
+
+
+def evaluate(index: Dict, ast: Tuple) -> int:
+    """Evaluate a parsed filter to a bitmap of matching entry ids."""
+    kind = ast[0]
+    if kind == "term":
+        return lookup(index, ast[1], ast[2])
+    if kind == "and":
+        return evaluate(index, ast[1]) & evaluate(index, ast[2])
+    if kind == "or":
+        return evaluate(index, ast[1]) | evaluate(index, ast[2])
+    return all_entries(index) & ~evaluate(index, ast[1])
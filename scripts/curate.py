@@ -5,32 +5,72 @@ Reads .md files from _inbox/, validates each one, and either:
   - Promotes valid entries to entries/{category}/{slug}.md
   - Moves invalid entries to _review/ with error comments prepended
 
-After processing, rebuilds index.md and tags.md.
+A draft whose title slug already exists, or whose body is a near-duplicate
+of an existing entry (or of a draft promoted earlier in the same run), goes
+to _review/ as a duplicate. Near-duplicates are found by MinHash signatures
+of the body shingles through an LSH band index (see minhash_index.py); the
+review comment names the matching entry and the estimated Jaccard
+similarity.
+
+A promoted entry whose tag is new but within a typo or two of an existing
+tag gets a NOTE naming the likely intended tags (see fuzzy_index.py).
+
+Each draft is read once: reading, validation and categorization run on a
+worker pool, and the moves are then decided serially in file name order.
+
+Moves are crash-safe. The full plan (each move's source, destination and
+content) is written to .kf_cache/curate-journal.jsonl and fsynced before
+anything is touched; each move then writes its destination through a temp
+file and rename before deleting the draft, and is marked done in the
+journal. After an interruption, curate.py refuses to start until it is
+rerun with --resume, which replays only the moves not marked done.
+After processing, rebuilds index.md (and its shards) and tags.md from the metadata cache,
+which already holds the promoted drafts, and syncs the SQLite store (see
+sqlite_store.py) if one has been created.
 
 Usage:
     python curate.py              # process inbox
     python curate.py --commit     # process inbox, then git commit and push
+    python curate.py --jobs 8     # read and validate drafts on 8 worker processes
+    python curate.py --resume     # finish an interrupted run, then process inbox
 """
 
+import argparse
+import json
 import os
 import re
 import shutil
+import sqlite3
 import subprocess
 import sys
 from datetime import date
+from functools import partial
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 # Import sibling modules
 sys.path.insert(0, str(Path(__file__).resolve().parent))
-from validate import validate_file, parse_frontmatter
+from entry_cache import (
+    add_jobs_argument, atomic_write_text, get_cache_dir, make_record, map_files, remember_records, scan_state,
+)
+from entry_parser import parse_entry, read_text
+from fuzzy_index import ensure_fuzzy_index, is_known, suggest
+from instrument import add_profile_argument, span, start_profile, timed
+from minhash_index import add_to_lsh, build_lsh, entry_signatures, find_similar, text_signature
+from validate import validate_parsed
 from rebuild_index import rebuild
+from sqlite_store import StoreError, open_store, store_exists, sync_store
+from telemetry import start_telemetry
 
 
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
 
+JOURNAL_FILE_NAME = "curate-journal.jsonl"
+# Bump when the journal layout changes
+JOURNAL_VERSION = 1
+
 TYPE_TO_CATEGORY = {
     "pattern": "patterns",
     "decision": "decisions",
@@ -68,27 +108,12 @@ def slugify(title: str) -> str:
     return slug
 
 
-# ---------------------------------------------------------------------------
-# Check for duplicate slugs
-# ---------------------------------------------------------------------------
-
-def find_existing_slugs(root: Path) -> set:
-    """Return a set of all existing entry slugs (stem names) in entries/."""
-    entries_dir = root / "entries"
-    slugs = set()
-    if entries_dir.is_dir():
-        for md_file in entries_dir.rglob("*.md"):
-            slugs.add(md_file.stem)
-    return slugs
-
-
 # ---------------------------------------------------------------------------
 # Prepend review comment to a file
 # ---------------------------------------------------------------------------
 
-def prepend_review_comment(filepath: Path, errors: List[str]) -> str:
-    """Prepend a review comment block to the file content and return it."""
-    original = filepath.read_text(encoding="utf-8")
+def prepend_review_comment(original: str, errors: List[str]) -> str:
+    """Prepend a review comment block to a draft's text and return it."""
     comment_lines = [
         "<!-- REVIEW NEEDED",
         f"   Validation failed on {date.today().isoformat()}.",
@@ -141,112 +166,333 @@ def set_updated_date(text: str, new_date: str) -> str:
 # Main curation logic
 # ---------------------------------------------------------------------------
 
-def curate(root: Path) -> Tuple[int, int, int]:
-    """Process all files in _drafts/.
+def new_tag_notes(fuzzy: dict, tags: object) -> List[str]:
+    """Return a note for each new tag that looks like a misspelt existing tag."""
+    if not isinstance(tags, list):
+        tags = [tags] if tags else []
+    notes = []
+    for tag in tags:
+        tag = str(tag).lower()
+        if is_known(fuzzy, "tag", tag):
+            continue
+        terms = [term for term, _, _ in suggest(fuzzy, "tag", tag)]
+        if terms:
+            notes.append(f"tag '{tag}' is new; did you mean: {', '.join(terms)}?")
+    return notes
+
 
-    Returns (promoted_count, review_count, duplicate_count).
+def prepare_draft(filepath: Path, today: str) -> Dict:
+    """Read, validate and categorize one draft (pool worker).
+
+    The draft is read once. Returns its plan for the commit phase: path,
+    original text and validation errors, plus for a valid draft its
+    frontmatter, category, slug, body signature, the text to promote (with
+    updated set to today) and the metadata record of that text.
+    """
+    text = read_text(filepath)
+    parsed = parse_entry(text)
+    passed, errors = validate_parsed(parsed)
+    draft: Dict = {"path": filepath, "text": text, "errors": errors}
+    if not passed:
+        return draft
+
+    fm = parsed["frontmatter"]
+    promoted_text = set_updated_date(text, today)
+    draft.update(
+        frontmatter=fm,
+        category=TYPE_TO_CATEGORY.get(fm.get("type", "")),
+        slug=slugify(fm.get("title", "")) or slugify(filepath.stem),
+        signature=text_signature(parsed["body"]),
+        promoted_text=promoted_text,
+        record=make_record("", parse_entry(promoted_text)),
+    )
+    return draft
+
+
+def review_move(root: Path, draft: Dict, errors: List[str], outcome: str, report: List[str]) -> Dict:
+    """Plan moving a draft to _review/ with the errors prepended as a comment.
+
+    report holds the lines printed once the move has been applied.
+    """
+    filepath = draft["path"]
+    return {
+        "action": "review",
+        "outcome": outcome,
+        "src": filepath.relative_to(root).as_posix(),
+        "dest": f"_review/{filepath.name}",
+        "content": prepend_review_comment(draft["text"], errors),
+        "report": report,
+    }
+
+
+def curate(
+    root: Path,
+    jobs: Optional[int] = None,
+    scanned: Optional[List[Tuple[Path, Dict]]] = None,
+    stats: Optional[Dict[str, List[int]]] = None,
+) -> Tuple[int, int, int, int]:
+    """Process all files in _inbox/.
+
+    Drafts are read, validated and categorized in parallel (prepare_draft),
+    then decided one by one in file name order, so duplicate checks see the
+    drafts promoted before them and the outcome does not depend on worker
+    timing. The decided moves are journaled and applied by apply_moves(),
+    which reports each draft's outcome as its move is applied.
+
+    scanned and stats are a scan_state() result of entries/ (scanned here
+    when not given); promoted entries are added to them, so the caller can
+    rebuild the index without scanning again.
+
+    Returns (promoted_count, review_count, duplicate_count, skipped_count).
     """
     inbox_dir = root / "_inbox"
-    review_dir = root / "_review"
 
     # Ensure directories exist
     inbox_dir.mkdir(parents=True, exist_ok=True)
-    review_dir.mkdir(parents=True, exist_ok=True)
+    (root / "_review").mkdir(parents=True, exist_ok=True)
 
     inbox_files = sorted(inbox_dir.glob("*.md"))
     if not inbox_files:
         print("No files found in _inbox/")
-        return 0, 0, 0
-
-    existing_slugs = find_existing_slugs(root)
-
-    promoted = 0
-    sent_to_review = 0
-    duplicates = 0
-
-    for filepath in inbox_files:
-        print(f"\nProcessing: {filepath.name}")
-
-        # Step 1: Validate
-        passed, errors = validate_file(filepath)
-
-        if not passed:
-            # Move to _review/ with comment
-            print(f"  FAIL - moving to _review/")
-            for err in errors:
-                print(f"    - {err}")
-            commented_content = prepend_review_comment(filepath, errors)
-            dest = review_dir / filepath.name
-            dest.write_text(commented_content, encoding="utf-8")
-            filepath.unlink()
-            sent_to_review += 1
-            continue
+        return 0, 0, 0, 0
 
-        # Step 2: Parse frontmatter for categorization
-        text = filepath.read_text(encoding="utf-8")
-        fm = parse_frontmatter(text)[0]
+    # Reading, validating and signing drafts on the pool is timed as "prepare"
+    with span("prepare"):
+        drafts = map_files(partial(prepare_draft, today=date.today().isoformat()), inbox_files, jobs)
 
-        if fm is None:
-            # Should not happen since validation passed, but be safe
-            print(f"  ERROR - could not parse frontmatter after validation")
-            sent_to_review += 1
-            continue
+    if scanned is None or stats is None:
+        scanned, stats = scan_state(root, jobs=jobs)
+    existing_slugs = {md_file.stem for md_file, _ in scanned}
+    fuzzy = ensure_fuzzy_index(root, scanned, stats)
+    signatures = entry_signatures(root, scanned, stats)
+    with span("dedupe"):
+        lsh = build_lsh(signatures)
 
-        entry_type = fm.get("type", "")
-        title = fm.get("title", "")
-        category = TYPE_TO_CATEGORY.get(entry_type)
+    with span("decide"):
+        moves = decide_moves(root, drafts, existing_slugs, fuzzy, lsh)
+    return apply_moves(root, moves, scanned=scanned, stats=stats)
 
-        if not category:
-            print(f"  ERROR - no category mapping for type '{entry_type}'")
-            commented_content = prepend_review_comment(
-                filepath, [f"No category mapping for type: {entry_type}"]
-            )
-            dest = review_dir / filepath.name
-            dest.write_text(commented_content, encoding="utf-8")
-            filepath.unlink()
-            sent_to_review += 1
+
+def decide_moves(root: Path, drafts: List[Dict], existing_slugs: Set[str], fuzzy: Dict, lsh: Dict) -> List[Dict]:
+    """Decide each prepared draft's move in order (see curate()).
+
+    Nothing is printed here: each move carries its report lines, printed by
+    apply_moves() once the move is done. existing_slugs and lsh are updated
+    with every draft planned for promotion.
+    """
+    moves: List[Dict] = []
+    for draft in drafts:
+        filepath = draft["path"]
+
+        # Step 1: Validation result
+        if draft["errors"]:
+            report = ["  FAIL - moved to _review/"] + [f"    - {err}" for err in draft["errors"]]
+            moves.append(review_move(root, draft, draft["errors"], "review", report))
             continue
 
-        # Step 3: Generate slug and check for duplicates
-        slug = slugify(title)
-        if not slug:
-            slug = slugify(filepath.stem)
+        # Step 2: Category
+        category = draft["category"]
+        if not category:
+            entry_type = draft["frontmatter"].get("type", "")
+            moves.append(review_move(root, draft, [f"No category mapping for type: {entry_type}"], "review",
+                                     [f"  ERROR - no category mapping for type '{entry_type}'; moved to _review/"]))
+            continue
 
+        # Step 3: Slug duplicates
+        slug = draft["slug"]
         if slug in existing_slugs:
-            print(f"  DUPLICATE - slug '{slug}' already exists in entries/")
-            commented_content = prepend_review_comment(
-                filepath,
-                [f"Duplicate slug: '{slug}' already exists in entries/. "
-                 f"Merge manually or rename the title."]
-            )
-            dest = review_dir / filepath.name
-            dest.write_text(commented_content, encoding="utf-8")
-            filepath.unlink()
-            duplicates += 1
+            moves.append(review_move(root, draft, [f"Duplicate slug: '{slug}' already exists in entries/. "
+                                                   f"Merge manually or rename the title."], "duplicate",
+                                     [f"  DUPLICATE - slug '{slug}' already exists in entries/; moved to _review/"]))
             continue
 
-        # Step 4: Promote to entries/{category}/{slug}.md
-        category_dir = root / "entries" / category
-        category_dir.mkdir(parents=True, exist_ok=True)
-
-        # Set updated date to today
-        today = date.today().isoformat()
-        updated_text = set_updated_date(text, today)
+        # Step 4: Check the body against existing entries for near-duplicates
+        signature = draft["signature"]
+        similar = find_similar(lsh, signature) if signature is not None else []
+        if similar:
+            match_path, jaccard = similar[0]
+            moves.append(review_move(root, draft, [f"Suspected duplicate of {match_path} (estimated Jaccard "
+                                                   f"similarity {jaccard:.2f} of body shingles). "
+                                                   f"Merge manually or make the difference explicit."],
+                                     "duplicate",
+                                     [f"  DUPLICATE - body matches {match_path} (estimated Jaccard {jaccard:.2f}); "
+                                      f"moved to _review/"]))
+            continue
 
-        dest = category_dir / f"{slug}.md"
-        dest.write_text(updated_text, encoding="utf-8")
-        filepath.unlink()
+        # Step 5: Promote to entries/{category}/{slug}.md
+        rel_path = f"entries/{category}/{slug}.md"
         existing_slugs.add(slug)
-        promoted += 1
-        print(f"  PROMOTED -> {dest.relative_to(root)}")
+        if signature is not None:
+            add_to_lsh(lsh, rel_path, signature)
+        moves.append({
+            "action": "promote",
+            "outcome": "promoted",
+            "src": filepath.relative_to(root).as_posix(),
+            "dest": rel_path,
+            "content": draft["promoted_text"],
+            "record": dict(draft["record"], path=rel_path),
+            "report": [f"  PROMOTED -> {rel_path}"] + [
+                f"  NOTE - {note}" for note in new_tag_notes(fuzzy, draft["frontmatter"].get("tags", []))],
+        })
+
+    return moves
+
+
+# ---------------------------------------------------------------------------
+# Journaled moves
+# ---------------------------------------------------------------------------
+
+def get_journal_path(root: Path) -> Path:
+    """Return the path of the curate write-ahead journal."""
+    return get_cache_dir(root) / JOURNAL_FILE_NAME
+
 
-    return promoted, sent_to_review, duplicates
+@timed("write")
+def write_journal(path: Path, moves: List[Dict]) -> None:
+    """Write the planned moves and a plan-complete marker, then fsync."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"version": JOURNAL_VERSION, "moves": len(moves)}) + "\n")
+        for move in moves:
+            f.write(json.dumps(move, ensure_ascii=False) + "\n")
+        f.write(json.dumps({"planned": len(moves)}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_journal(path: Path) -> Optional[Tuple[List[Dict], Set[int]]]:
+    """Return (planned moves, numbers of the moves already applied).
+
+    Returns None if the journal is unreadable or its plan was never
+    completed (no move is applied before the plan is on disk).
+    """
+    records = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break  # torn final line of an interrupted append
+    except OSError:
+        return None
+    if not records or records[0].get("version") != JOURNAL_VERSION:
+        return None
+    count = records[0]["moves"]
+    if len(records) < count + 2 or records[count + 1] != {"planned": count}:
+        return None
+    done = {record["done"] for record in records[count + 2:]}
+    return records[1:count + 1], done
+
+
+def apply_move(root: Path, move: Dict) -> bool:
+    """Apply one move idempotently: write dest atomically, then remove src.
+
+    Safe to repeat after an interruption at any point. Returns False (and
+    leaves the draft in _inbox/) if a promotion target already holds
+    different content.
+    """
+    dest = root / move["dest"]
+    try:
+        current: Optional[str] = dest.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        current = None
+    if current != move["content"]:
+        if current is not None and move["action"] == "promote":
+            print(f"  WARNING - {move['dest']} already exists; leaving {move['src']} in place")
+            return False
+        atomic_write_text(dest, move["content"])
+    try:
+        (root / move["src"]).unlink()
+    except FileNotFoundError:
+        pass
+    return True
+
+
+@timed("write")
+def apply_moves(
+    root: Path,
+    moves: List[Dict],
+    done: Optional[Set[int]] = None,
+    scanned: Optional[List[Tuple[Path, Dict]]] = None,
+    stats: Optional[Dict[str, List[int]]] = None,
+) -> Tuple[int, int, int, int]:
+    """Journal the moves, apply those not yet done, then drop the journal.
+
+    Each draft's outcome is printed once its move is done, so an interrupted
+    run only reports what actually happened. A move apply_move() refuses is
+    skipped: its draft stays in _inbox/ and is decided again on the next run.
+    With done (resuming), the journal on disk already holds the plan and
+    only the remaining moves are applied. Records of promoted entries go
+    straight into the metadata cache, so the index rebuild that follows does
+    not parse them again, and, with scanned and stats, into that scan_state()
+    result (kept in path order) so it does not scan entries/ again either.
+
+    Returns (promoted_count, review_count, duplicate_count, skipped_count)
+    of moves applied now.
+    """
+    if not moves:
+        return 0, 0, 0, 0
+    path = get_journal_path(root)
+    if done is None:
+        write_journal(path, moves)
+        done = set()
+
+    counts = {"promoted": 0, "review": 0, "duplicate": 0, "skipped": 0}
+    records: List[Tuple[Path, Dict]] = []
+    with open(path, "a", encoding="utf-8") as journal:
+        for number, move in enumerate(moves):
+            if number in done:
+                continue
+            print(f"\nProcessing: {Path(move['src']).name}")
+            if not apply_move(root, move):
+                print("  SKIPPED - left in _inbox/")
+                counts["skipped"] += 1
+                continue
+            journal.write(json.dumps({"done": number}) + "\n")
+            journal.flush()
+            for line in move.get("report", ()):
+                print(line)
+            counts[move["outcome"]] += 1
+            if move["action"] == "promote":
+                records.append((root / move["dest"], move["record"]))
+
+    keys = remember_records(root, records)
+    if scanned is not None and stats is not None and keys:
+        promoted = {record["path"]: (md_file, record) for md_file, record in records if record["path"] in keys}
+        scanned[:] = sorted(
+            [item for item in scanned if item[1]["path"] not in promoted] + list(promoted.values()),
+            key=lambda item: item[0],
+        )
+        stats.update(keys)
+    path.unlink()
+    return counts["promoted"], counts["review"], counts["duplicate"], counts["skipped"]
+
+
+def resume_curate(root: Path) -> Tuple[int, int, int, int]:
+    """Replay the unfinished moves of an interrupted run.
+
+    Returns (promoted_count, review_count, duplicate_count, skipped_count) of moves replayed.
+    """
+    path = get_journal_path(root)
+    if not path.exists():
+        print("No interrupted curate run to resume.")
+        return 0, 0, 0, 0
+    journal = read_journal(path)
+    if journal is None:
+        print("Discarding an incomplete curate journal (no moves had been applied).")
+        path.unlink()
+        return 0, 0, 0, 0
+    moves, done = journal
+    print(f"Resuming interrupted curate run: {len(moves) - len(done)} of {len(moves)} moves left")
+    return apply_moves(root, moves, done)
 
 
 # ---------------------------------------------------------------------------
 # Git commit and push
 # ---------------------------------------------------------------------------
 
+@timed("git")
 def git_commit_and_push(root: Path, summary: str) -> None:
     """Stage all changes, commit, and push."""
     try:
@@ -267,19 +513,55 @@ def git_commit_and_push(root: Path, summary: str) -> None:
 # ---------------------------------------------------------------------------
 
 def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Curate the knowledge framework inbox: validate, categorize, and promote entries.",
+    )
+    parser.add_argument("--commit", action="store_true", help="Git commit and push after curating")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Finish the moves of an interrupted run from its journal, then process the inbox",
+    )
+    add_jobs_argument(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profile(args)
+
     root = get_root()
-    do_commit = "--commit" in sys.argv
+    start_telemetry(root, "curate")
+    if get_journal_path(root).exists() and not args.resume:
+        print("ERROR: an interrupted curate run left a journal "
+              f"({get_journal_path(root).relative_to(root)}); rerun with --resume", file=sys.stderr)
+        return 1
 
     print("=" * 60)
     print("Knowledge Framework Curation")
     print("=" * 60)
 
-    # Process inbox
-    promoted, sent_to_review, duplicates = curate(root)
+    # Finish an interrupted run, then process the inbox
+    promoted, sent_to_review, duplicates, skipped = resume_curate(root) if args.resume else (0, 0, 0, 0)
+    # One scan of entries/ serves deduplication, the index rebuild and the store sync
+    scanned, stats = scan_state(root, jobs=args.jobs)
+    counts = curate(root, args.jobs, scanned, stats)
+    promoted += counts[0]
+    sent_to_review += counts[1]
+    duplicates += counts[2]
+    skipped += counts[3]
 
     # Rebuild index
     print("\nRebuilding index.md and tags.md ...")
-    entry_count, tag_count = rebuild(root)
+    entry_count, tag_count, _ = rebuild(root, jobs=args.jobs, scanned=scanned, stats=stats)
+
+    # Keep the optional SQLite store in step with the promoted entries
+    if store_exists(root):
+        print("Syncing SQLite store ...")
+        try:
+            conn = open_store(root)
+            try:
+                sync_store(root, conn, scanned, stats)
+            finally:
+                conn.close()
+        except (StoreError, sqlite3.Error) as e:
+            print(f"  WARNING - could not sync SQLite store: {e}")
 
     # Summary
     print("\n" + "=" * 60)
@@ -288,11 +570,12 @@ def main() -> int:
     print(f"  Promoted to entries:  {promoted}")
     print(f"  Sent to review:      {sent_to_review}")
     print(f"  Duplicates:          {duplicates}")
+    print(f"  Skipped (in _inbox/): {skipped}")
     print(f"  Total entries now:   {entry_count}")
     print(f"  Total unique tags:   {tag_count}")
 
     # Commit if requested
-    if do_commit:
+    if args.commit:
         parts = []
         if promoted:
             parts.append(f"{promoted} promoted")
@@ -300,6 +583,8 @@ def main() -> int:
             parts.append(f"{sent_to_review} to review")
         if duplicates:
             parts.append(f"{duplicates} duplicates")
+        if skipped:
+            parts.append(f"{skipped} skipped")
         summary = ", ".join(parts) if parts else "index rebuild only"
         git_commit_and_push(root, summary)
 
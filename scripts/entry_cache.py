@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Persistent metadata cache for knowledge framework entries.
+
+Scripts that only need an entry's frontmatter and summary go through scan()
+instead of reading and parsing every file. Parsed metadata is
+kept in .kf_cache/entries.json under the repo root, keyed by the entry's
+relative path and validated against its stat (mtime_ns, size, inode). A warm
+run therefore only stats files; changed files are re-parsed individually.
+
+Each record is a dict:
+  - path        : path relative to the root (posix string)
+  - frontmatter : parsed frontmatter dict (None if missing/unclosed)
+  - problem     : first non-empty line of the ## Problem section
+  - first_line  : first non-empty, non-heading body line
+
+Cache misses are read with entry_parser.read_header(), which stops at the end
+of the Problem section, so long entries cost no more than short ones.
+
+Set KF_NO_CACHE=1 to bypass the cache entirely.
+
+Files that miss the cache are parsed on a process pool (jobs workers,
+default: CPU count) once there are at least PARALLEL_MIN_FILES of them.
+map_files() returns results in input order, so output built from a scan is
+identical whatever the number of workers. iter_scan() yields the same
+records one at a time, for consumers that aggregate while the pool parses.
+
+Usage (as a library):
+    from entry_cache import scan, scan_state
+    for path, record in scan(root):
+        ...
+"""
+
+import argparse
+import json
+import os
+import stat
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from entry_parser import read_header
+from instrument import record_entries, span, timed
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+CACHE_DIR_NAME = ".kf_cache"
+CACHE_FILE_NAME = "entries.json"
+# Bump when the parser or record layout changes to invalidate old caches
+CACHE_VERSION = 2
+DEFAULT_JOBS = os.cpu_count() or 1
+# Below this many files a process pool costs more than it saves
+PARALLEL_MIN_FILES = 256
+# Files handed to a worker per task
+MAX_CHUNK_SIZE = 512
+
+T = TypeVar("T")
+
+
+def get_cache_dir(root: Path) -> Path:
+    """Return the cache directory for a knowledge framework root."""
+    return root / CACHE_DIR_NAME
+
+
+def cache_enabled() -> bool:
+    """Return False when KF_NO_CACHE is set to a non-empty value."""
+    return not os.environ.get("KF_NO_CACHE")
+
+
+# ---------------------------------------------------------------------------
+# Atomic file writes
+# ---------------------------------------------------------------------------
+
+def atomic_write_text(path: Path, content: str) -> None:
+    """Write content to path through a temp file and rename.
+
+    The file keeps its existing permissions, or gets the umask default if new.
+    """
+    atomic_write_bytes(path, content.encode("utf-8"))
+
+
+@timed("write")
+def atomic_write_bytes(path: Path, content: bytes) -> None:
+    """Binary counterpart of atomic_write_text()."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+# ---------------------------------------------------------------------------
+# Parallel map
+# ---------------------------------------------------------------------------
+
+def add_jobs_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the shared --jobs option to a script's argument parser."""
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=DEFAULT_JOBS, metavar="N",
+        help=f"Worker processes for reading entries (default: CPU count, {DEFAULT_JOBS})",
+    )
+
+
+def map_files(fn: Callable[[Any], T], items: List[Any], jobs: Optional[int] = None) -> List[T]:
+    """Return [fn(item) for item in items], fanned out to a process pool.
+
+    fn must be a module-level function so workers can unpickle it. Results
+    keep the order of items. Small inputs, or jobs <= 1, run in-process.
+    """
+    return list(iter_map_files(fn, items, jobs))
+
+
+def iter_map_files(fn: Callable[[Any], T], items: List[Any], jobs: Optional[int] = None) -> Iterator[T]:
+    """Like map_files(), but yield each result as soon as it and all earlier ones are done."""
+    if jobs is None:
+        jobs = DEFAULT_JOBS
+    jobs = min(jobs, len(items) // PARALLEL_MIN_FILES + 1)
+    if jobs <= 1:
+        yield from map(fn, items)
+        return
+
+    chunk_size = max(1, min(MAX_CHUNK_SIZE, len(items) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(fn, items, chunksize=chunk_size)
+
+
+# ---------------------------------------------------------------------------
+# Records
+# ---------------------------------------------------------------------------
+
+def stat_key(st: os.stat_result) -> List[int]:
+    """Return the cache validity key for a stat result."""
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def make_record(rel_path: str, parsed: Dict) -> Dict:
+    """Build a cacheable metadata record from a read_header() result."""
+    return {
+        "path": rel_path,
+        "frontmatter": parsed["frontmatter"],
+        "problem": parsed["problem"],
+        "first_line": parsed["first_line"],
+    }
+
+
+def parse_record(item: Tuple[Path, str]) -> Dict:
+    """Read and parse one (path, rel_path) into a record (pool worker)."""
+    md_file, rel_path = item
+    return make_record(rel_path, read_header(md_file))
+
+
+def iter_entry_files(entries_dir: Path) -> List[Path]:
+    """Return all .md files under entries_dir in sorted path order."""
+    if not entries_dir.is_dir():
+        return []
+    return sorted(entries_dir.rglob("*.md"))
+
+
+def stat_entries(root: Path, entries_dir: Optional[Path] = None) -> Dict[str, List[int]]:
+    """Return {rel_path: stat_key} for every entry without touching the cache.
+
+    Long-running processes (serve.py) compare this against the stats of their
+    last scan to notice added, removed or modified entries.
+    """
+    if entries_dir is None:
+        entries_dir = root / "entries"
+    stats: Dict[str, List[int]] = {}
+    for md_file in iter_entry_files(entries_dir):
+        try:
+            stats[md_file.relative_to(root).as_posix()] = stat_key(md_file.stat())
+        except OSError:
+            continue
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Cache load / save
+# ---------------------------------------------------------------------------
+
+def load_cache(root: Path) -> Dict[str, Dict]:
+    """Load the cached {rel_path: {"stat": [...], "record": {...}}} mapping."""
+    cache_file = get_cache_dir(root) / CACHE_FILE_NAME
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def save_cache(root: Path, entries: Dict[str, Dict]) -> None:
+    """Persist the cache mapping. Failures (read-only checkout) are ignored."""
+    content = json.dumps({"version": CACHE_VERSION, "entries": entries},
+                         ensure_ascii=False, separators=(",", ":"))
+    try:
+        atomic_write_text(get_cache_dir(root) / CACHE_FILE_NAME, content)
+    except OSError:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def remember_records(root: Path, records: List[Tuple[Path, Dict]]) -> Dict[str, List[int]]:
+    """Add cache records for entry files a script has just written.
+
+    Each record must describe the text that was written (see make_record);
+    the next scan then finds it by stat key instead of parsing the file.
+    Returns {rel_path: stat_key} of the files found, so a caller can extend
+    a scan_state() result instead of scanning again.
+    """
+    stats: Dict[str, List[int]] = {}
+    for md_file, record in records:
+        try:
+            stats[record["path"]] = stat_key(md_file.stat())
+        except OSError:
+            continue
+    if not stats or not cache_enabled():
+        return stats
+    cache = load_cache(root)
+    for md_file, record in records:
+        if record["path"] in stats:
+            cache[record["path"]] = {"stat": stats[record["path"]], "record": record}
+    save_cache(root, cache)
+    return stats
+
+
+def iter_scan(
+    root: Path,
+    entries_dir: Optional[Path] = None,
+    jobs: Optional[int] = None,
+    stats: Optional[Dict[str, List[int]]] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> Iterator[Tuple[Path, Dict]]:
+    """Yield scan()'s (path, record) pairs as soon as each is available.
+
+    Cached records come straight from the cache; the rest are parsed on the
+    worker pool and yielded in path order as they arrive, so a consumer can
+    aggregate while the pool is still parsing. The cache is saved once the
+    last record has been yielded.
+
+    stats, if given, is filled with {rel_path: stat_key}. timings, if given,
+    receives "scan" (listing, stat calls and cache load), "parse" (time spent
+    waiting for parsed records), both in seconds, and "parsed" (cache misses).
+    """
+    start = time.perf_counter()
+    if entries_dir is None:
+        entries_dir = root / "entries"
+    if stats is None:
+        stats = {}
+    use_cache = cache_enabled()
+    new: Dict[str, Dict] = {}
+    results: List[Tuple[Path, str, Optional[Dict]]] = []
+    misses: List[Tuple[Path, str]] = []
+
+    with span("scan"):
+        files = iter_entry_files(entries_dir)
+        old = load_cache(root) if use_cache else {}
+        for md_file in files:
+            rel_path = md_file.relative_to(root).as_posix()
+            try:
+                key = stat_key(md_file.stat())
+            except OSError:
+                continue
+
+            cached = old.get(rel_path)
+            if cached is not None and cached.get("stat") == key:
+                record = cached["record"]
+                new[rel_path] = cached
+            else:
+                record = None
+                misses.append((md_file, rel_path))
+
+            stats[rel_path] = key
+            results.append((md_file, rel_path, record))
+    record_entries(len(results))
+    if timings is not None:
+        timings["scan"] = time.perf_counter() - start
+        timings["parse"] = 0.0
+        timings["parsed"] = len(misses)
+
+    # Parse cache misses (on a process pool for large cold scans), in order
+    parsed = iter_map_files(parse_record, misses, jobs)
+    for md_file, rel_path, record in results:
+        if record is None:
+            start = time.perf_counter()
+            with span("parse"):
+                record = next(parsed)
+            if timings is not None:
+                timings["parse"] += time.perf_counter() - start
+            new[rel_path] = {"stat": stats[rel_path], "record": record}
+        yield md_file, record
+
+    if use_cache and (misses or len(new) != len(old)):
+        save_cache(root, new)
+
+
+def scan_state(
+    root: Path, entries_dir: Optional[Path] = None, jobs: Optional[int] = None
+) -> Tuple[List[Tuple[Path, Dict]], Dict[str, List[int]]]:
+    """Like scan(), but also return {rel_path: stat_key} for every entry.
+
+    Derived indexes (see search_index.py) use the stat keys to detect which
+    entries changed since they were built.
+    """
+    stats: Dict[str, List[int]] = {}
+    results = list(iter_scan(root, entries_dir, jobs, stats))
+    return results, stats
+
+
+def scan(
+    root: Path, entries_dir: Optional[Path] = None, jobs: Optional[int] = None
+) -> List[Tuple[Path, Dict]]:
+    """Return (path, record) for every .md file under entries/, sorted by path.
+
+    Unchanged files are served from the cache; new or modified files are
+    parsed and the cache is rewritten only if something changed.
+    """
+    return scan_state(root, entries_dir, jobs)[0]
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Shared single-pass parser for knowledge framework entries.
+
+Every script used to carry its own copy of parse_frontmatter and re-split the
+file for each of get_summary / extract_problem_summary / parse_sections. This
+module reads an entry once and walks its lines once, returning everything the
+scripts need:
+
+  - frontmatter : dict of parsed YAML fields (None if missing/unclosed)
+  - errors      : frontmatter parse errors
+  - sections    : list of (heading, line_number) for every ## heading
+  - problem     : first non-empty line of the ## Problem section ("" if none)
+  - first_line  : first non-empty, non-heading body line (summary fallback)
+  - body        : markdown body after the closing ---
+
+read_header() gets the same metadata for commands that never look at the
+body: it streams the file and stops at the end of the Problem section.
+
+Usage (as a library):
+    from entry_parser import read_entry, read_header, read_text, parse_frontmatter
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from instrument import count_read, span, timed
+
+# ---------------------------------------------------------------------------
+# Precompiled patterns
+# ---------------------------------------------------------------------------
+
+KEY_RE = re.compile(r"^(\w[\w-]*)\s*:\s*(.*)")
+INLINE_COMMENT_RE = re.compile(r"^([^#]+?)(?:\s+#.*)?$")
+SECTION_RE = re.compile(r"^##\s+(.+)$")
+PROBLEM_RE = re.compile(r"^##\s+Problem\b")
+HEADING_RE = re.compile(r"^##\s+")
+
+NO_FRONTMATTER = "No YAML frontmatter found (file must start with ---)"
+UNCLOSED_FRONTMATTER = "YAML frontmatter not closed (missing closing ---)"
+
+
+# ---------------------------------------------------------------------------
+# YAML frontmatter parser (no pyyaml dependency)
+# ---------------------------------------------------------------------------
+
+def parse_value(raw_value: str):
+    """Parse a single frontmatter value: [list], "quoted", or plain."""
+    # Parse list values: [item1, item2, ...]
+    if raw_value.startswith("[") and raw_value.endswith("]"):
+        inner = raw_value[1:-1].strip()
+        if not inner:
+            return []
+        items = [item.strip().strip("'\"") for item in inner.split(",")]
+        return [item for item in items if item]
+
+    # Parse quoted strings
+    if (raw_value.startswith('"') and raw_value.endswith('"')) or \
+       (raw_value.startswith("'") and raw_value.endswith("'")):
+        return raw_value[1:-1]
+
+    # Plain value -- handle inline comment: value  # comment
+    comment_match = INLINE_COMMENT_RE.match(raw_value)
+    if comment_match:
+        return comment_match.group(1).strip()
+    return raw_value
+
+
+def parse_frontmatter_lines(fm_lines: List[str]) -> Dict:
+    """Parse the lines between the --- markers into a dict."""
+    data: Dict = {}
+    for line in fm_lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        match = KEY_RE.match(line)
+        if not match:
+            continue
+
+        data[match.group(1).strip()] = parse_value(match.group(2).strip())
+    return data
+
+
+def find_frontmatter_end(lines: List[str]) -> Optional[int]:
+    """Return the index of the closing --- line, or None if absent."""
+    if not lines or lines[0].strip() != "---":
+        return None
+    for i in range(1, len(lines)):
+        if lines[i].strip() == "---":
+            return i
+    return None
+
+
+def parse_frontmatter(text: str) -> Tuple[Optional[Dict], List[str]]:
+    """Parse YAML frontmatter between --- markers.
+
+    Returns (parsed_dict_or_None, list_of_parse_errors).
+    """
+    lines = text.split("\n")
+    if not lines or lines[0].strip() != "---":
+        return None, [NO_FRONTMATTER]
+
+    end_idx = find_frontmatter_end(lines)
+    if end_idx is None:
+        return None, [UNCLOSED_FRONTMATTER]
+
+    return parse_frontmatter_lines(lines[1:end_idx]), []
+
+
+# ---------------------------------------------------------------------------
+# Single-pass entry parser
+# ---------------------------------------------------------------------------
+
+def parse_lines(lines: Iterator[str], body: Optional[List[str]] = None) -> Dict:
+    """Parse an entry from an iterator of lines (without newlines).
+
+    With a body list, every line after the frontmatter is appended to it and
+    the whole entry is walked. Without one, iteration stops as soon as the
+    Problem summary and the first body line are known, so the caller only
+    reads the header of long entries; sections then lists only the headings
+    seen up to that point.
+
+    Returns a dict with frontmatter, errors, sections, problem and first_line
+    (see module docstring).
+    """
+    result: Dict = {
+        "frontmatter": None,
+        "errors": [],
+        "sections": [],
+        "problem": "",
+        "first_line": "",
+    }
+
+    first = next(lines, None)
+    if first is None or first.strip() != "---":
+        result["errors"] = [NO_FRONTMATTER]
+        return result
+
+    fm_lines: List[str] = []
+    for line in lines:
+        if line.strip() == "---":
+            break
+        fm_lines.append(line)
+    else:
+        result["errors"] = [UNCLOSED_FRONTMATTER]
+        return result
+
+    result["frontmatter"] = parse_frontmatter_lines(fm_lines)
+
+    sections: List[Tuple[str, int]] = []
+    problem = ""
+    first_line = ""
+    # The Problem summary ends at the first non-Problem ## heading after it
+    in_problem = False
+    problem_done = False
+
+    for i, line in enumerate(lines, len(fm_lines) + 2):
+        if body is not None:
+            body.append(line)
+        elif problem_done and first_line:
+            break
+        stripped = line.strip()
+
+        if not first_line and stripped and not stripped.startswith("#"):
+            first_line = stripped
+
+        # Horizontal rules in the body are neither headings nor content
+        if stripped == "---":
+            continue
+
+        if line.startswith("##"):
+            match = SECTION_RE.match(line)
+            if match:
+                sections.append((match.group(1).strip(), i))
+            if HEADING_RE.match(line):
+                if problem_done:
+                    continue
+                if PROBLEM_RE.match(line):
+                    in_problem = True
+                elif in_problem:
+                    in_problem = False
+                    problem_done = True
+                continue
+
+        if in_problem and stripped:
+            problem = stripped
+            in_problem = False
+            problem_done = True
+
+    result["sections"] = sections
+    result["problem"] = problem
+    result["first_line"] = first_line
+    return result
+
+
+@timed("parse")
+def parse_entry(text: str) -> Dict:
+    """Parse an entry's text in one pass over its lines.
+
+    Returns a dict with frontmatter, errors, sections, problem, first_line
+    and body (see module docstring). Entries without valid frontmatter come
+    back with frontmatter=None and the body set to the full text.
+    """
+    body: List[str] = []
+    result = parse_lines(iter(text.split("\n")), body)
+    result["body"] = "\n".join(body) if result["frontmatter"] is not None else text
+    return result
+
+
+def read_text(path: Path) -> str:
+    """Read a UTF-8 file as Path.read_text() would, counting the bytes read."""
+    with span("read"):
+        data = path.read_bytes()
+    count_read(len(data))
+    text = data.decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def read_entry(path: Path) -> Dict:
+    """Read and parse an entry file in a single read."""
+    return parse_entry(read_text(path))
+
+
+def iter_file_lines(f: TextIO) -> Iterator[str]:
+    """Yield a text file's lines as text.split("\\n") would, reading lazily."""
+    for line in f:
+        if not line.endswith("\n"):
+            yield line
+            return
+        yield line[:-1]
+    # Text ending in a newline (or empty) ends with an empty line
+    yield ""
+
+
+@timed("parse")
+def read_header(path: Path) -> Dict:
+    """Parse an entry's frontmatter and Problem summary without reading the rest.
+
+    The file is streamed line by line and reading stops once the summary is
+    known, so I/O is proportional to the header, not the entry. Returns the
+    same keys as parse_entry() except body; sections is partial.
+    """
+    with open(path, encoding="utf-8") as f:
+        result = parse_lines(iter_file_lines(f))
+        count_read(f.buffer.tell())
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def section_names(parsed: Dict) -> set:
+    """Return the set of ## heading names from a parsed entry."""
+    return {name for name, _ in parsed["sections"]}
+
+
+def truncate(text: str, max_len: int) -> str:
+    """Truncate text to max_len characters, ending with '...' if cut."""
+    if len(text) > max_len:
+        return text[: max_len - 3] + "..."
+    return text
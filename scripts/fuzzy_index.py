@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Typo-tolerant lookup of tags and title words (SymSpell deletion index).
+
+Exact tag matching makes `search.py --tag edfaa` silently return nothing.
+This index stores, for every tag and every title word, the strings obtained
+by deleting up to MAX_DISTANCE characters from its first PREFIX_LENGTH
+characters. Two strings within that many edits share such a deletion
+variant, so a lookup generates the variants of the misspelt word, collects
+the terms filed under them and verifies each with the edit distance. The
+cost depends on the word, not on the size of the vocabulary.
+
+The index lives in .kf_cache/fuzzy.json, keyed by the corpus signature,
+and is rebuilt from the metadata cache when entries change (rebuild_index.py
+does this alongside index.md). search.py uses it for "did you mean"
+suggestions when a search finds nothing and for --fuzzy matching, and
+curate.py uses it to flag new tags that look like misspellings.
+
+Usage (as a library):
+    from fuzzy_index import ensure_fuzzy_index, suggest
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from entry_cache import atomic_write_text, cache_enabled, get_cache_dir, scan_state
+from instrument import timed
+from search_index import corpus_signature, tokenize
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+FUZZY_FILE_NAME = "fuzzy.json"
+# Bump when normalisation, the distance rules or the file layout change
+FUZZY_VERSION = 1
+KINDS = ("tag", "word")
+MAX_DISTANCE = 2
+# Only the first PREFIX_LENGTH characters generate deletion variants
+PREFIX_LENGTH = 7
+MAX_SUGGESTIONS = 5
+
+
+# ---------------------------------------------------------------------------
+# Edit distance
+# ---------------------------------------------------------------------------
+
+def allowed_distance(word: str) -> int:
+    """Return how many edits a lookup of word tolerates (fewer for short words)."""
+    return min(MAX_DISTANCE, max(0, (len(word) - 1) // 3))
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Return the optimal string alignment distance between a and b.
+
+    Insertions, deletions, substitutions and adjacent transpositions cost
+    one each. Returns max_distance + 1 as soon as the distance must exceed
+    max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return min(previous[len(b)], max_distance + 1)
+
+
+def deletion_variants(word: str, max_distance: int) -> Set[str]:
+    """Return word's prefix with up to max_distance characters deleted (itself included)."""
+    variants = {word[:PREFIX_LENGTH]}
+    frontier = set(variants)
+    for _ in range(max_distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        frontier -= variants
+        variants |= frontier
+    return variants
+
+
+# ---------------------------------------------------------------------------
+# Build / load / save
+# ---------------------------------------------------------------------------
+
+def vocabulary(records: Iterable[Dict]) -> Dict[str, Dict[str, int]]:
+    """Count entries per lowercased tag and per title word."""
+    counts: Dict[str, Dict[str, int]] = {kind: {} for kind in KINDS}
+    for record in records:
+        fm = record["frontmatter"]
+        if fm is None:
+            continue
+        tags = fm.get("tags", [])
+        if not isinstance(tags, list):
+            tags = [tags] if tags else []
+        for tag in {str(t).lower() for t in tags}:
+            counts["tag"][tag] = counts["tag"].get(tag, 0) + 1
+        for word in set(tokenize(str(fm.get("title", Path(record["path"]).stem)))):
+            counts["word"][word] = counts["word"].get(word, 0) + 1
+    return counts
+
+
+def build_fuzzy_index(records: Iterable[Dict], signature: str) -> Dict:
+    """Build the deletion index over the vocabulary of records."""
+    index: Dict = {"version": FUZZY_VERSION, "signature": signature}
+    for kind, terms in vocabulary(records).items():
+        deletes: Dict[str, List[str]] = {}
+        for term in sorted(terms):
+            for variant in deletion_variants(term, MAX_DISTANCE):
+                deletes.setdefault(variant, []).append(term)
+        index[kind] = {"terms": terms, "deletes": deletes}
+    return index
+
+
+def load_fuzzy_index(root: Path, signature: str) -> Optional[Dict]:
+    """Load the persisted index if it matches signature, else None."""
+    try:
+        data = json.loads((get_cache_dir(root) / FUZZY_FILE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != FUZZY_VERSION or data.get("signature") != signature:
+        return None
+    return data
+
+
+def save_fuzzy_index(root: Path, index: Dict) -> None:
+    """Persist the index. Failures (read-only checkout) are ignored."""
+    try:
+        atomic_write_text(get_cache_dir(root) / FUZZY_FILE_NAME,
+                          json.dumps(index, ensure_ascii=False, separators=(",", ":")))
+    except OSError:
+        pass
+
+
+@timed("index")
+def ensure_fuzzy_index(
+    root: Path,
+    scanned: Optional[List[Tuple[Path, Dict]]] = None,
+    stats: Optional[Dict[str, List[int]]] = None,
+) -> Dict:
+    """Return the index for the current entries, rebuilding it if they changed."""
+    if scanned is None or stats is None:
+        scanned, stats = scan_state(root)
+    signature = corpus_signature(stats)
+    index = load_fuzzy_index(root, signature) if cache_enabled() else None
+    if index is None:
+        index = build_fuzzy_index((record for _, record in scanned), signature)
+        if cache_enabled():
+            save_fuzzy_index(root, index)
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Lookup
+# ---------------------------------------------------------------------------
+
+def is_known(index: Dict, kind: str, word: str) -> bool:
+    """Return True if word is exactly a known tag / title word."""
+    return word.lower() in index[kind]["terms"]
+
+
+def suggest(
+    index: Dict, kind: str, word: str, max_distance: Optional[int] = None, limit: int = MAX_SUGGESTIONS,
+) -> List[Tuple[str, int, int]]:
+    """Return known terms within max_distance edits of word.
+
+    max_distance defaults to allowed_distance(word). Results are
+    (term, distance, entry count), closest first, then most used.
+    """
+    word = word.lower()
+    if max_distance is None:
+        max_distance = allowed_distance(word)
+    terms = index[kind]["terms"]
+    deletes = index[kind]["deletes"]
+
+    seen: Set[str] = set()
+    results: List[Tuple[str, int, int]] = []
+    for variant in deletion_variants(word, max_distance):
+        for term in deletes.get(variant, ()):
+            if term in seen:
+                continue
+            seen.add(term)
+            distance = edit_distance(word, term, max_distance)
+            if distance <= max_distance:
+                results.append((term, distance, terms[term]))
+    results.sort(key=lambda item: (item[1], -item[2], item[0]))
+    return results[:limit]
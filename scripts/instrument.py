@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Named timing spans shared by the scripts, and their --profile option.
+
+Functions that make up a script's phases are wrapped in spans:
+
+  scan      listing entries/, stat calls and metadata cache lookups
+  read      reading whole files
+  parse     parsing entries (entry_parser), including the lazy reads of
+            read_header()
+  validate  schema checks (validate.py)
+  render    building report, index or search output text
+  write     writing output and cache files
+
+plus a few script-specific ones (index, search, dedupe, git, ...). Spans
+nest; each span's time excludes the spans opened inside it, so the phases
+of a run add up to its wall time. Work done on a process pool is counted
+in the span that waits for it (for example parse around iter_scan()'s
+pool of cache misses). Files read through entry_parser are counted too,
+except reads made inside pool workers.
+
+Nothing is recorded unless a script enables profiling or telemetry (see
+telemetry.py): span() then returns a shared no-op context manager and
+timed() wrappers cost one extra call.
+
+--profile prints a table of the phases to stderr when the script exits.
+--profile-cprofile FILE also runs cProfile and writes its stats to FILE
+(read them with `python -m pstats FILE`); --profile-memory also traces
+allocations with tracemalloc and reports the peak. Both slow the run down.
+
+Usage (as a library):
+    from instrument import add_profile_argument, span, start_profile, timed
+
+    @timed("render")
+    def render(...): ...
+
+    with span("scan"):
+        ...
+"""
+
+import argparse
+import atexit
+import functools
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, TextIO, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+class Recorder:
+    """Self time and call count per span name for one run, plus read counters."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.stack: List["Span"] = []
+        self.files_read = 0
+        self.bytes_read = 0
+        self.entries: Optional[int] = None
+
+
+class Span:
+    """Context manager adding its self time to a Recorder under its name."""
+
+    __slots__ = ("recorder", "name", "begin", "children")
+
+    def __init__(self, recorder: Recorder, name: str) -> None:
+        self.recorder = recorder
+        self.name = name
+        self.begin = 0.0
+        self.children = 0.0
+
+    def __enter__(self) -> "Span":
+        self.recorder.stack.append(self)
+        self.begin = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        elapsed = time.perf_counter() - self.begin
+        recorder = self.recorder
+        recorder.stack.pop()
+        recorder.seconds[self.name] = recorder.seconds.get(self.name, 0.0) + elapsed - self.children
+        recorder.calls[self.name] = recorder.calls.get(self.name, 0) + 1
+        if recorder.stack:
+            recorder.stack[-1].children += elapsed
+        return False
+
+
+class NullSpan:
+    """The context manager span() returns while nothing is recorded."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+
+NULL_SPAN = NullSpan()
+_recorder: Optional[Recorder] = None
+
+
+def span(name: str):
+    """Return a context manager timing its block as phase `name`."""
+    recorder = _recorder
+    if recorder is None:
+        return NULL_SPAN
+    return Span(recorder, name)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorate a function so each call is timed as phase `name`."""
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            recorder = _recorder
+            if recorder is None:
+                return fn(*args, **kwargs)
+            with Span(recorder, name):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorate
+
+
+def count_read(nbytes: int) -> None:
+    """Count one file read of nbytes bytes (see entry_parser.read_text())."""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.files_read += 1
+        recorder.bytes_read += nbytes
+
+
+def record_entries(count: int) -> None:
+    """Remember how many entries the run's latest scan found."""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.entries = count
+
+
+def start_recording() -> Recorder:
+    """Start recording spans for the rest of the run and return the recorder."""
+    global _recorder
+    if _recorder is None:
+        _recorder = Recorder()
+    return _recorder
+
+
+# ---------------------------------------------------------------------------
+# --profile
+# ---------------------------------------------------------------------------
+
+def add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the shared --profile options to a script's argument parser."""
+    parser.add_argument("--profile", action="store_true",
+                        help="Print time per phase (scan, read, parse, ...) to stderr on exit")
+    parser.add_argument("--profile-cprofile", metavar="FILE",
+                        help="With --profile: also run cProfile and write its stats to FILE")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="With --profile: also trace allocations and report the peak")
+
+
+def format_profile(recorder: Recorder, wall: float) -> str:
+    """Return the phase table: self time, calls and share of the wall time."""
+    lines = [f"Profile: {wall:.3f} s wall", f"  {'phase':<12} {'calls':>8} {'seconds':>9} {'share':>7}"]
+    accounted = 0.0
+    for name, seconds in sorted(recorder.seconds.items(), key=lambda item: -item[1]):
+        accounted += seconds
+        lines.append(f"  {name:<12} {recorder.calls[name]:>8} {seconds:>9.3f} {seconds / wall if wall else 0:>7.1%}")
+    other = max(wall - accounted, 0.0)
+    lines.append(f"  {'(other)':<12} {'':>8} {other:>9.3f} {other / wall if wall else 0:>7.1%}")
+    lines.append(f"Read {recorder.files_read} files, {recorder.bytes_read / 1024 / 1024:.1f} MiB")
+    return "\n".join(lines)
+
+
+def start_profile(args: argparse.Namespace, out: TextIO = sys.stderr) -> None:
+    """Start profiling if --profile was given; the report is printed at exit."""
+    if not getattr(args, "profile", False):
+        return
+    recorder = start_recording()
+    profiler = None
+    if args.profile_cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+    if args.profile_memory:
+        import tracemalloc
+        tracemalloc.start()
+
+    def report() -> None:
+        wall = time.perf_counter() - recorder.started
+        if profiler is not None:
+            profiler.disable()
+        lines = [format_profile(recorder, wall)]
+        if args.profile_memory:
+            import tracemalloc
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines.append(f"tracemalloc peak: {peak / 1024 / 1024:.1f} MiB")
+        if profiler is not None:
+            try:
+                profiler.dump_stats(args.profile_cprofile)
+                lines.append(f"cProfile stats written to {args.profile_cprofile} "
+                             f"(python -m pstats {args.profile_cprofile})")
+            except OSError as e:
+                lines.append(f"ERROR: cannot write {args.profile_cprofile}: {e}")
+        print("\n".join(lines), file=out)
+
+    atexit.register(report)
+    if profiler is not None:
+        profiler.enable()
@@ -14,12 +14,17 @@ Usage:
 
 import argparse
 import difflib
+import math
 import re
 import sys
 from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 
+from entry_cache import add_jobs_argument, scan
+from instrument import add_profile_argument, start_profile, timed
+from telemetry import start_telemetry
+
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -29,6 +34,9 @@ KEBAB_RE = re.compile(r"^[a-z0-9]+(-[a-z0-9]+)*$")
 MIN_TAGS = 2
 MAX_TAGS = 7
 NEAR_DUP_RATIO = 0.85
+# Character-count signature layout (see char_signature)
+SIGNATURE_BUCKETS = 32
+SIGNATURE_WIDTH = 4
 
 
 def get_root() -> Path:
@@ -36,65 +44,6 @@ def get_root() -> Path:
     return Path(__file__).resolve().parent.parent
 
 
-# ---------------------------------------------------------------------------
-# YAML frontmatter parser (pattern from validate.py)
-# ---------------------------------------------------------------------------
-
-def parse_frontmatter(text: str) -> Tuple[Optional[Dict], List[str]]:
-    """Parse YAML frontmatter between --- markers.
-
-    Returns (parsed_dict_or_None, list_of_parse_errors).
-    """
-    errors: List[str] = []
-    lines = text.split("\n")
-
-    if not lines or lines[0].strip() != "---":
-        return None, ["No YAML frontmatter found (file must start with ---)"]
-
-    end_idx = None
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            end_idx = i
-            break
-
-    if end_idx is None:
-        return None, ["YAML frontmatter not closed (missing closing ---)"]
-
-    fm_lines = lines[1:end_idx]
-    data: Dict = {}
-
-    for line in fm_lines:
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
-
-        match = re.match(r"^(\w[\w-]*)\s*:\s*(.*)", line)
-        if not match:
-            continue
-
-        key = match.group(1).strip()
-        raw_value = match.group(2).strip()
-
-        if raw_value.startswith("[") and raw_value.endswith("]"):
-            inner = raw_value[1:-1].strip()
-            if inner:
-                items = [item.strip().strip("'\"") for item in inner.split(",")]
-                data[key] = [item for item in items if item]
-            else:
-                data[key] = []
-        elif (raw_value.startswith('"') and raw_value.endswith('"')) or \
-             (raw_value.startswith("'") and raw_value.endswith("'")):
-            data[key] = raw_value[1:-1]
-        else:
-            comment_match = re.match(r"^([^#]+?)(?:\s+#.*)?$", raw_value)
-            if comment_match:
-                data[key] = comment_match.group(1).strip()
-            else:
-                data[key] = raw_value
-
-    return data, errors
-
-
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -107,12 +56,11 @@ def to_kebab_case(tag: str) -> str:
     return tag.strip("-")
 
 
-def load_entries(root: Path) -> List[Tuple[Path, List[str]]]:
+def load_entries(root: Path, jobs: Optional[int] = None) -> List[Tuple[Path, List[str]]]:
     """Return list of (path, tags) for every .md file under entries/."""
     results = []
-    for path in sorted((root / "entries").rglob("*.md")):
-        text = path.read_text(encoding="utf-8")
-        fm, _ = parse_frontmatter(text)
+    for path, record in scan(root, jobs=jobs):
+        fm = record["frontmatter"]
         if fm is None:
             continue
         raw = fm.get("tags", [])
@@ -121,6 +69,7 @@ def load_entries(root: Path) -> List[Tuple[Path, List[str]]]:
     return results
 
 
+@timed("write")
 def fix_tags_in_file(path: Path, new_tags: List[str]) -> None:
     """Rewrite the tags: line in-place, preserving all other content."""
     text = path.read_text(encoding="utf-8")
@@ -132,32 +81,167 @@ def fix_tags_in_file(path: Path, new_tags: List[str]) -> None:
     path.write_text(new_text, encoding="utf-8")
 
 
-def find_near_duplicates(all_tags: Set[str]) -> List[Tuple[str, str, str]]:
-    """Return (tag_a, tag_b, reason) for near-duplicate pairs."""
-    tag_list = sorted(all_tags)
-    pairs: List[Tuple[str, str, str]] = []
-    seen: Set[Tuple[str, str]] = set()
-
-    for i, a in enumerate(tag_list):
-        for b in tag_list[i + 1:]:
-            key = (a, b)
-            if key in seen:
+def near_duplicate_reason(a: str, b: str) -> Optional[str]:
+    """Return why two tags look like near-duplicates, or None."""
+    if a + "s" == b or b + "s" == a:
+        return "plural/singular"
+    if len(a) >= 3 and len(b) >= 3 and (a in b or b in a):
+        return "substring"
+    matcher = difflib.SequenceMatcher(None, a, b)
+    if matcher.real_quick_ratio() < NEAR_DUP_RATIO or matcher.quick_ratio() < NEAR_DUP_RATIO:
+        return None
+    ratio = matcher.ratio()
+    if ratio >= NEAR_DUP_RATIO:
+        return f"similar (ratio={ratio:.2f})"
+    return None
+
+
+def max_edits(short_len: int, long_len: int) -> int:
+    """Return the most edits two tags of these lengths can differ by and
+    still reach NEAR_DUP_RATIO (negative if the lengths alone rule it out).
+
+    SequenceMatcher.ratio() is 2*M/T with M matched characters and T the
+    combined length. M is at most the longest common subsequence, so the
+    tags are within T - 2*M insertions and deletions of each other.
+    """
+    min_matched = math.ceil(NEAR_DUP_RATIO * (short_len + long_len) / 2 - 1e-9)
+    if min_matched > short_len:
+        return -1
+    return short_len + long_len - 2 * min_matched
+
+
+def segments(length: int, parts: int) -> List[Tuple[int, int]]:
+    """Split a tag length into `parts` contiguous (start, size) segments."""
+    size, extra = divmod(length, parts)
+    result = []
+    start = 0
+    for i in range(parts):
+        part = size + (1 if i >= parts - extra else 0)
+        result.append((start, part))
+        start += part
+    return result
+
+
+def char_signature(tag: str) -> int:
+    """Return the tag's character counts as a bitset.
+
+    Each character hashes to one of SIGNATURE_BUCKETS fields of
+    SIGNATURE_WIDTH bits, and a count of n sets the field's lowest n bits.
+    The popcount of two signatures XORed is then a lower bound on the
+    characters the tags do not have in common: merging characters into
+    buckets and capping counts can only hide differences.
+    """
+    counts: Dict[int, int] = defaultdict(int)
+    for char in tag:
+        counts[ord(char) % SIGNATURE_BUCKETS] += 1
+    signature = 0
+    for bucket, count in counts.items():
+        signature |= ((1 << min(count, SIGNATURE_WIDTH)) - 1) << (bucket * SIGNATURE_WIDTH)
+    return signature
+
+
+def similar_candidates(tags: List[str]) -> Set[Tuple[str, str]]:
+    """Return the tag pairs that may reach NEAR_DUP_RATIO (partition filter).
+
+    If two tags are within k edits, splitting the shorter one into k + 1
+    segments leaves at least one segment untouched, and the first such
+    segment appears in the longer tag at a position bounded by the edits
+    before and after it (multi-match-aware selection from Pass-Join). Tags
+    are indexed by their segments, shortest first; each tag probes the index
+    with its own substrings at those positions, and the tags found are kept
+    if their character counts differ by at most k. Pairs are returned as
+    (smaller, larger).
+    """
+    by_length: Dict[int, List[str]] = defaultdict(list)
+    for tag in tags:
+        if tag:
+            by_length[len(tag)].append(tag)
+    signatures = {tag: char_signature(tag) for tag in tags}
+
+    index: Dict[Tuple[int, int, int, str], List[str]] = defaultdict(list)
+    unsegmented: Dict[Tuple[int, int], List[str]] = defaultdict(list)
+    candidates: Set[Tuple[str, str]] = set()
+
+    for length in sorted(by_length):
+        # Probe windows per shorter length: the first untouched segment has
+        # at most `part` edits before it and at most k - part after it
+        probes = []
+        for short_len in range(1, length + 1):
+            k = max_edits(short_len, length)
+            if short_len not in by_length or k < 0:
                 continue
-            seen.add(key)
-
-            if a + "s" == b or b + "s" == a:
-                reason = "plural/singular"
-            elif len(a) >= 3 and len(b) >= 3 and (a in b or b in a):
-                reason = "substring"
-            else:
-                ratio = difflib.SequenceMatcher(None, a, b).ratio()
-                if ratio >= NEAR_DUP_RATIO:
-                    reason = f"similar (ratio={ratio:.2f})"
-                else:
+            shift = length - short_len
+            windows = [
+                (part, size, max(0, start - part, start + shift - (k - part)),
+                 min(length - size, start + part, start + shift + (k - part)))
+                for part, (start, size) in enumerate(segments(short_len, k + 1) if k < short_len else ())
+            ]
+            probes.append((short_len, k, windows))
+        own_segments = []
+        for k in {max_edits(length, long_len) for long_len in range(length, 2 * length + 1)}:
+            if k >= 0:
+                own_segments.append((k, segments(length, k + 1) if k < length else None))
+
+        for tag in by_length[length]:
+            signature = signatures[tag]
+            for short_len, k, windows in probes:
+                found = set(unsegmented.get((short_len, k), ()))
+                for part, size, low, high in windows:
+                    for pos in range(low, high + 1):
+                        found.update(index.get((short_len, k, part, tag[pos:pos + size]), ()))
+                for other in found:
+                    if bin(signature ^ signatures[other]).count("1") <= k:
+                        candidates.add((other, tag) if other < tag else (tag, other))
+
+            for k, parts in own_segments:
+                if parts is None:
+                    # Too short to split into k + 1 segments: compare with every partner
+                    unsegmented[(length, k)].append(tag)
                     continue
+                for part, (start, size) in enumerate(parts):
+                    index[(length, k, part, tag[start:start + size])].append(tag)
+    return candidates
+
+
+def substring_candidates(tags: List[str]) -> Set[Tuple[str, str]]:
+    """Return (smaller, larger) pairs where one tag is the other plus "s"
+    or a substring of it (both at least 3 characters)."""
+    tag_set = set(tags)
+    lengths = sorted({len(tag) for tag in tags if len(tag) >= 3})
+    candidates: Set[Tuple[str, str]] = set()
+    for tag in tags:
+        found = set()
+        if tag + "s" in tag_set:
+            found.add(tag + "s")
+        for length in lengths:
+            if length >= len(tag):
+                break
+            for start in range(len(tag) - length + 1):
+                part = tag[start:start + length]
+                if part in tag_set:
+                    found.add(part)
+        for other in found:
+            candidates.add((other, tag) if other < tag else (tag, other))
+    return candidates
+
+
+@timed("lint")
+def find_near_duplicates(all_tags: Set[str]) -> List[Tuple[str, str, str]]:
+    """Return (tag_a, tag_b, reason) for near-duplicate pairs, sorted by pair.
 
-            pairs.append((a, b, reason))
+    Comparing every pair is quadratic in the number of tags, so pairs are
+    first narrowed to plural/substring hits and to pairs close enough in
+    edit distance to reach the similarity ratio; only those get the full
+    check.
+    """
+    tag_list = sorted(all_tags)
+    candidates = substring_candidates(tag_list) | similar_candidates(tag_list)
 
+    pairs: List[Tuple[str, str, str]] = []
+    for a, b in sorted(candidates):
+        reason = near_duplicate_reason(a, b)
+        if reason is not None:
+            pairs.append((a, b, reason))
     return pairs
 
 
@@ -165,9 +249,9 @@ def find_near_duplicates(all_tags: Set[str]) -> List[Tuple[str, str, str]]:
 # Lint runner
 # ---------------------------------------------------------------------------
 
-def lint(root: Path, fix: bool) -> int:
+def lint(root: Path, fix: bool, jobs: Optional[int] = None) -> int:
     """Run all tag lint checks. Returns 0 if clean, 1 if issues found."""
-    entries = load_entries(root)
+    entries = load_entries(root, jobs)
     if not entries:
         print("No entries found.")
         return 0
@@ -301,14 +385,18 @@ Near-duplicates, orphans, and count issues are reported only (manual review).
         action="store_true",
         help="Auto-fix non-kebab-case tags in place (other issues: report only)",
     )
+    add_jobs_argument(parser)
+    add_profile_argument(parser)
     args = parser.parse_args()
+    start_profile(args)
 
     root = get_root()
+    start_telemetry(root, "lint_tags")
     if not (root / "entries").is_dir():
         print(f"ERROR: entries/ directory not found at {root / 'entries'}", file=sys.stderr)
         return 1
 
-    return lint(root, fix=args.fix)
+    return lint(root, fix=args.fix, jobs=args.jobs)
 
 
 if __name__ == "__main__":
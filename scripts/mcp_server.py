@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""Stdio MCP server giving agents direct access to the knowledge base.
+
+Agents otherwise shell out to search.py or read all of index.md. This server
+keeps the parsed corpus and the search indexes in memory (the same warm
+state as serve.py) and exposes them as MCP tools:
+
+  - search           : ranked / filtered search, same options as search.py
+  - get_entry        : one entry's markdown, or a single ## section of it
+  - list_tags        : tags with entry counts, optionally by prefix
+  - list_facets      : entry counts per domain, type and confidence
+  - related_entries  : entries linked through `related:` (both directions)
+
+Messages are newline-delimited JSON-RPC 2.0 on stdin/stdout (the MCP stdio
+transport); diagnostics go to stderr. Before each tool call the server
+re-checks entry stat keys (at most every REFRESH_INTERVAL seconds) and
+reloads its state if entries changed.
+
+Usage:
+    python scripts/mcp_server.py     # started by the MCP client, see config/claude-code/mcp-servers.json
+"""
+
+import argparse
+import io
+import json
+import sys
+import time
+import traceback
+from collections import Counter, deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from entry_cache import stat_entries
+from entry_parser import parse_entry
+from search import SEARCH_FIELDS, get_root, load_state, run_search
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+SERVER_NAME = "knowledge-framework"
+SERVER_VERSION = "1.0.0"
+PROTOCOL_VERSION = "2024-11-05"
+REFRESH_INTERVAL = 2.0
+MAX_RELATED_DEPTH = 3
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+FILTER_PROPERTIES = {
+    "tag": {"type": "string", "description": "Only entries with this tag"},
+    "domain": {"type": "string", "description": "Only entries in this domain"},
+    "type": {"type": "string", "description": "Only entries of this type"},
+    "confidence": {"type": "string", "description": "Only entries with this confidence level"},
+}
+
+TOOLS = [
+    {
+        "name": "search",
+        "description": "Search knowledge entries. `query` ranks by BM25 over title, tags and body; "
+                       "the other arguments filter. Returns title, path, tags and problem summary per hit.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Free-text query, ranked best first"},
+                **FILTER_PROPERTIES,
+                "where": {"type": "string",
+                          "description": "Boolean filter, e.g. tag:edfa AND (tag:kafka OR domain:devops) NOT confidence:low"},
+                "substring": {"type": "string", "description": "Case-insensitive exact substring"},
+                "regex": {"type": "string", "description": "Case-insensitive regular expression"},
+                "limit": {"type": "integer", "description": "Maximum ranked results (default 10, 0 = all)"},
+                "facets": {"type": "boolean",
+                           "description": "Also return match counts per domain, type, confidence and co-occurring tag"},
+                "fuzzy": {"type": "boolean",
+                          "description": "Also match tags and query title words within a few typos"},
+                "semantic": {"type": "boolean",
+                             "description": "Rank `query` by meaning instead of shared words (needs NumPy)"},
+            },
+        },
+    },
+    {
+        "name": "get_entry",
+        "description": "Return an entry's markdown, or only one of its ## sections (e.g. Recipe).",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "entry": {"type": "string", "description": "Entry path (entries/...) or slug (file name without .md)"},
+                "section": {"type": "string", "description": "Section heading to return instead of the whole entry"},
+            },
+            "required": ["entry"],
+        },
+    },
+    {
+        "name": "list_tags",
+        "description": "List tags with the number of entries using each, most used first.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "prefix": {"type": "string", "description": "Only tags starting with this prefix"},
+                "limit": {"type": "integer", "description": "Maximum tags to list (default: all)"},
+            },
+        },
+    },
+    {
+        "name": "list_facets",
+        "description": "Count entries per domain, type and confidence level.",
+        "inputSchema": {"type": "object", "properties": {}},
+    },
+    {
+        "name": "related_entries",
+        "description": "Expand an entry's `related:` links (and entries linking to it), breadth first.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "entry": {"type": "string", "description": "Entry path (entries/...) or slug"},
+                "depth": {"type": "integer", "description": f"Link hops to follow (default 1, max {MAX_RELATED_DEPTH})"},
+            },
+            "required": ["entry"],
+        },
+    },
+]
+
+
+class ToolError(Exception):
+    """Raised by a tool for a caller mistake; reported as an isError result."""
+
+
+# ---------------------------------------------------------------------------
+# Corpus state
+# ---------------------------------------------------------------------------
+
+class Corpus:
+    """Warm search state plus lookup tables, reloaded when entries change."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.checked = 0.0
+        self.reload()
+
+    def reload(self) -> None:
+        """Rescan entries and rebuild the lookup tables."""
+        self.state = load_state(self.root, warm=True)
+        self.records: Dict[str, Dict] = {
+            record["path"]: record for _, record in self.state["scanned"]
+            if record["frontmatter"] is not None
+        }
+        self.slugs = {Path(rel_path).stem: rel_path for rel_path in self.records}
+        self.checked = time.monotonic()
+
+    def refresh(self) -> None:
+        """Reload if an entry changed since the last check (rate-limited)."""
+        if time.monotonic() - self.checked < REFRESH_INTERVAL:
+            return
+        if stat_entries(self.root) != self.state["stats"]:
+            self.reload()
+            print(f"[{SERVER_NAME}] reloaded {len(self.records)} entries", file=sys.stderr)
+        self.checked = time.monotonic()
+
+    def resolve(self, entry: str) -> str:
+        """Return the relative path for an entry path or slug."""
+        entry = entry.strip()
+        if entry in self.records:
+            return entry
+        slug = Path(entry).stem
+        if slug in self.slugs:
+            return self.slugs[slug]
+        raise ToolError(f"No entry found for '{entry}'")
+
+
+def check_arguments(tool: str, arguments) -> Dict:
+    """Check tool arguments against the tool's inputSchema and convert them.
+
+    Numbers given for strings become strings and integer strings become
+    integers; anything else of the wrong type, and missing required
+    arguments, raise ToolError. Unknown arguments are dropped.
+    """
+    if not isinstance(arguments, dict):
+        raise ToolError("arguments must be an object")
+    schema = next(t["inputSchema"] for t in TOOLS if t["name"] == tool)
+    checked: Dict = {}
+    for name, spec in schema["properties"].items():
+        value = arguments.get(name)
+        if value is None:
+            continue
+        kind = spec["type"]
+        if kind == "string":
+            if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+                raise ToolError(f"{name} must be a string")
+            value = str(value)
+        elif kind == "integer":
+            if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+                value = int(value)
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ToolError(f"{name} must be an integer")
+        elif kind == "boolean" and not isinstance(value, bool):
+            raise ToolError(f"{name} must be true or false")
+        checked[name] = value
+    missing = [name for name in schema.get("required", ()) if name not in checked]
+    if missing:
+        raise ToolError(f"Missing required argument: {', '.join(missing)}")
+    return checked
+
+
+def as_list(value) -> List[str]:
+    """Return a frontmatter list field as a list of strings."""
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [str(value)] if value else []
+
+
+# ---------------------------------------------------------------------------
+# Tools
+# ---------------------------------------------------------------------------
+
+def tool_search(corpus: Corpus, params: Dict) -> str:
+    """Run search.py's files-backend search against the warm state."""
+    args = argparse.Namespace(**{name: params.get(name) for name in SEARCH_FIELDS})
+    if args.limit is None:
+        args.limit = 10
+    if not any(getattr(args, name) is not None for name in SEARCH_FIELDS if name not in ("limit", "facets", "fuzzy", "semantic")):
+        raise ToolError("Give a query or at least one filter")
+    out, err = io.StringIO(), io.StringIO()
+    run_search(corpus.root, args, corpus.state, out, err)
+    if err.getvalue():
+        raise ToolError(err.getvalue().strip())
+    return out.getvalue().rstrip("\n")
+
+
+def tool_get_entry(corpus: Corpus, params: Dict) -> str:
+    """Return an entry's text, or the lines of one ## section."""
+    rel_path = corpus.resolve(str(params.get("entry", "")))
+    text = (corpus.root / rel_path).read_text(encoding="utf-8")
+    section = params.get("section")
+    if not section:
+        return text
+
+    parsed = parse_entry(text)
+    lines = text.split("\n")
+    headings = parsed["sections"]
+    for i, (name, line) in enumerate(headings):
+        if name.lower() == str(section).strip().lower():
+            end = headings[i + 1][1] if i + 1 < len(headings) else len(lines)
+            return "\n".join(lines[line:end]).rstrip() + "\n"
+    available = ", ".join(name for name, _ in headings)
+    raise ToolError(f"No section '{section}' in {rel_path}. Sections: {available}")
+
+
+def tool_list_tags(corpus: Corpus, params: Dict) -> str:
+    """Return tab-separated tag and entry count lines."""
+    counts: Counter = Counter()
+    for record in corpus.records.values():
+        counts.update(set(as_list(record["frontmatter"].get("tags"))))
+    prefix = str(params.get("prefix") or "").lower()
+    tags = sorted(((tag, n) for tag, n in counts.items() if tag.lower().startswith(prefix)),
+                  key=lambda item: (-item[1], item[0]))
+    limit = params.get("limit")
+    if isinstance(limit, int) and limit > 0:
+        tags = tags[:limit]
+    if not tags:
+        return "No matching tags."
+    return "\n".join(f"{tag}\t{n}" for tag, n in tags)
+
+
+def tool_list_facets(corpus: Corpus, params: Dict) -> str:
+    """Return entry counts per domain, type and confidence."""
+    lines = [f"Total entries: {len(corpus.records)}"]
+    for facet in ("domain", "type", "confidence"):
+        counts = Counter(str(record["frontmatter"].get(facet) or "(unset)") for record in corpus.records.values())
+        lines.append("")
+        lines.append(f"{facet}:")
+        for value, n in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+            lines.append(f"  {value}\t{n}")
+    return "\n".join(lines)
+
+
+def tool_related_entries(corpus: Corpus, params: Dict) -> str:
+    """Return entries within `depth` related-link hops, nearest first."""
+    start = corpus.resolve(str(params.get("entry", "")))
+    depth = params.get("depth", 1)
+    if not isinstance(depth, int) or depth < 1:
+        raise ToolError("depth must be a positive integer")
+    depth = min(depth, MAX_RELATED_DEPTH)
+
+    # Links are undirected: A lists B, or B lists A
+    links: Dict[str, set] = {rel_path: set() for rel_path in corpus.records}
+    for rel_path, record in corpus.records.items():
+        for slug in as_list(record["frontmatter"].get("related")):
+            target = corpus.slugs.get(slug)
+            if target is not None and target != rel_path:
+                links[rel_path].add(target)
+                links[target].add(rel_path)
+
+    seen = {start: 0}
+    queue = deque([start])
+    while queue:
+        current = queue.popleft()
+        if seen[current] == depth:
+            continue
+        for neighbour in sorted(links[current]):
+            if neighbour not in seen:
+                seen[neighbour] = seen[current] + 1
+                queue.append(neighbour)
+
+    related = sorted((hops, rel_path) for rel_path, hops in seen.items() if hops > 0)
+    if not related:
+        return f"No related entries for {start}."
+    lines = []
+    for hops, rel_path in related:
+        fm = corpus.records[rel_path]["frontmatter"]
+        lines.append(f"[{hops}] {fm.get('title', Path(rel_path).stem)} -- {rel_path} "
+                     f"(tags: {', '.join(as_list(fm.get('tags')))})")
+    return "\n".join(lines)
+
+
+TOOL_HANDLERS: Dict[str, Callable[[Corpus, Dict], str]] = {
+    "search": tool_search,
+    "get_entry": tool_get_entry,
+    "list_tags": tool_list_tags,
+    "list_facets": tool_list_facets,
+    "related_entries": tool_related_entries,
+}
+
+
+# ---------------------------------------------------------------------------
+# JSON-RPC
+# ---------------------------------------------------------------------------
+
+def error_response(msg_id, code: int, message: str) -> Dict:
+    """Build a JSON-RPC error response."""
+    return {"jsonrpc": "2.0", "id": msg_id, "error": {"code": code, "message": message}}
+
+
+def call_tool(corpus: Corpus, name: str, arguments) -> Dict:
+    """Run a known tool; caller mistakes and tool failures become isError results."""
+    try:
+        checked = check_arguments(name, arguments or {})
+        corpus.refresh()
+        text = TOOL_HANDLERS[name](corpus, checked)
+        is_error = False
+    except ToolError as e:
+        text, is_error = str(e), True
+    except Exception as e:
+        # A bug in one tool must not take the server down
+        traceback.print_exc(file=sys.stderr)
+        text, is_error = f"Internal error in {name}: {type(e).__name__}: {e}", True
+    return {"content": [{"type": "text", "text": text}], "isError": is_error}
+
+
+def handle_message(corpus: Corpus, message: Dict) -> Optional[Dict]:
+    """Return the response for one JSON-RPC message (None for notifications)."""
+    msg_id = message.get("id")
+    method = message.get("method")
+    params = message.get("params") or {}
+    if msg_id is None:
+        return None  # notifications (initialized, cancelled) need no answer
+    if not isinstance(params, dict):
+        return error_response(msg_id, INVALID_PARAMS, "params must be an object")
+
+    if method == "initialize":
+        result = {
+            "protocolVersion": params.get("protocolVersion", PROTOCOL_VERSION),
+            "capabilities": {"tools": {}},
+            "serverInfo": {"name": SERVER_NAME, "version": SERVER_VERSION},
+        }
+    elif method == "ping":
+        result = {}
+    elif method == "tools/list":
+        result = {"tools": TOOLS}
+    elif method == "tools/call":
+        name = params.get("name")
+        if not isinstance(name, str) or name not in TOOL_HANDLERS:
+            return error_response(msg_id, INVALID_PARAMS, f"Unknown tool: {name}")
+        result = call_tool(corpus, name, params.get("arguments"))
+    else:
+        return error_response(msg_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+    return {"jsonrpc": "2.0", "id": msg_id, "result": result}
+
+
+def serve(corpus: Corpus, stdin=sys.stdin, stdout=sys.stdout) -> None:
+    """Answer newline-delimited JSON-RPC messages until stdin closes."""
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            message = json.loads(line)
+        except ValueError:
+            response: Optional[Dict] = error_response(None, PARSE_ERROR, "Parse error")
+        else:
+            if isinstance(message, dict):
+                try:
+                    response = handle_message(corpus, message)
+                except Exception as e:
+                    traceback.print_exc(file=sys.stderr)
+                    response = error_response(message.get("id"), INTERNAL_ERROR, f"Internal error: {e}")
+            else:
+                response = error_response(None, INVALID_REQUEST, "Invalid request")
+        if response is not None:
+            stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+            stdout.flush()
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main() -> int:
+    argparse.ArgumentParser(
+        description="Stdio MCP server exposing knowledge base search and entry tools.",
+    ).parse_args()
+
+    corpus = Corpus(get_root())
+    print(f"[{SERVER_NAME}] serving {len(corpus.records)} entries on stdio", file=sys.stderr)
+    try:
+        serve(corpus)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
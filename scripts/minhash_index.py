@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""MinHash signatures and an LSH band index for near-duplicate entries.
+
+curate.py only catches a duplicate when two titles slugify alike. This
+module compares entry bodies instead: each body becomes the set of its
+SHINGLE_SIZE-word shingles, summarized by a NUM_BINS-value MinHash
+signature. The fraction of equal signature values estimates the Jaccard
+similarity of two shingle sets.
+
+Signatures use one-permutation hashing: every shingle is hashed once and
+kept as the minimum of the bin its hash falls in, so a signature costs one
+hash per shingle rather than one per bin. Each empty bin copies the value
+of the first filled bin along its own fixed pseudo-random probe order
+(Shrivastava's optimal densification); short bodies fill few bins, and
+independent probe orders keep their estimates from hinging on one shingle.
+
+For lookup the signature is cut into BANDS bands of ROWS values. Entries
+sharing any whole band are candidates, so a draft is only compared with
+the few entries that landed in one of its band buckets instead of with the
+whole corpus. Pairs at the DUPLICATE_THRESHOLD Jaccard share a band with
+probability 1 - (1 - 0.5**3)**32, about 0.99.
+
+Signatures are cached in .kf_cache/minhash.json by entry stat key, so only
+new or changed entries are read to update them.
+
+Usage (as a library):
+    from minhash_index import build_lsh, find_similar, text_signature
+"""
+
+import base64
+import hashlib
+import json
+import random
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from entry_cache import atomic_write_text, cache_enabled, get_cache_dir
+from entry_parser import read_entry
+from instrument import timed
+from search_index import tokenize
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+MINHASH_FILE_NAME = "minhash.json"
+# Bump when shingling, hashing or the signature layout change
+MINHASH_VERSION = 2
+SHINGLE_SIZE = 3
+BANDS = 32
+ROWS = 3
+NUM_BINS = BANDS * ROWS
+# Estimated Jaccard from which a draft counts as a suspected duplicate
+DUPLICATE_THRESHOLD = 0.5
+# Fixed per-bin probe orders for densification (any change needs a version bump)
+PROBE_ORDERS = [random.Random(b).sample(range(NUM_BINS), NUM_BINS) for b in range(NUM_BINS)]
+
+
+# ---------------------------------------------------------------------------
+# Signatures
+# ---------------------------------------------------------------------------
+
+def shingles(text: str) -> Set[str]:
+    """Return the set of SHINGLE_SIZE-word shingles of text.
+
+    Text shorter than one shingle gives a single shingle of all its words.
+    """
+    words = tokenize(text)
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def text_signature(text: str) -> Optional[bytes]:
+    """Return the MinHash signature of text (NUM_BINS little-endian uint32s).
+
+    Returns None for text without words.
+    """
+    bins: List[Optional[int]] = [None] * NUM_BINS
+    for shingle in shingles(text):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        b = (h & 0xFFFFFFFF) % NUM_BINS
+        value = h >> 32
+        current = bins[b]
+        if current is None or value < current:
+            bins[b] = value
+    if all(value is None for value in bins):
+        return None
+
+    # Densify: each empty bin copies the first filled bin in its probe order
+    values = array("I", [0] * NUM_BINS)
+    for b, value in enumerate(bins):
+        if value is None:
+            value = next(bins[probe] for probe in PROBE_ORDERS[b] if bins[probe] is not None)
+        values[b] = value
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def estimate_jaccard(a: bytes, b: bytes) -> float:
+    """Estimate the Jaccard similarity of two signatures' shingle sets."""
+    va, vb = array("I", a), array("I", b)
+    return sum(x == y for x, y in zip(va, vb)) / NUM_BINS
+
+
+def band_keys(signature: bytes) -> List[bytes]:
+    """Return the signature's band keys (band number + the band's bytes)."""
+    width = ROWS * 4
+    return [bytes((band,)) + signature[band * width:(band + 1) * width] for band in range(BANDS)]
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+def load_signatures(root: Path) -> Dict[str, List]:
+    """Return the cached {rel_path: [stat_key, base64 signature or None]}."""
+    try:
+        data = json.loads((get_cache_dir(root) / MINHASH_FILE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MINHASH_VERSION:
+        return {}
+    return data.get("docs", {})
+
+
+def save_signatures(root: Path, docs: Dict[str, List]) -> None:
+    """Persist the signature cache. Failures (read-only checkout) are ignored."""
+    try:
+        atomic_write_text(get_cache_dir(root) / MINHASH_FILE_NAME,
+                          json.dumps({"version": MINHASH_VERSION, "docs": docs}, separators=(",", ":")))
+    except OSError:
+        pass
+
+
+@timed("dedupe")
+def entry_signatures(
+    root: Path, scanned: List[Tuple[Path, Dict]], stats: Dict[str, List[int]]
+) -> Dict[str, bytes]:
+    """Return {rel_path: signature} for entries with frontmatter and a body.
+
+    Only entries whose stat key changed since the cache was written are read.
+    """
+    use_cache = cache_enabled()
+    old = load_signatures(root) if use_cache else {}
+    docs: Dict[str, List] = {}
+    signatures: Dict[str, bytes] = {}
+    for md_file, record in scanned:
+        if record["frontmatter"] is None:
+            continue
+        rel_path = record["path"]
+        cached = old.get(rel_path)
+        if cached is not None and cached[0] == stats.get(rel_path):
+            docs[rel_path] = cached
+            signature = base64.b64decode(cached[1]) if cached[1] else None
+        else:
+            signature = text_signature(read_entry(md_file)["body"])
+            docs[rel_path] = [stats.get(rel_path), base64.b64encode(signature).decode("ascii") if signature else None]
+        if signature is not None:
+            signatures[rel_path] = signature
+    if use_cache and docs != old:
+        save_signatures(root, docs)
+    return signatures
+
+
+# ---------------------------------------------------------------------------
+# LSH
+# ---------------------------------------------------------------------------
+
+def build_lsh(signatures: Dict[str, bytes]) -> Dict:
+    """Build the band index {"signatures": {path: sig}, "buckets": {band key: [paths]}}."""
+    lsh: Dict = {"signatures": {}, "buckets": {}}
+    for rel_path, signature in signatures.items():
+        add_to_lsh(lsh, rel_path, signature)
+    return lsh
+
+
+def add_to_lsh(lsh: Dict, rel_path: str, signature: bytes) -> None:
+    """Add one entry's signature to the band index."""
+    lsh["signatures"][rel_path] = signature
+    buckets = lsh["buckets"]
+    for key in band_keys(signature):
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [rel_path]
+        else:
+            bucket.append(rel_path)
+
+
+def find_similar(
+    lsh: Dict, signature: bytes, threshold: float = DUPLICATE_THRESHOLD
+) -> List[Tuple[str, float]]:
+    """Return [(rel_path, estimated Jaccard)] at or above threshold, most similar first."""
+    candidates: Set[str] = set()
+    for key in band_keys(signature):
+        candidates.update(lsh["buckets"].get(key, ()))
+    matches = []
+    for rel_path in candidates:
+        jaccard = estimate_jaccard(signature, lsh["signatures"][rel_path])
+        if jaccard >= threshold:
+            matches.append((rel_path, jaccard))
+    matches.sort(key=lambda item: (-item[1], item[0]))
+    return matches
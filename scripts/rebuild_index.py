@@ -3,13 +3,35 @@
 
 Scans all .md files under entries/, parses their YAML frontmatter, and
 generates:
-  - index.md  : a sorted markdown table of all entries
+  - index.md  : entry counts per domain and per type, linking to the shards
+  - index/    : one shard per domain (index/domain/) and per type
+                (index/type/), each a sorted markdown table of its entries,
+                paged at --shard-rows rows (<slug>.md, <slug>.page-2.md, ...)
   - tags.md   : entries grouped under each tag heading
 
+index.md stays small however many entries there are, so an agent reads it
+and then only the shard pages it needs.
+
+It also refreshes the search indexes used by search.py: the BM25 inverted
+index for --query (search_index.py), the trigram index for --substring
+and --regex (trigram_index.py), the typo-tolerant tag and title-word
+index behind "did you mean" and --fuzzy (fuzzy_index.py), and, once a
+--semantic search has created it, the semantic index (semantic_index.py),
+into which only new and changed entries are folded.
+
+By default every file is regenerated in memory and compared with the one on
+disk: only files whose content changed are written (tags.md is compared
+section by section), and a file whose content would not change is left
+untouched (so the date stamp does not churn git).
+
 Usage:
-    python rebuild_index.py
+    python rebuild_index.py                   # incremental rebuild
+    python rebuild_index.py --full            # regenerate every file from scratch
+    python rebuild_index.py --shard-rows 100  # at most 100 entries per shard page
 """
 
+import argparse
+import math
 import os
 import re
 import sys
@@ -17,118 +39,49 @@ from datetime import date
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from entry_cache import add_jobs_argument, atomic_write_text, scan, scan_state
+from entry_parser import read_text, truncate
+from fuzzy_index import ensure_fuzzy_index
+from instrument import add_profile_argument, start_profile, timed
+from search_index import ensure_index
+from semantic_index import refresh_semantic_index
+from telemetry import start_telemetry
+from trigram_index import ensure_trigram_index
+
 
 def get_root() -> Path:
     """Return the knowledge_framework root directory relative to this script."""
     return Path(__file__).resolve().parent.parent
 
 
-# ---------------------------------------------------------------------------
-# YAML frontmatter parser (identical to validate.py -- no pyyaml dependency)
-# ---------------------------------------------------------------------------
-
-def parse_frontmatter(text: str) -> Optional[Dict]:
-    """Parse YAML frontmatter between --- markers. Returns dict or None."""
-    lines = text.split("\n")
-
-    if not lines or lines[0].strip() != "---":
-        return None
-
-    end_idx = None
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            end_idx = i
-            break
-
-    if end_idx is None:
-        return None
-
-    fm_lines = lines[1:end_idx]
-    data: Dict = {}
-
-    for line in fm_lines:
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
-
-        match = re.match(r"^(\w[\w-]*)\s*:\s*(.*)", line)
-        if not match:
-            continue
-
-        key = match.group(1).strip()
-        raw_value = match.group(2).strip()
-
-        if raw_value.startswith("[") and raw_value.endswith("]"):
-            inner = raw_value[1:-1].strip()
-            if inner:
-                items = [item.strip().strip("'\"") for item in inner.split(",")]
-                data[key] = [item for item in items if item]
-            else:
-                data[key] = []
-        elif (raw_value.startswith('"') and raw_value.endswith('"')) or \
-             (raw_value.startswith("'") and raw_value.endswith("'")):
-            data[key] = raw_value[1:-1]
-        else:
-            comment_match = re.match(r"^([^#]+?)(?:\s+#.*)?$", raw_value)
-            if comment_match:
-                data[key] = comment_match.group(1).strip()
-            else:
-                data[key] = raw_value
-
-    return data
-
-
 # ---------------------------------------------------------------------------
 # Extract summary from the Problem section
 # ---------------------------------------------------------------------------
 
-def extract_problem_summary(text: str, max_len: int = 80) -> str:
+def extract_problem_summary(record: Dict, max_len: int = 80) -> str:
     """Return the first non-empty line of the ## Problem section, truncated."""
-    lines = text.split("\n")
-    in_problem = False
-    fm_count = 0
-    body_started = False
-
-    for line in lines:
-        if line.strip() == "---":
-            fm_count += 1
-            if fm_count == 2:
-                body_started = True
-            continue
-        if not body_started and fm_count < 2:
-            continue
-
-        if re.match(r"^##\s+Problem\b", line):
-            in_problem = True
-            continue
-
-        if in_problem:
-            # Stop at the next heading
-            if re.match(r"^##\s+", line):
-                break
-            stripped = line.strip()
-            if stripped:
-                if len(stripped) > max_len:
-                    return stripped[: max_len - 3] + "..."
-                return stripped
-
-    return ""
+    return truncate(record["problem"], max_len)
 
 
 # ---------------------------------------------------------------------------
 # Scan entries
 # ---------------------------------------------------------------------------
 
-def scan_entries(root: Path) -> List[Dict]:
-    """Scan all .md files under entries/ and return metadata dicts."""
-    entries_dir = root / "entries"
-    if not entries_dir.is_dir():
-        return []
+def scan_entries(
+    root: Path,
+    scanned: Optional[List[Tuple[Path, Dict]]] = None,
+    jobs: Optional[int] = None,
+) -> List[Dict]:
+    """Scan all .md files under entries/ and return metadata dicts.
+
+    Pass scanned (from entry_cache.scan_state) to reuse an existing scan.
+    """
+    if scanned is None:
+        scanned = scan(root, jobs=jobs)
 
     results = []
-    for md_file in sorted(entries_dir.rglob("*.md")):
-        text = md_file.read_text(encoding="utf-8")
-        fm = parse_frontmatter(text)
+    for md_file, record in scanned:
+        fm = record["frontmatter"]
         if fm is None:
             continue
 
@@ -140,108 +93,331 @@ def scan_entries(root: Path) -> List[Dict]:
             "tags": fm.get("tags", []) if isinstance(fm.get("tags"), list) else [],
             "domain": fm.get("domain", ""),
             "confidence": fm.get("confidence", ""),
-            "summary": extract_problem_summary(text),
+            "summary": extract_problem_summary(record),
         })
 
     return results
 
 
 # ---------------------------------------------------------------------------
-# Generate index.md
+# Generate index.md and its shards
 # ---------------------------------------------------------------------------
 
-def generate_index(entries: List[Dict]) -> str:
-    """Generate the index.md content as a markdown table."""
-    # Sort by domain, then type, then title
-    sorted_entries = sorted(entries, key=lambda e: (
-        e["domain"].lower(),
-        e["type"].lower(),
-        e["title"].lower(),
-    ))
+INDEX_DIR_NAME = "index"
+# (entry field, heading); each gets its own shard directory under index/
+SHARD_KINDS = (("domain", "Domain"), ("type", "Type"))
+DEFAULT_SHARD_ROWS = 200
+INDEX_COLUMNS = ("type", "tags", "domain", "confidence", "summary")
+SHARD_SLUG_RE = re.compile(r"[^a-z0-9]+")
+AUTO_DATE_RE = re.compile(r"^_Auto-generated on [^.]*\. ", re.MULTILINE)
+
+
+def default_shard_rows() -> int:
+    """Return KF_INDEX_SHARD_ROWS if it is a positive integer, else DEFAULT_SHARD_ROWS."""
+    try:
+        rows = int(os.environ.get("KF_INDEX_SHARD_ROWS", ""))
+    except ValueError:
+        return DEFAULT_SHARD_ROWS
+    return rows if rows > 0 else DEFAULT_SHARD_ROWS
+
+
+def index_sort_key(entry: Dict) -> Tuple[str, str, str]:
+    """Sort by domain, then type, then title."""
+    return (entry["domain"].lower(), entry["type"].lower(), entry["title"].lower())
+
+
+def shard_slug(value: str) -> str:
+    """Return the file name stem of a domain or type shard."""
+    return SHARD_SLUG_RE.sub("-", str(value).lower()).strip("-") or "none"
+
+
+def shard_page_name(slug: str, page: int) -> str:
+    """Return the file name of a shard's page (1-based)."""
+    return f"{slug}.md" if page == 1 else f"{slug}.page-{page}.md"
+
+
+def table_header(columns: Tuple[str, ...]) -> List[str]:
+    """Return the header and separator lines of an entry table."""
+    names = ["Entry"] + [column.capitalize() for column in columns]
+    return [
+        "| " + " | ".join(names) + " |",
+        "|" + "|".join("-" * (len(name) + 2) for name in names) + "|",
+    ]
+
 
+def render_index_row(entry: Dict, columns: Tuple[str, ...] = INDEX_COLUMNS, prefix: str = "") -> str:
+    """Render one entry table row; prefix is prepended to the entry link."""
+    cells = [f"[{entry['title']}]({prefix}{entry['path']})"]
+    cells.extend(", ".join(entry["tags"]) if column == "tags" else str(entry[column]) for column in columns)
+    return "| " + " | ".join(cells) + " |"
+
+
+def group_entries(entries: List[Dict], field: str) -> Dict[str, Tuple[str, List[Dict]]]:
+    """Group entries by the shard slug of field, keeping their order.
+
+    Returns {slug: (label, entries)} in slug order; the label lists the
+    field values that share the slug, "(none)" for entries without one.
+    """
+    groups: Dict[str, List[Dict]] = {}
+    for entry in entries:
+        groups.setdefault(shard_slug(entry[field]), []).append(entry)
+    result: Dict[str, Tuple[str, List[Dict]]] = {}
+    # Entries without a value come last
+    for slug in sorted(groups, key=lambda slug: (slug == "none", slug)):
+        values = sorted({str(entry[field]) for entry in groups[slug]} - {""}, key=lambda v: (v.lower(), v))
+        result[slug] = (", ".join(values) or "(none)", groups[slug])
+    return result
+
+
+def render_shard_page(
+    heading: str, label: str, slug: str, rows: List[str], columns: Tuple[str, ...],
+    total: int, page: int, pages: int,
+) -> str:
+    """Render one page of a domain or type shard."""
+    count_line = f"**{total} entries**"
+    if pages > 1:
+        count_line += f" (page {page} of {pages})"
+    nav = ["[Index](../../index.md)"]
+    if page > 1:
+        nav.append(f"[Previous page]({shard_page_name(slug, page - 1)})")
+    if page < pages:
+        nav.append(f"[Next page]({shard_page_name(slug, page + 1)})")
+    lines = [
+        f"# {heading}: {label}",
+        "",
+        "_Auto-generated by rebuild_index.py. Do not edit manually._",
+        "",
+        count_line,
+        "",
+        " · ".join(nav),
+        "",
+    ] + table_header(columns) + rows
+    lines.append("")
+    return "\n".join(lines)
+
+
+def render_top_index(total: int, shards: Dict[str, Dict[str, Tuple[str, int, int]]], shard_rows: int) -> str:
+    """Render index.md: entry counts per domain and type, linking to the shards."""
     lines = [
         "# Knowledge Framework Index",
         "",
         f"_Auto-generated on {date.today().isoformat()}. Do not edit manually._",
         "",
-        f"**{len(sorted_entries)} entries**",
+        f"**{total} entries**",
         "",
-        "| Entry | Type | Tags | Domain | Confidence | Summary |",
-        "|-------|------|------|--------|------------|---------|",
+        f"Entries are listed by domain and by type under {INDEX_DIR_NAME}/, "
+        f"at most {shard_rows} per page. Open only the shards you need.",
     ]
-
-    for entry in sorted_entries:
-        title = entry["title"]
-        link = f"[{title}]({entry['path']})"
-        tags_str = ", ".join(entry["tags"]) if entry["tags"] else ""
-        row = (
-            f"| {link} "
-            f"| {entry['type']} "
-            f"| {tags_str} "
-            f"| {entry['domain']} "
-            f"| {entry['confidence']} "
-            f"| {entry['summary']} |"
-        )
-        lines.append(row)
-
+    for field, heading in SHARD_KINDS:
+        lines.extend(["", f"## By {field}", "", f"| {heading} | Entries | Pages |",
+                      "|" + "-" * (len(heading) + 2) + "|---------|-------|"])
+        for slug, (label, count, pages) in shards[field].items():
+            link = f"{INDEX_DIR_NAME}/{field}/{shard_page_name(slug, 1)}"
+            lines.append(f"| [{label}]({link}) | {count} | {pages} |")
     lines.append("")
     return "\n".join(lines)
 
 
+@timed("render")
+def generate_index(entries: List[Dict], shard_rows: Optional[int] = None) -> Dict[str, str]:
+    """Generate index.md and its shard pages.
+
+    Returns {path relative to the root: content}. Every entry is listed once
+    in its domain shard and once in its type shard, sorted by domain, type
+    and title, at most shard_rows rows per page. A shard's own column is
+    left out of its table.
+    """
+    if shard_rows is None:
+        shard_rows = default_shard_rows()
+    sorted_entries = sorted(entries, key=index_sort_key)
+    files: Dict[str, str] = {}
+    shards: Dict[str, Dict[str, Tuple[str, int, int]]] = {}
+    for field, heading in SHARD_KINDS:
+        columns = tuple(column for column in INDEX_COLUMNS if column != field)
+        shards[field] = {}
+        for slug, (label, group) in group_entries(sorted_entries, field).items():
+            rows = [render_index_row(entry, columns, "../../") for entry in group]
+            pages = max(1, math.ceil(len(rows) / shard_rows))
+            shards[field][slug] = (label, len(rows), pages)
+            for page in range(1, pages + 1):
+                page_rows = rows[(page - 1) * shard_rows:page * shard_rows]
+                files[f"{INDEX_DIR_NAME}/{field}/{shard_page_name(slug, page)}"] = render_shard_page(
+                    heading, label, slug, page_rows, columns, len(rows), page, pages)
+    return {"index.md": render_top_index(len(sorted_entries), shards, shard_rows), **files}
+
+
+def same_content(path: Path, content: str) -> bool:
+    """Return True if path already holds content, apart from its date stamp."""
+    try:
+        old_text = read_text(path)
+    except (OSError, UnicodeDecodeError):
+        return False
+    return AUTO_DATE_RE.sub("", old_text) == AUTO_DATE_RE.sub("", content)
+
+
 # ---------------------------------------------------------------------------
 # Generate tags.md
 # ---------------------------------------------------------------------------
 
-def generate_tags(entries: List[Dict]) -> str:
-    """Generate tags.md content with entries grouped under each tag."""
+def build_tag_sections(entries: List[Dict]) -> Dict[str, List[str]]:
+    """Return {tag: entry lines} in tags.md order."""
     # Build tag -> entries mapping
     tag_map: Dict[str, List[Dict]] = {}
     for entry in entries:
         for tag in entry["tags"]:
             tag_map.setdefault(tag, []).append(entry)
 
+    sections: Dict[str, List[str]] = {}
+    for tag in sorted(tag_map.keys(), key=str.lower):
+        sections[tag] = [
+            f"- [{entry['title']}]({entry['path']}) ({entry['type']}, {entry['domain']})"
+            for entry in sorted(tag_map[tag], key=lambda e: e["title"].lower())
+        ]
+    return sections
+
+
+def render_tags(sections: Dict[str, List[str]], entry_count: int) -> str:
+    """Render tags.md from pre-built tag sections."""
     lines = [
         "# Knowledge Framework Tags",
         "",
         f"_Auto-generated on {date.today().isoformat()}. Do not edit manually._",
         "",
-        f"**{len(tag_map)} tags across {len(entries)} entries**",
+        f"**{len(sections)} tags across {entry_count} entries**",
         "",
     ]
 
-    for tag in sorted(tag_map.keys(), key=str.lower):
+    for tag, entry_lines in sections.items():
         lines.append(f"## {tag}")
         lines.append("")
-        for entry in sorted(tag_map[tag], key=lambda e: e["title"].lower()):
-            lines.append(f"- [{entry['title']}]({entry['path']}) ({entry['type']}, {entry['domain']})")
+        lines.extend(entry_lines)
         lines.append("")
 
     return "\n".join(lines)
 
 
+@timed("render")
+def generate_tags(entries: List[Dict]) -> str:
+    """Generate tags.md content with entries grouped under each tag."""
+    return render_tags(build_tag_sections(entries), len(entries))
+
+
+def read_tag_sections(text: str) -> Tuple[str, Dict[str, List[str]]]:
+    """Split a previous tags.md into its count line and {tag: entry lines}."""
+    count_line = ""
+    sections: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in text.split("\n"):
+        if line.startswith("## "):
+            current = sections.setdefault(line[3:], [])
+        elif current is not None and line.startswith("- "):
+            current.append(line)
+        elif current is None and line.startswith("**"):
+            count_line = line
+    return count_line, sections
+
+
+@timed("render")
+def rebuild_tags_if_changed(old_text: str, entries: List[Dict]) -> Tuple[Optional[str], int]:
+    """Regenerate tags.md and compare it with the previous build section by section.
+
+    Returns (new_text, changed_section_count), with new_text None when no
+    section, the section order or the count line changed, so an unchanged
+    file keeps its date stamp.
+    """
+    old_count_line, old_sections = read_tag_sections(old_text)
+    new_sections = build_tag_sections(entries)
+
+    changed = sum(1 for tag, lines in new_sections.items() if old_sections.get(tag) != lines)
+    changed += sum(1 for tag in old_sections if tag not in new_sections)
+    order_changed = list(old_sections) != list(new_sections)
+    count_line = f"**{len(new_sections)} tags across {len(entries)} entries**"
+    if not changed and not order_changed and count_line == old_count_line:
+        return None, 0
+
+    return render_tags(new_sections, len(entries)), changed
+
+
 # ---------------------------------------------------------------------------
 # Public API (used by curate.py)
 # ---------------------------------------------------------------------------
 
-def rebuild(root: Optional[Path] = None) -> Tuple[int, int]:
-    """Rebuild index.md and tags.md. Returns (entry_count, tag_count)."""
+def update_index_files(
+    root: Path, entries: List[Dict], incremental: bool = True, shard_rows: Optional[int] = None
+) -> Dict[str, int]:
+    """Write index.md, its shards and tags.md for the given entries.
+
+    In incremental mode index.md and the shard pages are only written when
+    their content changed (ignoring the date stamp), tags.md is regenerated
+    and compared with its previous build section by section, and untouched
+    files keep their date. Shard
+    pages that are no longer generated are removed. Writes go through a temp
+    file and rename. Returns {filename: changed count} for the files that
+    were written: index files written or removed for index.md, tag sections
+    for tags.md.
+    """
+    written: Dict[str, int] = {}
+    files = generate_index(entries, shard_rows)
+    changed = 0
+    for rel_path, content in files.items():
+        path = root / rel_path
+        if incremental and same_content(path, content):
+            continue
+        atomic_write_text(path, content)
+        changed += 1
+    for field, _ in SHARD_KINDS:
+        for path in sorted((root / INDEX_DIR_NAME / field).glob("*.md")):
+            if path.relative_to(root).as_posix() not in files:
+                path.unlink()
+                changed += 1
+    if changed:
+        written["index.md"] = changed
+
+    path = root / "tags.md"
+    if incremental and path.is_file():
+        content, changed = rebuild_tags_if_changed(read_text(path), entries)
+    else:
+        content, changed = generate_tags(entries), len(entries)
+    if content is not None:
+        atomic_write_text(path, content)
+        written["tags.md"] = changed
+    return written
+
+
+def rebuild(
+    root: Optional[Path] = None,
+    incremental: bool = True,
+    jobs: Optional[int] = None,
+    shard_rows: Optional[int] = None,
+    scanned: Optional[List[Tuple[Path, Dict]]] = None,
+    stats: Optional[Dict[str, List[int]]] = None,
+) -> Tuple[int, int, Dict[str, int]]:
+    """Rebuild index.md, its shards, tags.md and the search indexes.
+
+    scanned and stats, when given, are a current scan_state() result (as
+    curate.py keeps one), and entries/ is not scanned again.
+
+    Returns (entry_count, tag_count, written), written being
+    update_index_files()'s {filename: changed count}.
+    """
     if root is None:
         root = get_root()
 
-    entries = scan_entries(root)
-
-    index_content = generate_index(entries)
-    tags_content = generate_tags(entries)
-
-    (root / "index.md").write_text(index_content, encoding="utf-8")
-    (root / "tags.md").write_text(tags_content, encoding="utf-8")
+    if scanned is None or stats is None:
+        scanned, stats = scan_state(root, jobs=jobs)
+    entries = scan_entries(root, scanned)
+    written = update_index_files(root, entries, incremental=incremental, shard_rows=shard_rows)
+    ensure_index(root, scanned, stats)
+    ensure_trigram_index(root, scanned, stats)
+    ensure_fuzzy_index(root, scanned, stats)
+    refresh_semantic_index(root, scanned, stats)
 
     # Count unique tags
     all_tags = set()
     for entry in entries:
         all_tags.update(entry["tags"])
 
-    return len(entries), len(all_tags)
+    return len(entries), len(all_tags), written
 
 
 # ---------------------------------------------------------------------------
@@ -249,9 +425,38 @@ def rebuild(root: Optional[Path] = None) -> Tuple[int, int]:
 # ---------------------------------------------------------------------------
 
 def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Rebuild index.md, its shards and tags.md from all entries.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Regenerate every file from scratch instead of patching the previous build",
+    )
+    parser.add_argument(
+        "--shard-rows", type=int, default=default_shard_rows(), metavar="N",
+        help="Most entries per index shard page (default: $KF_INDEX_SHARD_ROWS or "
+             f"{DEFAULT_SHARD_ROWS})",
+    )
+    add_jobs_argument(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.shard_rows < 1:
+        parser.error("--shard-rows must be at least 1")
+    start_profile(args)
+
     root = get_root()
-    entry_count, tag_count = rebuild(root)
-    print(f"Rebuilt index.md and tags.md")
+    start_telemetry(root, "rebuild_index")
+    entry_count, tag_count, written = rebuild(
+        root, incremental=not args.full, jobs=args.jobs, shard_rows=args.shard_rows)
+
+    for name, unit in (("index.md", " files"), ("tags.md", "")):
+        if name in written and args.full:
+            print(f"Rebuilt {name} (full)")
+        elif name in written:
+            print(f"Rebuilt {name} ({written[name]}{unit} changed)")
+        else:
+            print(f"{name} unchanged")
     print(f"  {entry_count} entries indexed")
     print(f"  {tag_count} unique tags")
     return 0
@@ -5,21 +5,89 @@ Usage:
     python search.py --tag edfa
     python search.py --domain optical-networking --confidence high
     python search.py --query "digital twin"
+    python search.py --substring "kafka-ret"
+    python search.py --regex "edfa.*gain"
     python search.py --type pattern --tag multi-agent
-
-Multiple flags are ANDed together.
+    python search.py --where "tag:edfa AND (tag:kafka OR domain:devops) NOT confidence:low"
+    python search.py --query "retry" --facets
+    python search.py --tag edfaa --fuzzy
+    python search.py --query "amplifier tilt" --semantic
+
+Multiple flags are ANDed together. --where takes a boolean filter over tag,
+domain, type and confidence (see bitmap_index.py) evaluated on precomputed
+entry bitmaps; --tag/--domain/--type/--confidence are shorthands for it.
+--query ranks the matching entries with BM25 over a persistent inverted
+index (title, tags and body) and shows the top --limit results, best first.
+--substring and --regex match file content exactly (case-insensitive),
+using a trigram index to pick which files to read.
+
+--facets adds counts per domain, type and confidence and the most common
+other tags over all matches (not only the shown top --limit), taken from
+the cached metadata of the matches, so the next search can be narrowed
+with --where in one step.
+
+When nothing matches, known tags and title words close to the misspelt
+ones are suggested (see fuzzy_index.py). --fuzzy applies them: each tag
+term also matches tags within a few edits, and --query words that are not
+title words are joined by their closest title words.
+
+--semantic ranks --query by meaning rather than shared words: cosine
+similarity in a latent semantic space fitted on the entries (see
+semantic_index.py; needs NumPy), so "amplifier tilt" finds EDFA gain
+modeling. The other flags still filter what is ranked.
+
+With --backend sqlite the same flags are answered from the SQLite mirror of
+entries/ (see sqlite_store.py): filters use indexed columns, --query is
+ranked by FTS5 and each result carries a snippet of the matching text, and
+--substring/--regex match the entry body.
+
+When a search daemon (serve.py) is running for this knowledge base, the
+search is sent to it over a Unix socket and answered from its warm index;
+otherwise, or with --no-daemon, entries are scanned directly.
 """
 
 import argparse
-import os
+import json
 import re
+import socket
 import sys
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Set, TextIO, Tuple
+
+from bitmap_index import FilterError, bitmap_ids, ensure_bitmaps, evaluate, filter_values, parse_filter
+from entry_cache import add_jobs_argument, get_cache_dir, scan, scan_state
+from entry_parser import truncate
+from fuzzy_index import ensure_fuzzy_index, is_known, suggest
+from instrument import add_profile_argument, start_profile, timed
+from search_index import bm25_search, ensure_index, matching_paths, tokenize
+from semantic_index import SemanticError, ensure_semantic_index, semantic_search
+from sqlite_store import StoreError, facet_metadata, open_store, search_store, sync_store
+from telemetry import start_telemetry
+from trigram_index import ensure_trigram_index, regex_search, substring_search
 
 
 # ---------------------------------------------------------------------------
-# Helpers (copied from validate.py — scripts are standalone)
+# Constants
+# ---------------------------------------------------------------------------
+
+SOCKET_FILE_NAME = "search.sock"
+# Bump when the request/response format changes
+PROTOCOL_VERSION = 5
+# Arguments forwarded to the daemon
+SEARCH_FIELDS = (
+    "tag", "domain", "type", "confidence", "where", "query", "substring", "regex", "limit", "facets", "fuzzy",
+    "semantic",
+)
+DAEMON_TIMEOUT = 30.0
+FACET_FIELDS = ("domain", "type", "confidence")
+# Co-occurring tags listed by --facets
+FACET_TAG_LIMIT = 10
+UNSET_VALUE = "(unset)"
+
+
+# ---------------------------------------------------------------------------
+# Helpers
 # ---------------------------------------------------------------------------
 
 def get_root() -> Path:
@@ -27,193 +95,260 @@ def get_root() -> Path:
     return Path(__file__).resolve().parent.parent
 
 
-def parse_frontmatter(text: str) -> Tuple[Optional[Dict], List[str]]:
-    """Parse YAML frontmatter between --- markers.
+def get_summary(record: Dict) -> str:
+    """Return the first non-empty line from the ## Problem section, truncated.
 
-    Returns (parsed_dict_or_None, list_of_parse_errors).
+    Falls back to the first meaningful body line if no Problem section found.
     """
-    errors: List[str] = []
-    lines = text.split("\n")
-
-    # Find opening ---
-    if not lines or lines[0].strip() != "---":
-        return None, ["No YAML frontmatter found (file must start with ---)"]
-
-    end_idx = None
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            end_idx = i
-            break
-
-    if end_idx is None:
-        return None, ["YAML frontmatter not closed (missing closing ---)"]
-
-    fm_lines = lines[1:end_idx]
-    data: Dict = {}
-
-    for line in fm_lines:
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
-
-        # Handle key: value
-        match = re.match(r"^(\w[\w-]*)\s*:\s*(.*)", line)
-        if not match:
-            continue
-
-        key = match.group(1).strip()
-        raw_value = match.group(2).strip()
-
-        # Parse list values: [item1, item2, ...]
-        if raw_value.startswith("[") and raw_value.endswith("]"):
-            inner = raw_value[1:-1].strip()
-            if inner:
-                items = [item.strip().strip("'\"") for item in inner.split(",")]
-                data[key] = [item for item in items if item]
-            else:
-                data[key] = []
-        # Parse quoted strings
-        elif (raw_value.startswith('"') and raw_value.endswith('"')) or \
-             (raw_value.startswith("'") and raw_value.endswith("'")):
-            data[key] = raw_value[1:-1]
-        # Plain value
-        else:
-            # Handle inline comment: value  # comment
-            comment_match = re.match(r"^([^#]+?)(?:\s+#.*)?$", raw_value)
-            if comment_match:
-                data[key] = comment_match.group(1).strip()
-            else:
-                data[key] = raw_value
-
-    return data, errors
+    summary = record["problem"] or record["first_line"]
+    if not summary:
+        return "(no summary)"
+    return truncate(summary, 120)
 
 
 # ---------------------------------------------------------------------------
-# Body extraction
+# Search logic
 # ---------------------------------------------------------------------------
 
-def get_body(text: str) -> str:
-    """Return the markdown body after the frontmatter."""
-    lines = text.split("\n")
-    if not lines or lines[0].strip() != "---":
-        return text
-
-    fm_count = 0
-    for i, line in enumerate(lines):
-        if line.strip() == "---":
-            fm_count += 1
-            if fm_count == 2:
-                return "\n".join(lines[i + 1:])
+def load_entries(root: Path, jobs: Optional[int] = None) -> List[Tuple[Path, Dict]]:
+    """Load metadata for all .md entries in entries/ as (path, record).
 
-    return text
+    Records come from the metadata cache, so unchanged entries are not read.
+    """
+    return [(path, record) for path, record in scan(root, jobs=jobs) if record["frontmatter"] is not None]
 
 
-def get_summary(text: str) -> str:
-    """Extract the first non-empty line from the ## Problem section, truncated.
+def load_state(root: Path, jobs: Optional[int] = None, warm: bool = False) -> Dict:
+    """Scan entries and return the search state.
 
-    Falls back to the first meaningful body line if no Problem section found.
+    The state holds scanned and stats from scan_state() and entries, the
+    scanned entries with frontmatter (their positions are the bitmap ids).
+    With warm=True the metadata bitmaps, the inverted, trigram and fuzzy
+    indexes are built up front as well (serve.py keeps such a state in
+    memory); otherwise each is built when first needed.
     """
-    lines = text.split("\n")
-    in_problem = False
-    fm_count = 0
-    body_started = False
-
-    for line in lines:
-        if line.strip() == "---":
-            fm_count += 1
-            if fm_count == 2:
-                body_started = True
-            continue
-        if not body_started:
-            continue
-
-        if re.match(r"^##\s+Problem\b", line):
-            in_problem = True
-            continue
-
-        if in_problem:
-            if re.match(r"^##\s+", line):
-                break
-            stripped = line.strip()
-            if stripped:
-                if len(stripped) > 120:
-                    return stripped[:117] + "..."
-                return stripped
-
-    # Fallback: first non-heading body line
-    body = get_body(text)
-    for line in body.split("\n"):
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
-        if len(stripped) > 120:
-            return stripped[:117] + "..."
-        return stripped
-
-    return "(no summary)"
-
-
-# ---------------------------------------------------------------------------
-# Search logic
-# ---------------------------------------------------------------------------
+    scanned, stats = scan_state(root, jobs=jobs)
+    entries = [(path, record) for path, record in scanned if record["frontmatter"] is not None]
+    state: Dict = {"scanned": scanned, "stats": stats, "entries": entries}
+    if warm:
+        state["bitmaps"] = ensure_bitmaps(root, entries, stats)
+        state["index"] = ensure_index(root, scanned, stats)
+        state["trigrams"] = ensure_trigram_index(root, scanned, stats)
+        state["fuzzy"] = ensure_fuzzy_index(root, scanned, stats)
+    return state
+
+
+@timed("search")
+def rank_query(
+    root: Path,
+    state: Dict,
+    candidates: List[Tuple[Path, Dict]],
+    query: str,
+    limit: Optional[int],
+) -> Tuple[List[Tuple[Path, Dict, float]], int]:
+    """BM25-rank candidates for query via the inverted index.
+
+    Returns (top results as (path, record, score), total matching count).
+    """
+    index = state.get("index") or ensure_index(root, state["scanned"], state["stats"])
+    by_path = {record["path"]: (path, record) for path, record in candidates}
+    ranked, total = bm25_search(index, query, set(by_path), limit)
+    return [by_path[rel] + (score,) for rel, score in ranked], total
+
+
+@timed("search")
+def rank_semantic(
+    root: Path,
+    state: Dict,
+    candidates: List[Tuple[Path, Dict]],
+    query: str,
+    limit: Optional[int],
+) -> Tuple[List[Tuple[Path, Dict, float]], int]:
+    """Rank candidates by semantic similarity to query.
+
+    Returns (top results as (path, record, score), total matching count).
+    The index is kept in the state once loaded. Raises SemanticError
+    without NumPy.
+    """
+    index = state.get("semantic")
+    if index is None:
+        index = state["semantic"] = ensure_semantic_index(root, state["scanned"], state["stats"])
+    by_path = {record["path"]: (path, record) for path, record in candidates}
+    ranked, total = semantic_search(index, query, set(by_path), limit)
+    return [by_path[rel] + (score,) for rel, score in ranked], total
 
-def load_entries(root: Path) -> List[Tuple[Path, Dict, str]]:
-    """Load all .md entries from entries/ and return (path, frontmatter, text)."""
-    entries_dir = root / "entries"
-    if not entries_dir.is_dir():
-        return []
-
-    results = []
-    for md_file in sorted(entries_dir.rglob("*.md")):
-        text = md_file.read_text(encoding="utf-8")
-        fm, _ = parse_frontmatter(text)
-        if fm is not None:
-            results.append((md_file, fm, text))
-    return results
-
-
-def matches_filter(
-    fm: Dict,
-    text: str,
-    tag: Optional[str],
-    domain: Optional[str],
-    entry_type: Optional[str],
-    confidence: Optional[str],
-    query: Optional[str],
-) -> bool:
-    """Check whether an entry matches all provided filters (AND logic)."""
-    if tag is not None:
-        tags = fm.get("tags", [])
-        if not isinstance(tags, list):
-            tags = [tags]
-        if tag.lower() not in [t.lower() for t in tags]:
-            return False
-
-    if domain is not None:
-        if fm.get("domain", "").lower() != domain.lower():
-            return False
-
-    if entry_type is not None:
-        if fm.get("type", "").lower() != entry_type.lower():
-            return False
-
-    if confidence is not None:
-        if fm.get("confidence", "").lower() != confidence.lower():
-            return False
 
-    if query is not None:
-        if query.lower() not in text.lower():
-            return False
+def metadata_filter(args: argparse.Namespace) -> Optional[Tuple]:
+    """Combine --where and the --tag/--domain/--type/--confidence flags.
 
-    return True
+    Returns a bitmap_index filter AST, or None if no metadata filter is set.
+    Raises FilterError for an invalid --where expression.
+    """
+    ast = parse_filter(args.where) if args.where else None
+    for field, value in (("tag", args.tag), ("domain", args.domain),
+                         ("type", args.type), ("confidence", args.confidence)):
+        if value is not None:
+            term = ("term", field, value)
+            ast = term if ast is None else ("and", ast, term)
+    return ast
+
+
+def fuzzy_filter(ast: Optional[Tuple], fuzzy: Dict) -> Optional[Tuple]:
+    """Let each tag term of a filter AST also match tags within a few edits."""
+    if ast is None:
+        return None
+    if ast[0] == "term":
+        terms = [term for term, _, _ in suggest(fuzzy, "tag", ast[2])] if ast[1] == "tag" else []
+        if not terms:
+            return ast
+        node: Tuple = ("term", "tag", terms[0])
+        for term in terms[1:]:
+            node = ("or", node, ("term", "tag", term))
+        return node
+    return (ast[0],) + tuple(fuzzy_filter(child, fuzzy) for child in ast[1:])
+
+
+def fuzzy_query(query: str, fuzzy: Dict) -> str:
+    """Join each query word that is not a title word with its closest title words."""
+    words = []
+    for word in tokenize(query):
+        words.append(word)
+        if not is_known(fuzzy, "word", word):
+            suggestions = suggest(fuzzy, "word", word)
+            words.extend(term for term, distance, _ in suggestions if distance == suggestions[0][1])
+    return " ".join(words)
+
+
+def did_you_mean(fuzzy: Dict, ast: Optional[Tuple], query: Optional[str]) -> List[str]:
+    """Return suggestion lines for unknown tags and query words."""
+    lines = []
+    for tag in sorted(filter_values(ast, "tag")):
+        if not is_known(fuzzy, "tag", tag):
+            terms = [term for term, _, _ in suggest(fuzzy, "tag", tag)]
+            if terms:
+                lines.append(f"  tag '{tag}' -> {', '.join(terms)}")
+    for word in dict.fromkeys(tokenize(query or "")):
+        if not is_known(fuzzy, "word", word):
+            terms = [term for term, _, _ in suggest(fuzzy, "word", word)]
+            if terms:
+                lines.append(f"  '{word}' -> {', '.join(terms)}")
+    if lines:
+        lines.insert(0, "Did you mean (--fuzzy to include these):")
+    return lines
+
+
+@timed("search")
+def count_facets(
+    metadata: Iterable[Dict], exclude_tags: Set[str] = frozenset(),
+) -> Dict[str, List[Tuple[str, int]]]:
+    """Count matches per domain, type and confidence and per tag.
+
+    metadata yields frontmatter dicts (or facet_metadata() rows) of the
+    matching entries. Values are lowercased like --where terms. Tags named
+    in the filter (exclude_tags) are left out, and only the FACET_TAG_LIMIT
+    most common are kept. Returns {facet: [(value, count)]}, most common
+    first, ties by value.
+    """
+    counters: Dict[str, Counter] = {field: Counter() for field in FACET_FIELDS}
+    tag_counts: Counter = Counter()
+    for fm in metadata:
+        for field in FACET_FIELDS:
+            value = fm.get(field)
+            counters[field][str(value).lower() if value else UNSET_VALUE] += 1
+        tags = fm.get("tags")
+        if tags:
+            tag_counts.update({str(t).lower() for t in (tags if isinstance(tags, list) else [tags])} - exclude_tags)
+
+    facets = {field: sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+              for field, counts in counters.items()}
+    facets["tags"] = sorted(tag_counts.items(), key=lambda item: (-item[1], item[0]))[:FACET_TAG_LIMIT]
+    return facets
+
+
+@timed("search")
+def select_entries(root: Path, state: Dict, ast: Optional[Tuple]) -> List[Tuple[Path, Dict]]:
+    """Return the entries matching a filter AST, in path order."""
+    entries = state["entries"]
+    if ast is None:
+        return entries
+    bitmaps = state.get("bitmaps")
+    if bitmaps is None:
+        bitmaps = state["bitmaps"] = ensure_bitmaps(root, entries, state["stats"])
+    return [entries[i] for i in bitmap_ids(evaluate(bitmaps, ast))]
+
+
+@timed("search")
+def filter_text(
+    root: Path,
+    state: Dict,
+    candidates: List[Tuple[Path, Dict]],
+    substring: Optional[str],
+    regex: Optional[str],
+) -> List[Tuple[Path, Dict]]:
+    """Keep candidates whose content matches substring and/or regex.
+
+    The trigram index narrows the files to read; only those are verified.
+    Raises re.error for an invalid regex.
+    """
+    index = state.get("trigrams") or ensure_trigram_index(root, state["scanned"], state["stats"])
+    allowed = {record["path"] for _, record in candidates}
+    if substring is not None:
+        allowed = substring_search(root, index, substring, allowed)
+    if regex is not None:
+        allowed = regex_search(root, index, regex, allowed)
+    return [(path, record) for path, record in candidates if record["path"] in allowed]
+
+
+@timed("search")
+def search_sqlite(
+    root: Path, args: argparse.Namespace
+) -> Tuple[List[Tuple[Path, Dict, Optional[float], Optional[str]]], int, Optional[Dict], Optional[List[str]]]:
+    """Answer the search from the SQLite store, syncing it with entries/ first.
+
+    Returns ([(path, record, score, snippet)], total matching count, facets
+    or None without --facets, "did you mean" lines or None if there are
+    matches).
+    Raises StoreError if the store is unusable, re.error for a bad regex and
+    FilterError for a bad --where expression.
+    """
+    ast = metadata_filter(args)
+    conn = open_store(root)
+    try:
+        scanned, stats = scan_state(root, jobs=args.jobs)
+        sync_store(root, conn, scanned, stats)
+        fuzzy = ensure_fuzzy_index(root, scanned, stats) if args.fuzzy else None
+        limit = args.limit if args.query is not None and args.limit > 0 else None
+        match = dict(
+            where=fuzzy_filter(ast, fuzzy) if fuzzy else ast,
+            query=fuzzy_query(args.query, fuzzy) if fuzzy and args.query is not None else args.query,
+            substring=args.substring, regex=args.regex,
+        )
+        rows, total = search_store(conn, limit=limit, **match)
+        facets = None
+        if args.facets:
+            facets = count_facets(facet_metadata(conn, **match), filter_values(match["where"], "tag"))
+    finally:
+        conn.close()
+    matches = [(root / record["path"], record, score, snippet) for record, score, snippet in rows]
+    suggestions = None
+    if not matches:
+        suggestions = did_you_mean(fuzzy or ensure_fuzzy_index(root, scanned, stats), ast, args.query)
+    return matches, total, facets, suggestions
 
 
 # ---------------------------------------------------------------------------
 # Output formatting
 # ---------------------------------------------------------------------------
 
-def format_result(root: Path, path: Path, fm: Dict, text: str) -> str:
+def format_result(
+    root: Path,
+    path: Path,
+    record: Dict,
+    score: Optional[float] = None,
+    snippet: Optional[str] = None,
+) -> str:
     """Format a single search result for display."""
+    fm = record["frontmatter"]
     rel = path.relative_to(root)
     title = fm.get("title", rel.stem)
     tags = fm.get("tags", [])
@@ -221,7 +356,7 @@ def format_result(root: Path, path: Path, fm: Dict, text: str) -> str:
         tag_str = ", ".join(tags)
     else:
         tag_str = str(tags)
-    summary = get_summary(text)
+    summary = get_summary(record)
 
     lines = [
         f"Title      : {title}",
@@ -232,9 +367,170 @@ def format_result(root: Path, path: Path, fm: Dict, text: str) -> str:
         f"Tags       : {tag_str}",
         f"Problem    : {summary}",
     ]
+    if score is not None:
+        lines.append(f"Score      : {score:.2f}")
+    if snippet:
+        lines.append(f"Snippet    : {' '.join(snippet.split())}")
+    return "\n".join(lines)
+
+
+def format_facets(facets: Dict[str, List[Tuple[str, int]]]) -> str:
+    """Format count_facets() output as one line per facet."""
+    labels = {"domain": "Domain", "type": "Type", "confidence": "Confidence", "tags": "Other tags"}
+    lines = ["Facets:"]
+    for facet, label in labels.items():
+        counts = ", ".join(f"{value} ({n})" for value, n in facets[facet]) or "(none)"
+        lines.append(f"  {label:<11}: {counts}")
     return "\n".join(lines)
 
 
+@timed("render")
+def print_results(
+    root: Path,
+    matches: List[Tuple[Path, Dict, Optional[float], Optional[str]]],
+    total: int,
+    out: TextIO = sys.stdout,
+    facets: Optional[Dict[str, List[Tuple[str, int]]]] = None,
+    suggestions: Optional[List[str]] = None,
+) -> int:
+    """Print the result list (facet counts first if given); returns the exit code.
+
+    suggestions ("did you mean" lines) are printed when nothing matched.
+    """
+    if not matches:
+        print("No matching entries found.", file=out)
+        for line in suggestions or ():
+            print(line, file=out)
+        return 1
+
+    if total > len(matches):
+        print(f"Found {total} match(es), showing top {len(matches)}:\n", file=out)
+    else:
+        print(f"Found {total} match(es):\n", file=out)
+    if facets is not None:
+        print(format_facets(facets) + "\n", file=out)
+    for i, (path, record, score, snippet) in enumerate(matches):
+        print(format_result(root, path, record, score, snippet), file=out)
+        if i < len(matches) - 1:
+            print(file=out)
+
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Search (direct or through the daemon)
+# ---------------------------------------------------------------------------
+
+def run_search(
+    root: Path,
+    args: argparse.Namespace,
+    state: Dict,
+    out: TextIO = sys.stdout,
+    err: TextIO = sys.stderr,
+) -> int:
+    """Run a files-backend search against state and print the results.
+
+    Returns the process exit code. serve.py calls this with its warm state
+    and captures out/err for the client.
+    """
+    if not state["entries"]:
+        print("No entries found in entries/", file=out)
+        return 1
+
+    # Metadata filters (with --fuzzy, tag terms widened to close tags) run on
+    # the bitmaps; --substring/--regex narrow the survivors through the
+    # trigram index; --query then ranks what is left (BM25, or the semantic
+    # index with --semantic)
+    fuzzy = None
+    if args.fuzzy:
+        fuzzy = state.get("fuzzy") or ensure_fuzzy_index(root, state["scanned"], state["stats"])
+    try:
+        ast = metadata_filter(args)
+        matched_ast = fuzzy_filter(ast, fuzzy) if fuzzy else ast
+        candidates = select_entries(root, state, matched_ast)
+    except FilterError as e:
+        print(f"ERROR: invalid --where expression: {e}", file=err)
+        return 1
+
+    if args.substring is not None or args.regex is not None:
+        try:
+            candidates = filter_text(root, state, candidates, args.substring, args.regex)
+        except re.error as e:
+            print(f"ERROR: invalid --regex pattern: {e}", file=err)
+            return 1
+
+    query = args.query
+    if fuzzy and query is not None:
+        query = fuzzy_query(query, fuzzy)
+    if args.semantic and query is None:
+        print("ERROR: --semantic ranks a --query; give one", file=err)
+        return 1
+    rank = rank_semantic if args.semantic else rank_query
+    if query is not None:
+        limit = args.limit if args.limit > 0 else None
+        try:
+            ranked, total = rank(root, state, candidates, query, limit)
+        except SemanticError as e:
+            print(f"ERROR: {e}", file=err)
+            return 1
+        matches = [(path, record, score, None) for path, record, score in ranked]
+    else:
+        matches = [(path, record, None, None) for path, record in candidates]
+        total = len(matches)
+
+    facets = None
+    if args.facets and matches:
+        if query is not None:
+            # Facets cover every match, not just the ranked top --limit
+            allowed = {record["path"] for _, record in candidates}
+            if args.semantic:
+                matched = {rel for rel, _ in semantic_search(state["semantic"], query, allowed, None)[0]}
+            else:
+                index = state.get("index") or ensure_index(root, state["scanned"], state["stats"])
+                matched = matching_paths(index, query, allowed)
+            candidates = [(path, record) for path, record in candidates if record["path"] in matched]
+        exclude_tags = filter_values(matched_ast, "tag")
+        facets = count_facets((record["frontmatter"] for _, record in candidates), exclude_tags)
+
+    suggestions = None
+    if not matches:
+        fuzzy = fuzzy or state.get("fuzzy") or ensure_fuzzy_index(root, state["scanned"], state["stats"])
+        suggestions = did_you_mean(fuzzy, ast, args.query)
+
+    return print_results(root, matches, total, out, facets, suggestions)
+
+
+def get_socket_path(root: Path) -> Path:
+    """Return the Unix socket path the search daemon listens on."""
+    return get_cache_dir(root) / SOCKET_FILE_NAME
+
+
+def query_daemon(root: Path, args: argparse.Namespace) -> Optional[int]:
+    """Send the search to a running daemon and print its answer.
+
+    Returns the exit code, or None if no daemon answered (the caller then
+    scans directly).
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    request = {"version": PROTOCOL_VERSION, "args": {name: getattr(args, name) for name in SEARCH_FIELDS}}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(DAEMON_TIMEOUT)
+            sock.connect(str(get_socket_path(root)))
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as f:
+                response = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(response, dict) or response.get("version") != PROTOCOL_VERSION:
+        return None
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["status"]
+
+
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
@@ -247,38 +543,74 @@ def main() -> int:
     parser.add_argument("--domain", help="Match entries with this domain")
     parser.add_argument("--type", help="Match entries with this type")
     parser.add_argument("--confidence", help="Match entries with this confidence level")
-    parser.add_argument("--query", "-q", help="Full-text search in file content")
+    parser.add_argument(
+        "--where", "-w",
+        help='Boolean metadata filter, e.g. "tag:edfa AND (tag:kafka OR domain:devops) NOT confidence:low"',
+    )
+    parser.add_argument("--query", "-q", help="Ranked (BM25) search over title, tags and body")
+    parser.add_argument("--substring", "-s", help="Case-insensitive exact substring match in file content")
+    parser.add_argument("--regex", "-r", help="Case-insensitive regular expression match in file content")
+    parser.add_argument(
+        "--limit", "-n", type=int, default=10,
+        help="Maximum number of ranked --query results to show (default: 10, 0 = all)",
+    )
+    parser.add_argument(
+        "--facets", "-f", action="store_true",
+        help="Also print match counts per domain, type, confidence and co-occurring tag",
+    )
+    parser.add_argument(
+        "--fuzzy", action="store_true",
+        help="Also match tags and --query title words within a few typos",
+    )
+    parser.add_argument(
+        "--semantic", action="store_true",
+        help="Rank --query by meaning (latent semantic index, needs NumPy) instead of BM25",
+    )
+    parser.add_argument(
+        "--backend", choices=("files", "sqlite"), default="files",
+        help="Search the entry files and .kf_cache indexes (default) or the SQLite store",
+    )
+    parser.add_argument(
+        "--no-daemon", action="store_true",
+        help="Scan entries directly even if a search daemon (serve.py) is running",
+    )
+    add_jobs_argument(parser)
+    add_profile_argument(parser)
 
     args = parser.parse_args()
+    start_profile(args)
 
     # If no filters provided, show help
-    if not any([args.tag, args.domain, args.type, args.confidence, args.query]):
+    if not any([args.tag, args.domain, args.type, args.confidence, args.where, args.query,
+                args.substring, args.regex]):
         parser.print_help()
         return 0
 
     root = get_root()
-    entries = load_entries(root)
-
-    if not entries:
-        print("No entries found in entries/")
-        return 1
-
-    matches = []
-    for path, fm, text in entries:
-        if matches_filter(fm, text, args.tag, args.domain, args.type, args.confidence, args.query):
-            matches.append((path, fm, text))
-
-    if not matches:
-        print("No matching entries found.")
+    start_telemetry(root, "search")
+    if args.semantic and args.backend == "sqlite":
+        print("ERROR: --semantic is only available with --backend files", file=sys.stderr)
         return 1
-
-    print(f"Found {len(matches)} match(es):\n")
-    for i, (path, fm, text) in enumerate(matches):
-        print(format_result(root, path, fm, text))
-        if i < len(matches) - 1:
-            print()
-
-    return 0
+    if args.backend == "sqlite":
+        try:
+            matches, total, facets, suggestions = search_sqlite(root, args)
+        except StoreError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        except re.error as e:
+            print(f"ERROR: invalid --regex pattern: {e}", file=sys.stderr)
+            return 1
+        except FilterError as e:
+            print(f"ERROR: invalid --where expression: {e}", file=sys.stderr)
+            return 1
+        return print_results(root, matches, total, facets=facets, suggestions=suggestions)
+
+    if not args.no_daemon:
+        status = query_daemon(root, args)
+        if status is not None:
+            return status
+
+    return run_search(root, args, load_state(root, args.jobs))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""Persistent inverted index with BM25 ranking for search.py --query.
+
+The index maps each term to its postings: entry ids with the term's
+precomputed BM25 impact on each. Title, tags and body are tokenized
+separately and weighted by FIELD_WEIGHTS before scoring, so a hit in the
+title outranks the same word buried in a Recipe section.
+
+Two files live under .kf_cache/:
+  - inverted.json    : postings, entry paths and lengths used at query time
+  - termvectors.json : per-entry term frequencies keyed by stat, so a rebuild
+                       only re-reads entries that changed
+
+rebuild_index.py refreshes the index after every build; search.py rebuilds
+it on demand when the corpus signature (all entry stat keys) has changed.
+
+Usage (as a library):
+    from search_index import ensure_index, bm25_search
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import re
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from entry_cache import atomic_write_text, cache_enabled, get_cache_dir, scan_state
+from entry_parser import read_entry
+from instrument import timed
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+INDEX_FILE_NAME = "inverted.json"
+VECTORS_FILE_NAME = "termvectors.json"
+# Bump when tokenization, weights or the file layout change
+INDEX_VERSION = 1
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "body": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Queries touching at most this many postings are scored exhaustively
+EXHAUSTIVE_LIMIT = 4096
+
+
+# ---------------------------------------------------------------------------
+# Tokenization
+# ---------------------------------------------------------------------------
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into alphanumeric terms."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def document_vector(record: Dict, body: str) -> Tuple[Dict[str, float], float]:
+    """Return (field-weighted term frequencies, weighted length) for an entry."""
+    fm = record["frontmatter"] or {}
+    tags = fm.get("tags", [])
+    if not isinstance(tags, list):
+        tags = [tags]
+    fields = {
+        "title": str(fm.get("title", Path(record["path"]).stem)),
+        "tags": " ".join(str(t) for t in tags),
+        "body": body,
+    }
+
+    terms: Dict[str, float] = {}
+    length = 0.0
+    for field, text in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for term in tokenize(text):
+            terms[term] = terms.get(term, 0.0) + weight
+            length += weight
+    return terms, length
+
+
+def corpus_signature(stats: Dict[str, List[int]]) -> str:
+    """Return a digest of every entry's path and stat key."""
+    return hashlib.sha1(json.dumps(stats, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Load / save
+# ---------------------------------------------------------------------------
+
+def load_json(path: Path) -> Optional[Dict]:
+    """Load a versioned cache file, returning None if missing or stale."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return None
+    return data
+
+
+def save_json(path: Path, data: Dict) -> None:
+    """Persist a cache file. Failures (read-only checkout) are ignored."""
+    try:
+        atomic_write_text(path, json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+    except OSError:
+        pass
+
+
+def load_index(root: Path) -> Optional[Dict]:
+    """Load the persisted inverted index, or None if absent."""
+    return load_json(get_cache_dir(root) / INDEX_FILE_NAME)
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def build_postings(
+    term_docs: Dict[str, List[Tuple[int, float]]],
+    lengths: List[float],
+) -> Dict[str, List[List]]:
+    """Turn {term: [(doc_id, tf)]} into impact postings.
+
+    Each posting is [doc_ids, impacts, order]: doc ids ascending, the
+    precomputed BM25 contribution of the term to each doc, and the positions
+    of the docs in descending impact order (for early-terminating top-k).
+    """
+    n_docs = len(lengths)
+    avgdl = (sum(lengths) / n_docs) if n_docs else 1.0
+    postings: Dict[str, List[List]] = {}
+    for term, docs in term_docs.items():
+        df = len(docs)
+        idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        doc_ids = [doc_id for doc_id, _ in docs]
+        impacts = []
+        for doc_id, tf in docs:
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths[doc_id] / avgdl)
+            impacts.append(round(idf * tf * (BM25_K1 + 1.0) / (tf + norm), 6))
+        order = sorted(range(df), key=lambda i: (-impacts[i], doc_ids[i]))
+        postings[term] = [doc_ids, impacts, order]
+    return postings
+
+
+def build_index(
+    root: Path,
+    scanned: List[Tuple[Path, Dict]],
+    stats: Dict[str, List[int]],
+) -> Dict:
+    """Build the inverted index, re-reading only entries whose stat changed."""
+    old_vectors = (load_json(get_cache_dir(root) / VECTORS_FILE_NAME) or {}).get("docs", {})
+    vectors: Dict[str, Dict] = {}
+
+    paths: List[str] = []
+    lengths: List[float] = []
+    term_docs: Dict[str, List[Tuple[int, float]]] = {}
+
+    for md_file, record in scanned:
+        if record["frontmatter"] is None:
+            continue
+        rel_path = record["path"]
+        cached = old_vectors.get(rel_path)
+        if cached is not None and cached["stat"] == stats.get(rel_path):
+            vector = cached
+        else:
+            terms, length = document_vector(record, read_entry(md_file)["body"])
+            vector = {"stat": stats.get(rel_path), "length": length, "terms": terms}
+        vectors[rel_path] = vector
+
+        doc_id = len(paths)
+        paths.append(rel_path)
+        lengths.append(vector["length"])
+        for term, tf in vector["terms"].items():
+            docs = term_docs.get(term)
+            if docs is None:
+                docs = term_docs[term] = []
+            docs.append((doc_id, tf))
+
+    index = {
+        "version": INDEX_VERSION,
+        "signature": corpus_signature(stats),
+        "paths": paths,
+        "postings": build_postings(term_docs, lengths),
+    }
+    if cache_enabled():
+        save_json(get_cache_dir(root) / VECTORS_FILE_NAME, {"version": INDEX_VERSION, "docs": vectors})
+        save_json(get_cache_dir(root) / INDEX_FILE_NAME, index)
+    return index
+
+
+@timed("index")
+def ensure_index(
+    root: Path,
+    scanned: Optional[List[Tuple[Path, Dict]]] = None,
+    stats: Optional[Dict[str, List[int]]] = None,
+) -> Dict:
+    """Return an up-to-date index, rebuilding it if any entry changed."""
+    if scanned is None or stats is None:
+        scanned, stats = scan_state(root)
+    index = load_index(root) if cache_enabled() else None
+    if index is not None and index.get("signature") == corpus_signature(stats):
+        return index
+    return build_index(root, scanned, stats)
+
+
+# ---------------------------------------------------------------------------
+# Query
+# ---------------------------------------------------------------------------
+
+def path_id_map(index: Dict) -> Dict[str, int]:
+    """Return {rel_path: doc_id}, memoized on the in-memory index."""
+    path_ids = index.get("_path_ids")
+    if path_ids is None:
+        path_ids = index["_path_ids"] = {path: i for i, path in enumerate(index["paths"])}
+    return path_ids
+
+
+def term_impact(posting: List[List], doc_id: int) -> float:
+    """Return a term's impact for doc_id (0.0 if the doc lacks the term)."""
+    doc_ids = posting[0]
+    i = bisect_left(doc_ids, doc_id)
+    if i < len(doc_ids) and doc_ids[i] == doc_id:
+        return posting[1][i]
+    return 0.0
+
+
+def bm25_search(
+    index: Dict,
+    query: str,
+    allowed: Optional[Set[str]] = None,
+    limit: Optional[int] = 10,
+    count_total: bool = True,
+) -> Tuple[List[Tuple[str, float]], Optional[int]]:
+    """Rank entries for a multi-term query with BM25.
+
+    allowed restricts results to a set of relative paths (metadata filters).
+    Returns (top results as (path, score) best first, total matching count).
+    Counting every match of a very common term costs a set union over its
+    postings, so callers that only need the top results can pass
+    count_total=False (the total is then None).
+
+    Small candidate sets and short postings are scored exhaustively.
+    Otherwise the top `limit` are found with the threshold algorithm: walk
+    each term's postings in impact order, score newly seen docs by random
+    access, and stop once the k-th best score beats the best score any
+    unseen doc could still reach.
+    """
+    paths = index["paths"]
+    postings = index["postings"]
+    terms = [postings[t] for t in sorted(set(tokenize(query))) if t in postings]
+    if not terms:
+        return [], 0
+
+    allowed_ids = None
+    if allowed is not None:
+        path_ids = path_id_map(index)
+        allowed_ids = {path_ids[path] for path in allowed if path in path_ids}
+
+    def score(doc_id: int) -> float:
+        return sum(term_impact(posting, doc_id) for posting in terms)
+
+    def matched_ids() -> Set[int]:
+        matched = set(terms[0][0]).union(*(posting[0] for posting in terms[1:]))
+        if allowed_ids is not None:
+            matched &= allowed_ids
+        return matched
+
+    posting_total = sum(len(posting[0]) for posting in terms)
+    scored = None
+    if allowed_ids is not None and len(allowed_ids) <= EXHAUSTIVE_LIMIT:
+        # Few candidates: random access into each posting
+        scored = [(s, doc_id) for s, doc_id in ((score(d), d) for d in allowed_ids) if s > 0.0]
+    elif limit is None or posting_total <= EXHAUSTIVE_LIMIT:
+        # Short postings: accumulate term-at-a-time
+        accumulators: Dict[int, float] = {}
+        for doc_ids, impacts, _ in terms:
+            for doc_id, impact in zip(doc_ids, impacts):
+                if allowed_ids is None or doc_id in allowed_ids:
+                    accumulators[doc_id] = accumulators.get(doc_id, 0.0) + impact
+        scored = [(s, doc_id) for doc_id, s in accumulators.items()]
+
+    if scored is not None:
+        if limit is None:
+            ranked = sorted(scored, key=lambda item: (-item[0], item[1]))
+        else:
+            ranked = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], item[1]))
+        return [(paths[doc_id], s) for s, doc_id in ranked], len(scored)
+
+    # Threshold algorithm; heap holds (score, -doc_id) so ties favour low ids
+    heap: List[Tuple[float, int]] = []
+    seen: Set[int] = set()
+    max_depth = max(len(posting[0]) for posting in terms)
+    for depth in range(max_depth):
+        threshold = 0.0
+        for doc_ids, impacts, order in terms:
+            if depth >= len(order):
+                continue
+            i = order[depth]
+            threshold += impacts[i]
+            doc_id = doc_ids[i]
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+            if allowed_ids is not None and doc_id not in allowed_ids:
+                continue
+            item = (score(doc_id), -doc_id)
+            if len(heap) < limit:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+        if len(heap) == limit and heap[0][0] > threshold:
+            break
+
+    ranked = sorted(heap, key=lambda item: (-item[0], -item[1]))
+    total = None
+    if count_total:
+        if len(terms) == 1 and allowed_ids is None:
+            total = len(terms[0][0])
+        else:
+            total = len(matched_ids())
+    return [(paths[-neg_id], s) for s, neg_id in ranked], total
+
+
+def matching_paths(index: Dict, query: str, allowed: Optional[Set[str]] = None) -> Set[str]:
+    """Return the paths of every entry bm25_search counts as a match.
+
+    An entry matches if it contains any query term; allowed restricts the
+    result like in bm25_search.
+    """
+    postings = index["postings"]
+    doc_ids: Set[int] = set()
+    for term in set(tokenize(query)):
+        if term in postings:
+            doc_ids.update(postings[term][0])
+    paths = index["paths"]
+    matched = {paths[doc_id] for doc_id in doc_ids}
+    if allowed is not None:
+        matched &= allowed
+    return matched
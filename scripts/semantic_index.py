@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""Latent semantic index for search.py --semantic.
+
+Keyword search misses entries phrased differently from the question
+("amplifier tilt" vs an entry on EDFA gain modeling). This index maps each
+entry to a dense vector in which such entries end up close:
+
+  1. The field-weighted term frequencies of search_index.py are hashed into
+     FEATURES columns (1 + log tf, sign-hashed), weighted by IDF and
+     L2-normalized: a sparse TF-IDF matrix that needs no vocabulary.
+  2. A randomized truncated SVD of that matrix gives a projection onto its
+     top DIMENSIONS singular directions (latent semantic analysis).
+  3. Each entry's projected, normalized vector is one float32 row.
+
+A query goes through the same steps, and its cosine similarity with every
+entry is a single matrix-vector product over the memory-mapped rows.
+
+Files under .kf_cache/semantic/:
+  - meta.json   : row paths and stat keys, sizes, fit bookkeeping
+  - vectors.f32 : entry vectors, rows x dimensions float32
+  - basis.f32   : the projection, FEATURES x dimensions float32
+  - idf.f32     : IDF weight per feature
+
+The index is created by the first --semantic search. Afterwards
+rebuild_index.py (and so curate.py) folds new and changed entries into it
+with the existing IDF and projection, writing only their rows; deleted
+entries free their rows for reuse. Once more than REFIT_RATIO of the rows
+have been folded in since the last fit, the projection is fitted again.
+
+Everything runs locally on the CPU. It is the one feature that needs NumPy;
+without it --semantic fails with a clear error and the other scripts skip
+the index.
+
+Usage (as a library):
+    from semantic_index import ensure_semantic_index, semantic_search
+"""
+
+import json
+import math
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for --semantic
+    np = None
+
+from entry_cache import atomic_write_bytes, atomic_write_text, cache_enabled, get_cache_dir, scan_state
+from entry_parser import read_entry
+from instrument import timed
+from search_index import (
+    VECTORS_FILE_NAME as TERM_VECTORS_FILE_NAME,
+    corpus_signature,
+    document_vector,
+    load_json,
+    tokenize,
+)
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+SEMANTIC_DIR_NAME = "semantic"
+META_FILE_NAME = "meta.json"
+VECTORS_FILE_NAME = "vectors.f32"
+BASIS_FILE_NAME = "basis.f32"
+IDF_FILE_NAME = "idf.f32"
+# Bump when features, weighting or the file layout change
+SEMANTIC_VERSION = 1
+
+FEATURES = 1 << 15
+DIMENSIONS = 128
+OVERSAMPLING = 10
+POWER_ITERATIONS = 2
+# Refit once row updates since the last fit exceed this share of its rows
+REFIT_RATIO = 0.25
+# Entries below this cosine similarity to the query do not match
+MIN_SIMILARITY = 0.1
+# Nonzeros per block in sparse products; keeps the temporary nnz x k array
+# in cache, which matters more than the number of NumPy calls
+BLOCK_NONZEROS = 4096
+
+
+class SemanticError(RuntimeError):
+    """Raised when the semantic index cannot be used (NumPy missing)."""
+
+
+def require_numpy() -> None:
+    """Raise SemanticError if NumPy is not installed."""
+    if np is None:
+        raise SemanticError("--semantic needs NumPy (pip install numpy); the other search modes do not")
+
+
+def get_semantic_dir(root: Path) -> Path:
+    """Return the directory holding the semantic index files."""
+    return get_cache_dir(root) / SEMANTIC_DIR_NAME
+
+
+# ---------------------------------------------------------------------------
+# Features
+# ---------------------------------------------------------------------------
+
+_feature_memo: Dict[str, Tuple[int, float]] = {}
+
+
+def feature_of(term: str) -> Tuple[int, float]:
+    """Return (column, sign) of a term in the hashed feature space."""
+    feature = _feature_memo.get(term)
+    if feature is None:
+        h = zlib.crc32(term.encode("utf-8"))
+        feature = _feature_memo[term] = (h % FEATURES, 1.0 if h & 0x80000000 else -1.0)
+    return feature
+
+
+def hashed_row(terms: Dict[str, float]) -> Dict[int, float]:
+    """Hash {term: weighted tf} into {column: signed 1 + log tf}."""
+    row: Dict[int, float] = {}
+    for term, tf in terms.items():
+        column, sign = feature_of(term)
+        row[column] = row.get(column, 0.0) + sign * (1.0 + math.log(tf))
+    return row
+
+
+def to_csr(rows: List[Dict[int, float]]) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Pack hashed rows into CSR arrays (indptr, indices, data)."""
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(row) for row in rows])
+    indices = np.fromiter((c for row in rows for c in row), dtype=np.int32, count=int(indptr[-1]))
+    data = np.fromiter((v for row in rows for v in row.values()), dtype=np.float32, count=int(indptr[-1]))
+    return indptr, indices, data
+
+
+def apply_idf(indptr: "np.ndarray", indices: "np.ndarray", data: "np.ndarray", idf: "np.ndarray") -> None:
+    """Weight CSR data by IDF and L2-normalize each row, in place."""
+    data *= idf[indices]
+    row_ids = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    norms = np.sqrt(np.bincount(row_ids, weights=data.astype(np.float64) ** 2, minlength=len(indptr) - 1))
+    norms[norms == 0] = 1.0
+    data /= norms[row_ids].astype(np.float32)
+
+
+def csr_matmul(indptr: "np.ndarray", indices: "np.ndarray", data: "np.ndarray", dense: "np.ndarray") -> "np.ndarray":
+    """Return the sparse matrix (CSR arrays) times a dense matrix."""
+    n_rows = len(indptr) - 1
+    out = np.zeros((n_rows, dense.shape[1]), dtype=np.float32)
+    start = 0
+    while start < n_rows:
+        # About BLOCK_NONZEROS nonzeros per block, and at least one row
+        stop = int(np.searchsorted(indptr, indptr[start] + BLOCK_NONZEROS, side="right")) - 1
+        stop = min(max(stop, start + 1), n_rows)
+        lo, hi = indptr[start], indptr[stop]
+        if hi > lo:
+            products = data[lo:hi, None] * dense[indices[lo:hi]]
+            starts = indptr[start:stop] - lo
+            nonempty = np.diff(indptr[start:stop + 1]) > 0
+            out[start:stop][nonempty] = np.add.reduceat(products, starts[nonempty], axis=0)
+        start = stop
+    return out
+
+
+def csr_transpose(
+    indptr: "np.ndarray", indices: "np.ndarray", data: "np.ndarray", n_cols: int
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Return the CSR arrays of the transposed matrix."""
+    row_ids = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+    order = np.argsort(indices, kind="stable")
+    t_indptr = np.zeros(n_cols + 1, dtype=np.int64)
+    t_indptr[1:] = np.cumsum(np.bincount(indices, minlength=n_cols))
+    return t_indptr, row_ids[order], data[order]
+
+
+def fit_basis(csr: Tuple, n_rows: int, dimensions: int) -> "np.ndarray":
+    """Return the top right singular vectors (FEATURES x dimensions) of the matrix.
+
+    Randomized range finder with power iterations (Halko, Martinsson and
+    Tropp), so only products with the sparse matrix are needed.
+    """
+    csr_t = csr_transpose(*csr, FEATURES)
+    width = min(dimensions + OVERSAMPLING, n_rows, FEATURES)
+    rng = np.random.default_rng(0)
+    sample = csr_matmul(*csr, rng.standard_normal((FEATURES, width), dtype=np.float32))
+    q = np.linalg.qr(sample)[0]
+    for _ in range(POWER_ITERATIONS):
+        z = np.linalg.qr(csr_matmul(*csr_t, q))[0]
+        q = np.linalg.qr(csr_matmul(*csr, z))[0]
+    # B = Q^T X is small (width x FEATURES); its SVD gives X's right vectors
+    b = csr_matmul(*csr_t, q).T
+    vt = np.linalg.svd(b.astype(np.float64), full_matrices=False)[2]
+    return np.ascontiguousarray(vt[:dimensions].T, dtype=np.float32)
+
+
+def project(csr: Tuple, basis: "np.ndarray") -> "np.ndarray":
+    """Project TF-IDF rows onto the basis and L2-normalize the results."""
+    vectors = csr_matmul(*csr, basis)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def term_vectors(
+    root: Path, items: List[Tuple[Path, Dict]], stats: Dict[str, List[int]]
+) -> List[Dict[str, float]]:
+    """Return field-weighted term frequencies for entries.
+
+    Reuses search_index.py's cached term vectors where the stat key still
+    matches, so only entries the BM25 index has not seen are read.
+    """
+    cached = (load_json(get_cache_dir(root) / TERM_VECTORS_FILE_NAME) or {}).get("docs", {})
+    result = []
+    for md_file, record in items:
+        vector = cached.get(record["path"])
+        if vector is not None and vector["stat"] == stats.get(record["path"]):
+            result.append(vector["terms"])
+        else:
+            result.append(document_vector(record, read_entry(md_file)["body"])[0])
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Load / save
+# ---------------------------------------------------------------------------
+
+def write_array(path: Path, array: "np.ndarray") -> None:
+    """Write an array's raw float32 data atomically."""
+    atomic_write_bytes(path, np.ascontiguousarray(array, dtype=np.float32).tobytes())
+
+
+def map_array(path: Path, shape: Tuple[int, ...], mode: str = "r") -> "np.ndarray":
+    """Memory-map a float32 file (an empty array for zero rows)."""
+    if 0 in shape:
+        return np.zeros(shape, dtype=np.float32)
+    return np.memmap(path, dtype=np.float32, mode=mode, shape=shape)
+
+
+def load_semantic_index(root: Path) -> Optional[Dict]:
+    """Open the persisted index, or return None if absent or unusable."""
+    directory = get_semantic_dir(root)
+    try:
+        meta = json.loads((directory / META_FILE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict) or meta.get("version") != SEMANTIC_VERSION or meta.get("features") != FEATURES:
+        return None
+    rows, dims = len(meta["paths"]), meta["dimensions"]
+    try:
+        if (directory / VECTORS_FILE_NAME).stat().st_size < rows * dims * 4:
+            return None
+        index = {
+            "meta": meta,
+            "vectors": map_array(directory / VECTORS_FILE_NAME, (rows, dims)),
+            "basis": map_array(directory / BASIS_FILE_NAME, (FEATURES, dims)),
+            "idf": map_array(directory / IDF_FILE_NAME, (FEATURES,)),
+        }
+    except (OSError, ValueError):
+        return None
+    return index
+
+
+def save_meta(root: Path, meta: Dict) -> None:
+    """Write meta.json last, so it only ever describes complete arrays."""
+    atomic_write_text(get_semantic_dir(root) / META_FILE_NAME, json.dumps(meta, separators=(",", ":")))
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def fit_index(root: Path, items: List[Tuple[Path, Dict]], stats: Dict[str, List[int]]) -> Dict:
+    """Fit IDF and the projection on all entries and compute every row."""
+    indptr, indices, data = to_csr([hashed_row(terms) for terms in term_vectors(root, items, stats)])
+    n_rows = len(items)
+    df = np.bincount(indices, minlength=FEATURES)
+    idf = (np.log((1.0 + n_rows) / (1.0 + df)) + 1.0).astype(np.float32)
+    apply_idf(indptr, indices, data, idf)
+
+    dimensions = max(1, min(DIMENSIONS, n_rows))
+    if n_rows:
+        basis = fit_basis((indptr, indices, data), n_rows, dimensions)
+        vectors = project((indptr, indices, data), basis)
+    else:
+        basis = np.zeros((FEATURES, dimensions), dtype=np.float32)
+        vectors = np.zeros((0, dimensions), dtype=np.float32)
+
+    paths = [record["path"] for _, record in items]
+    meta = {
+        "version": SEMANTIC_VERSION,
+        "features": FEATURES,
+        "dimensions": dimensions,
+        "signature": corpus_signature(stats),
+        "paths": paths,
+        "stats": {path: stats.get(path) for path in paths},
+        "fit_rows": n_rows,
+        "folded": 0,
+    }
+    if cache_enabled():
+        try:
+            directory = get_semantic_dir(root)
+            write_array(directory / VECTORS_FILE_NAME, vectors)
+            write_array(directory / BASIS_FILE_NAME, basis)
+            write_array(directory / IDF_FILE_NAME, idf)
+            save_meta(root, meta)
+        except OSError:
+            pass
+    return {"meta": meta, "vectors": vectors, "basis": basis, "idf": idf}
+
+
+def fold_in(root: Path, index: Dict, items: List[Tuple[Path, Dict]], stats: Dict[str, List[int]]) -> Dict:
+    """Update only the rows of new, changed and deleted entries of a saved index.
+
+    New and changed entries are projected with the stored IDF and basis;
+    deleted entries become free rows (path None, zero vector) that later
+    additions reuse. Falls back to a full fit once too much has been folded.
+    """
+    meta = index["meta"]
+    paths: List[Optional[str]] = list(meta["paths"])
+    current = {record["path"] for _, record in items}
+    changed = [(md_file, record) for md_file, record in items
+               if meta["stats"].get(record["path"]) != stats.get(record["path"])]
+    removed = [row for row, path in enumerate(paths) if path is not None and path not in current]
+
+    folded = meta["folded"] + len(changed) + len(removed)
+    if folded > REFIT_RATIO * max(meta["fit_rows"], 1):
+        return fit_index(root, items, stats)
+
+    row_of = {path: row for row, path in enumerate(paths) if path is not None}
+    for row in removed:
+        del row_of[paths[row]]
+        paths[row] = None
+    free = [row for row, path in enumerate(paths) if path is None]
+    free.reverse()
+    targets = []
+    for _, record in changed:
+        row = row_of.get(record["path"])
+        if row is None:
+            row = free.pop() if free else len(paths)
+            if row == len(paths):
+                paths.append(None)
+            paths[row] = record["path"]
+        targets.append(row)
+
+    new_stats = {path: stats.get(path) for path in paths if path is not None}
+    meta = dict(meta, paths=paths, stats=new_stats, folded=folded, signature=corpus_signature(stats))
+    dims = meta["dimensions"]
+
+    csr = to_csr([hashed_row(terms) for terms in term_vectors(root, changed, stats)])
+    apply_idf(*csr, np.asarray(index["idf"]))
+    new_rows = project(csr, np.asarray(index["basis"]))
+
+    # Write the touched rows in place (growing the file for appended rows),
+    # then meta.json; a crash in between only leaves rows to refresh again
+    vectors_path = get_semantic_dir(root) / VECTORS_FILE_NAME
+    try:
+        with open(vectors_path, "r+b") as f:
+            f.truncate(len(paths) * dims * 4)
+        vectors = map_array(vectors_path, (len(paths), dims), mode="r+")
+        vectors[removed] = 0.0
+        vectors[targets] = new_rows
+        if isinstance(vectors, np.memmap):
+            vectors.flush()
+        save_meta(root, meta)
+    except OSError:
+        return fit_index(root, items, stats)
+    return load_semantic_index(root) or fit_index(root, items, stats)
+
+
+@timed("index")
+def ensure_semantic_index(
+    root: Path,
+    scanned: Optional[List[Tuple[Path, Dict]]] = None,
+    stats: Optional[Dict[str, List[int]]] = None,
+    create: bool = True,
+) -> Optional[Dict]:
+    """Return the index for the current entries, updating it incrementally.
+
+    With create=False a missing index is not built and None is returned.
+    Raises SemanticError if NumPy is not installed.
+    """
+    require_numpy()
+    if scanned is None or stats is None:
+        scanned, stats = scan_state(root)
+    items = [(md_file, record) for md_file, record in scanned if record["frontmatter"] is not None]
+    index = load_semantic_index(root) if cache_enabled() else None
+    if index is None:
+        return fit_index(root, items, stats) if create else None
+    if index["meta"]["signature"] == corpus_signature(stats):
+        return index
+    return fold_in(root, index, items, stats)
+
+
+@timed("index")
+def refresh_semantic_index(
+    root: Path, scanned: List[Tuple[Path, Dict]], stats: Dict[str, List[int]]
+) -> None:
+    """Fold changed entries into an existing index; a no-op without one or without NumPy."""
+    if np is not None and cache_enabled():
+        ensure_semantic_index(root, scanned, stats, create=False)
+
+
+# ---------------------------------------------------------------------------
+# Query
+# ---------------------------------------------------------------------------
+
+def query_vector(index: Dict, query: str) -> Optional["np.ndarray"]:
+    """Project a query into the index space, or None if none of its terms are known."""
+    terms: Dict[str, float] = {}
+    for term in tokenize(query):
+        terms[term] = terms.get(term, 0.0) + 1.0
+    if not terms:
+        return None
+    csr = to_csr([hashed_row(terms)])
+    apply_idf(*csr, np.asarray(index["idf"]))
+    vector = csr_matmul(*csr, np.asarray(index["basis"]))[0]
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else None
+
+
+def semantic_search(
+    index: Dict, query: str, allowed: Optional[Set[str]] = None, limit: Optional[int] = 10
+) -> Tuple[List[Tuple[str, float]], int]:
+    """Rank entries by cosine similarity to query.
+
+    Returns ([(rel_path, score)] best first, total matching count); entries
+    below MIN_SIMILARITY or outside allowed (if given) do not match.
+    """
+    vector = query_vector(index, query)
+    paths = index["meta"]["paths"]
+    if vector is None or not paths:
+        return [], 0
+
+    scores = index["vectors"] @ vector
+    keep = np.fromiter((path is not None and (allowed is None or path in allowed) for path in paths),
+                       dtype=bool, count=len(paths))
+    keep &= scores >= MIN_SIMILARITY
+    rows = np.flatnonzero(keep)
+    total = len(rows)
+    if limit is not None and total > limit:
+        rows = rows[np.argpartition(-scores[rows], limit - 1)[:limit]]
+    rows = sorted(rows.tolist(), key=lambda row: (-float(scores[row]), paths[row]))
+    return [(paths[row], round(float(scores[row]), 4)) for row in rows], total
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Search daemon: answer search.py queries from a warm in-memory index.
+
+Every search.py run pays for interpreter startup, a stat of every entry and
+loading the inverted and trigram indexes from .kf_cache/. This daemon does
+that once and keeps the result in memory. It listens on a Unix socket
+(.kf_cache/search.sock); search.py sends its arguments there and prints the
+daemon's output. When no daemon is running, search.py scans directly.
+
+The daemon polls entries/ every --interval seconds (stat only) and reloads
+its state when an entry is added, removed or modified, so answers lag edits
+by at most one interval.
+
+Protocol: one JSON line per connection each way.
+    request  : {"version": 5, "args": {"tag": ..., "where": ..., "query": ..., ...}}
+    response : {"version": 5, "status": 0, "stdout": "...", "stderr": "..."}
+
+Usage:
+    python scripts/serve.py                 # serve until interrupted
+    python scripts/serve.py --interval 5    # poll entries/ every 5 seconds
+"""
+
+import argparse
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+from pathlib import Path
+from typing import Dict
+
+from entry_cache import add_jobs_argument, stat_entries
+from search import (
+    PROTOCOL_VERSION, SEARCH_FIELDS, get_root, get_socket_path, load_state, run_search,
+)
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+DEFAULT_INTERVAL = 2.0
+DEFAULT_LIMIT = 10
+# Request fields that are not strings (None is always allowed)
+INTEGER_FIELDS = ("limit",)
+BOOLEAN_FIELDS = ("facets", "fuzzy", "semantic")
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+def request_args(params: Dict) -> argparse.Namespace:
+    """Check a request's search arguments and convert them to run_search()'s Namespace.
+
+    Integer strings become integers and numbers given for string fields
+    become strings, as mcp_server.check_arguments() does; any other type
+    mismatch raises ValueError.
+    """
+    values: Dict = {}
+    for name in SEARCH_FIELDS:
+        value = params.get(name)
+        if value is None:
+            pass
+        elif name in INTEGER_FIELDS:
+            if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+                value = int(value)
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f"{name} must be an integer")
+        elif name in BOOLEAN_FIELDS:
+            if not isinstance(value, bool):
+                raise ValueError(f"{name} must be true or false")
+        elif isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError(f"{name} must be a string")
+        else:
+            value = str(value)
+        values[name] = value
+    if values["limit"] is None:
+        values["limit"] = DEFAULT_LIMIT
+    return argparse.Namespace(**values)
+
+
+class SearchHandler(socketserver.StreamRequestHandler):
+    """Answer one JSON search request per connection."""
+
+    def handle(self) -> None:
+        server: "SearchServer" = self.server  # type: ignore[assignment]
+        try:
+            request = json.loads(self.rfile.readline())
+            params = request["args"]
+            if request.get("version") != PROTOCOL_VERSION or not isinstance(params, dict):
+                raise ValueError("unsupported request")
+            args = request_args(params)
+        except (ValueError, KeyError, TypeError) as e:
+            response = {"version": PROTOCOL_VERSION, "status": 2, "stdout": "",
+                        "stderr": f"ERROR: bad request: {e}\n"}
+        else:
+            out, err = io.StringIO(), io.StringIO()
+            try:
+                status = run_search(server.root, args, server.state, out, err)
+                response = {"version": PROTOCOL_VERSION, "status": status,
+                            "stdout": out.getvalue(), "stderr": err.getvalue()}
+            except Exception as e:
+                # Answer anyway: a client left without a reply falls back to a cold scan
+                traceback.print_exc(file=sys.stderr)
+                response = {"version": PROTOCOL_VERSION, "status": 2, "stdout": "",
+                            "stderr": f"ERROR: search failed: {type(e).__name__}: {e}\n"}
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+class SearchServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server holding the warm search state.
+
+    state is replaced wholesale by the watcher thread; handlers read it
+    once per request, so a search never sees a half-updated state.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, root: Path, state: Dict) -> None:
+        self.root = root
+        self.state = state
+        super().__init__(str(socket_path), SearchHandler)
+
+
+def watch(server: SearchServer, interval: float, jobs: int, stop: threading.Event) -> None:
+    """Reload the server state whenever an entry's stat changes."""
+    while not stop.wait(interval):
+        try:
+            if stat_entries(server.root) == server.state["stats"]:
+                continue
+            server.state = load_state(server.root, jobs, warm=True)
+        except OSError as e:
+            print(f"WARNING: could not reload entries: {e}", file=sys.stderr, flush=True)
+            continue
+        entry_count = sum(1 for _, record in server.state["scanned"] if record["frontmatter"] is not None)
+        print(f"Reloaded: {entry_count} entries", flush=True)
+
+
+def daemon_running(socket_path: Path) -> bool:
+    """Return True if something is accepting connections on socket_path."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Serve search.py queries from a warm in-memory index over a Unix socket.",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=DEFAULT_INTERVAL,
+        help=f"Seconds between checks of entries/ for changes (default: {DEFAULT_INTERVAL:g})",
+    )
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("ERROR: Unix sockets are not available on this platform", file=sys.stderr)
+        return 1
+
+    root = get_root()
+    socket_path = get_socket_path(root)
+    if daemon_running(socket_path):
+        print(f"ERROR: a search daemon is already listening on {socket_path}", file=sys.stderr)
+        return 1
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        socket_path.unlink()  # stale socket from a daemon that did not exit cleanly
+    except FileNotFoundError:
+        pass
+
+    state = load_state(root, args.jobs, warm=True)
+
+    # Only the owner may connect
+    umask = os.umask(0o177)
+    try:
+        server = SearchServer(socket_path, root, state)
+    except OSError as e:
+        print(f"ERROR: cannot listen on {socket_path}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        os.umask(umask)
+
+    stop = threading.Event()
+    watcher = threading.Thread(target=watch, args=(server, args.interval, args.jobs, stop), daemon=True)
+    watcher.start()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    entry_count = sum(1 for _, record in state["scanned"] if record["frontmatter"] is not None)
+    print(f"Serving {entry_count} entries on {socket_path} "
+          f"(checking entries/ every {args.interval:g} s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        try:
+            socket_path.unlink()
+        except FileNotFoundError:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
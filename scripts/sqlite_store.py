@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""Optional SQLite backend mirroring entries/ for indexed queries.
+
+The store is a single database file, .kf_cache/entries.sqlite, holding:
+  - entries     : one row per entry file with its stat key, the frontmatter
+                  (as JSON) and indexed columns for type, domain, confidence,
+                  created and updated
+  - entry_tags  : one row per tag use, indexed by tag
+  - entries_fts : FTS5 table over title, tags and body, for ranked matches
+                  with snippets
+
+The markdown files stay the source of truth. sync_store() brings the
+database in line with entries/ by stat key, re-reading only files that
+changed, so the store can be deleted and rebuilt from markdown at any time.
+search.py and stats.py use it with --backend sqlite; curate.py syncs it
+after promoting entries once it exists.
+
+Usage:
+    python scripts/sqlite_store.py             # create or sync the store
+    python scripts/sqlite_store.py --rebuild   # drop and rebuild from markdown
+
+Usage (as a library):
+    from sqlite_store import open_store, sync_store
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from entry_cache import cache_enabled, get_cache_dir, scan_state
+from entry_parser import read_entry
+from instrument import add_profile_argument, start_profile, timed
+from search_index import FIELD_WEIGHTS, tokenize
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+STORE_FILE_NAME = "entries.sqlite"
+# Bump when the schema or the derived columns change
+STORE_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE entries (
+    id          INTEGER PRIMARY KEY,
+    path        TEXT NOT NULL UNIQUE,
+    sort_key    TEXT NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    size        INTEGER NOT NULL,
+    ino         INTEGER NOT NULL,
+    frontmatter TEXT,
+    title       TEXT NOT NULL DEFAULT '',
+    type        TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    domain      TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    confidence  TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    complexity  TEXT NOT NULL DEFAULT '',
+    created     TEXT NOT NULL DEFAULT '',
+    updated     TEXT NOT NULL DEFAULT '',
+    category    TEXT NOT NULL DEFAULT '',
+    related     INTEGER NOT NULL DEFAULT 0,
+    tags_listed INTEGER NOT NULL DEFAULT 0,
+    problem     TEXT,
+    first_line  TEXT
+);
+CREATE INDEX entries_sort_key ON entries(sort_key);
+CREATE INDEX entries_type ON entries(type);
+CREATE INDEX entries_domain ON entries(domain);
+CREATE INDEX entries_confidence ON entries(confidence);
+CREATE INDEX entries_created ON entries(created);
+CREATE INDEX entries_updated ON entries(updated);
+
+CREATE TABLE entry_tags (
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    pos      INTEGER NOT NULL,
+    tag      TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (entry_id, pos)
+) WITHOUT ROWID;
+CREATE INDEX entry_tags_tag ON entry_tags(tag, entry_id);
+
+CREATE VIRTUAL TABLE entries_fts USING fts5(title, tags, body);
+"""
+
+
+class StoreError(Exception):
+    """Raised when the SQLite store cannot be used (e.g. no FTS5 support)."""
+
+
+# ---------------------------------------------------------------------------
+# Open / create
+# ---------------------------------------------------------------------------
+
+def get_store_path(root: Path) -> Path:
+    """Return the database path for a knowledge framework root."""
+    return get_cache_dir(root) / STORE_FILE_NAME
+
+
+def store_exists(root: Path) -> bool:
+    """Return True if the store has been created for this root."""
+    return get_store_path(root).is_file()
+
+
+def create_schema(conn: sqlite3.Connection) -> None:
+    """Drop any existing tables and create the current schema."""
+    conn.executescript("""
+        DROP TABLE IF EXISTS entries_fts;
+        DROP TABLE IF EXISTS entry_tags;
+        DROP TABLE IF EXISTS entries;
+    """)
+    try:
+        conn.executescript(SCHEMA)
+    except sqlite3.OperationalError as e:
+        raise StoreError(f"SQLite {sqlite3.sqlite_version} cannot create the store: {e}") from e
+    conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+    conn.commit()
+
+
+def open_store(root: Path, rebuild: bool = False) -> sqlite3.Connection:
+    """Open (creating if needed) the store database.
+
+    With KF_NO_CACHE set the store is built in memory and discarded on close.
+    An existing database from another schema version is rebuilt.
+    """
+    if cache_enabled():
+        db_path = get_store_path(root)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(db_path))
+    else:
+        conn = sqlite3.connect(":memory:")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if rebuild or version != STORE_VERSION:
+        create_schema(conn)
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# Sync
+# ---------------------------------------------------------------------------
+
+def sort_key(rel_path: str) -> str:
+    """Return a key that orders paths like sorted(Path) (part by part)."""
+    return rel_path.replace("/", "\x01")
+
+
+def text_value(value) -> str:
+    """Return a frontmatter value as column text ('' when missing)."""
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def entry_row(rel_path: str, stat: List[int], record: Dict) -> Tuple:
+    """Return the entries-table row for a scanned record."""
+    fm = record["frontmatter"]
+    parts = rel_path.split("/")
+    category = parts[1] if len(parts) > 2 else ""
+    if fm is None:
+        return (rel_path, sort_key(rel_path), *stat, None, "", "", "", "", "", "", "",
+                category, 0, 0, record["problem"], record["first_line"])
+
+    related = fm.get("related", [])
+    if not isinstance(related, list):
+        related = [] if not related else [related]
+    return (
+        rel_path, sort_key(rel_path), *stat,
+        json.dumps(fm, ensure_ascii=False),
+        text_value(fm.get("title", Path(rel_path).stem)),
+        text_value(fm.get("type")),
+        text_value(fm.get("domain")),
+        text_value(fm.get("confidence")),
+        text_value(fm.get("complexity")),
+        text_value(fm.get("created")),
+        text_value(fm.get("updated")),
+        category,
+        1 if related else 0,
+        1 if isinstance(fm.get("tags", []), list) else 0,
+        record["problem"],
+        record["first_line"],
+    )
+
+
+def entry_tags(record: Dict) -> List[str]:
+    """Return an entry's tags as a list (a scalar tag becomes one item)."""
+    fm = record["frontmatter"] or {}
+    tags = fm.get("tags", [])
+    if not isinstance(tags, list):
+        tags = [tags] if tags else []
+    return [text_value(tag) for tag in tags]
+
+
+def upsert_entry(conn: sqlite3.Connection, md_file: Path, record: Dict, stat: List[int]) -> None:
+    """Insert or replace one entry in all three tables."""
+    rel_path = record["path"]
+    delete_entry(conn, rel_path)
+    cur = conn.execute(
+        "INSERT INTO entries (path, sort_key, mtime_ns, size, ino, frontmatter, title, type,"
+        " domain, confidence, complexity, created, updated, category, related, tags_listed,"
+        " problem, first_line) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+        entry_row(rel_path, stat, record),
+    )
+    entry_id = cur.lastrowid
+    if record["frontmatter"] is None:
+        return
+
+    tags = entry_tags(record)
+    conn.executemany(
+        "INSERT INTO entry_tags (entry_id, pos, tag) VALUES (?, ?, ?)",
+        [(entry_id, pos, tag) for pos, tag in enumerate(tags)],
+    )
+    title = text_value(record["frontmatter"].get("title", md_file.stem))
+    conn.execute(
+        "INSERT INTO entries_fts (rowid, title, tags, body) VALUES (?, ?, ?, ?)",
+        (entry_id, title, " ".join(tags), read_entry(md_file)["body"]),
+    )
+
+
+def delete_entry(conn: sqlite3.Connection, rel_path: str) -> None:
+    """Remove an entry (and its tags and text) if present."""
+    row = conn.execute("SELECT id FROM entries WHERE path = ?", (rel_path,)).fetchone()
+    if row is None:
+        return
+    conn.execute("DELETE FROM entries_fts WHERE rowid = ?", (row[0],))
+    conn.execute("DELETE FROM entries WHERE id = ?", (row[0],))
+
+
+@timed("sync")
+def sync_store(
+    root: Path,
+    conn: sqlite3.Connection,
+    scanned: Optional[List[Tuple[Path, Dict]]] = None,
+    stats: Optional[Dict[str, List[int]]] = None,
+) -> int:
+    """Bring the store in line with entries/. Returns the number of rows changed.
+
+    Entries are compared by stat key; only new or modified files are read.
+    """
+    if scanned is None or stats is None:
+        scanned, stats = scan_state(root)
+
+    stored = {
+        path: [mtime_ns, size, ino]
+        for path, mtime_ns, size, ino in conn.execute("SELECT path, mtime_ns, size, ino FROM entries")
+    }
+    changed = 0
+    with conn:
+        for rel_path in stored.keys() - stats.keys():
+            delete_entry(conn, rel_path)
+            changed += 1
+        for md_file, record in scanned:
+            rel_path = record["path"]
+            if stored.get(rel_path) == stats[rel_path]:
+                continue
+            upsert_entry(conn, md_file, record, stats[rel_path])
+            changed += 1
+    return changed
+
+
+# ---------------------------------------------------------------------------
+# Query
+# ---------------------------------------------------------------------------
+
+def fts_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 expression matching any of its terms.
+
+    Terms are tokenized like the BM25 index and quoted, so user input can
+    never be parsed as FTS5 syntax. Returns None if no terms remain.
+    """
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+def filter_clauses(
+    tag: Optional[str],
+    domain: Optional[str],
+    entry_type: Optional[str],
+    confidence: Optional[str],
+) -> Tuple[List[str], List]:
+    """Return WHERE clauses and parameters for the metadata filters."""
+    clauses = ["e.frontmatter IS NOT NULL"]
+    params: List = []
+    if tag is not None:
+        clauses.append("EXISTS (SELECT 1 FROM entry_tags t WHERE t.entry_id = e.id AND t.tag = ?)")
+        params.append(tag)
+    for column, value in (("domain", domain), ("type", entry_type), ("confidence", confidence)):
+        if value is not None:
+            clauses.append(f"e.{column} = ?")
+            params.append(value)
+    return clauses, params
+
+
+def where_sql(ast: Tuple) -> Tuple[str, List]:
+    """Translate a bitmap_index filter AST into a WHERE fragment and parameters."""
+    kind = ast[0]
+    if kind == "term":
+        _, field, value = ast
+        if field == "tag":
+            return "EXISTS (SELECT 1 FROM entry_tags t WHERE t.entry_id = e.id AND t.tag = ?)", [value]
+        return f"e.{field} = ?", [value]
+    if kind == "not":
+        sql, params = where_sql(ast[1])
+        return f"NOT ({sql})", params
+    left, left_params = where_sql(ast[1])
+    right, right_params = where_sql(ast[2])
+    return f"({left} {kind.upper()} {right})", left_params + right_params
+
+
+def record_from_row(path: str, frontmatter: str, problem: Optional[str], first_line: Optional[str]) -> Dict:
+    """Rebuild a scan()-style record from stored columns."""
+    return {
+        "path": path,
+        "frontmatter": json.loads(frontmatter),
+        "problem": problem,
+        "first_line": first_line,
+    }
+
+
+def match_clauses(
+    conn: sqlite3.Connection,
+    tag: Optional[str] = None,
+    domain: Optional[str] = None,
+    entry_type: Optional[str] = None,
+    confidence: Optional[str] = None,
+    where: Optional[Tuple] = None,
+    query: Optional[str] = None,
+    substring: Optional[str] = None,
+    regex: Optional[str] = None,
+) -> Optional[Tuple[str, str, List]]:
+    """Return (joins, where, params) selecting the matching entries as `e`.
+
+    Returns None if the query has no searchable terms (nothing matches).
+    Registers the kf_regexp function on conn for regex; an invalid regex
+    raises re.error.
+    """
+    clauses, params = filter_clauses(tag, domain, entry_type, confidence)
+    if where is not None:
+        sql, where_params = where_sql(where)
+        clauses.append(sql)
+        params.extend(where_params)
+    joins = ""
+    if query is not None or substring is not None or regex is not None:
+        joins = "JOIN entries_fts f ON f.rowid = e.id"
+
+    if query is not None:
+        match = fts_query(query)
+        if match is None:
+            return None
+        clauses.append("entries_fts MATCH ?")
+        params.append(match)
+    if substring is not None:
+        clauses.append("instr(lower(f.body), ?) > 0")
+        params.append(substring.lower())
+    if regex is not None:
+        compiled = re.compile(regex, re.IGNORECASE | re.MULTILINE)
+        conn.create_function("kf_regexp", 1, lambda text: compiled.search(text or "") is not None,
+                             deterministic=True)
+        clauses.append("kf_regexp(f.body)")
+    return joins, " AND ".join(clauses), params
+
+
+def search_store(
+    conn: sqlite3.Connection,
+    tag: Optional[str] = None,
+    domain: Optional[str] = None,
+    entry_type: Optional[str] = None,
+    confidence: Optional[str] = None,
+    where: Optional[Tuple] = None,
+    query: Optional[str] = None,
+    substring: Optional[str] = None,
+    regex: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Tuple[List[Tuple[Dict, Optional[float], Optional[str]]], int]:
+    """Filter and optionally rank entries in one query.
+
+    Returns ([(record, score, snippet)], total matching count). Without a
+    query results are in path order and score/snippet are None. With a query
+    they are ranked by FTS5 BM25 (title, tags and body weighted like
+    FIELD_WEIGHTS) and carry a highlighted body snippet. substring and regex
+    match the entry body case-insensitively; an invalid regex raises re.error.
+    where is a parsed --where filter (bitmap_index.parse_filter).
+    """
+    clauses = match_clauses(conn, tag, domain, entry_type, confidence, where, query, substring, regex)
+    if clauses is None:
+        return [], 0
+    joins, where, params = clauses
+    total = conn.execute(f"SELECT COUNT(*) FROM entries e {joins} WHERE {where}", params).fetchone()[0]
+
+    columns = "e.path, e.frontmatter, e.problem, e.first_line"
+    if query is not None:
+        weights = ", ".join(str(FIELD_WEIGHTS[field]) for field in ("title", "tags", "body"))
+        sql = (f"SELECT {columns}, -bm25(entries_fts, {weights}) AS score,"
+               f" snippet(entries_fts, 2, '[', ']', '...', 12)"
+               f" FROM entries e {joins} WHERE {where} ORDER BY score DESC, e.sort_key")
+    else:
+        sql = f"SELECT {columns}, NULL, NULL FROM entries e {joins} WHERE {where} ORDER BY e.sort_key"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params = params + [limit]
+
+    results = [
+        (record_from_row(path, fm, problem, first_line), score, snippet)
+        for path, fm, problem, first_line, score, snippet in conn.execute(sql, params)
+    ]
+    return results, total
+
+
+def facet_metadata(
+    conn: sqlite3.Connection,
+    tag: Optional[str] = None,
+    domain: Optional[str] = None,
+    entry_type: Optional[str] = None,
+    confidence: Optional[str] = None,
+    where: Optional[Tuple] = None,
+    query: Optional[str] = None,
+    substring: Optional[str] = None,
+    regex: Optional[str] = None,
+) -> Iterator[Dict]:
+    """Yield {domain, type, confidence, tags} for every matching entry.
+
+    Read from the indexed columns in one query over the same match as
+    search_store(), for facet counts.
+    """
+    clauses = match_clauses(conn, tag, domain, entry_type, confidence, where, query, substring, regex)
+    if clauses is None:
+        return
+    joins, where, params = clauses
+    sql = (f"SELECT e.domain, e.type, e.confidence,"
+           f" (SELECT json_group_array(t.tag) FROM entry_tags t WHERE t.entry_id = e.id)"
+           f" FROM entries e {joins} WHERE {where}")
+    for domain_value, type_value, confidence_value, tags in conn.execute(sql, params):
+        yield {"domain": domain_value, "type": type_value, "confidence": confidence_value,
+               "tags": json.loads(tags)}
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def get_root() -> Path:
+    """Return the knowledge_framework root directory relative to this script."""
+    return Path(__file__).resolve().parent.parent
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Create, sync or rebuild the SQLite mirror of entries/.",
+    )
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Drop the database and rebuild it from the markdown entries")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profile(args)
+
+    root = get_root()
+    try:
+        conn = open_store(root, rebuild=args.rebuild)
+    except StoreError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    changed = sync_store(root, conn)
+    total = conn.execute("SELECT COUNT(*) FROM entries WHERE frontmatter IS NOT NULL").fetchone()[0]
+    conn.close()
+
+    print(f"{get_store_path(root).relative_to(root)}: {total} entries ({changed} synced)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,23 +9,60 @@ Scans all entries under entries/, parses YAML frontmatter, and produces:
   - Entries missing optional fields
   - Tag density metrics
 
+Entries are aggregated in one pass while they are scanned (cached records
+first, cache misses as the worker pool parses them).
+
+--format json prints the same statistics as one JSON document.
+--format prometheus prints them in the Prometheus text exposition format
+for node_exporter's textfile collector: entry counts by domain, type,
+confidence and category, tag cardinality, and how long the scan and parse
+of this run took. --output writes the report to a file atomically, as the
+textfile collector requires.
+
+--perf reads the telemetry log every script appends to (see telemetry.py)
+and prints wall-time percentiles per command and per day, week or month,
+with the largest entry count seen, so slowdowns can be matched with corpus
+growth.
+
 Usage:
     python scripts/stats.py              # formatted terminal output
     python scripts/stats.py --markdown   # write STATS.md to repo root
+    python scripts/stats.py --backend sqlite   # aggregate in the SQLite store
+    python scripts/stats.py --format json
+    python scripts/stats.py --format prometheus --output /var/lib/node_exporter/textfile/kf.prom
+    python scripts/stats.py --perf --perf-period day
 """
 
 import argparse
-import os
-import re
+import json
+import math
+import sqlite3
 import sys
+import time
 from collections import Counter
-from datetime import date
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from entry_cache import add_jobs_argument, atomic_write_text, iter_scan
+from instrument import add_profile_argument, span, start_profile, timed
+from sqlite_store import StoreError, open_store, sync_store
+from telemetry import iter_records, start_telemetry
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+FORMATS = ("text", "json", "prometheus")
+PERF_PERIODS = ("day", "week", "month")
+PERF_PERCENTILES = (50, 90, 99)
+# Most and least recently updated entries listed in the report
+TOP_DATED = 5
+METRIC_PREFIX = "kf_"
 
 
 # ---------------------------------------------------------------------------
-# Helpers (mirrors validate.py / rebuild_index.py conventions)
+# Helpers
 # ---------------------------------------------------------------------------
 
 def get_root() -> Path:
@@ -33,174 +70,216 @@ def get_root() -> Path:
     return Path(__file__).resolve().parent.parent
 
 
-def parse_frontmatter(text: str) -> Optional[Dict]:
-    """Parse YAML frontmatter between --- markers. Returns dict or None."""
-    lines = text.split("\n")
+# ---------------------------------------------------------------------------
+# Entry scanning
+# ---------------------------------------------------------------------------
 
-    if not lines or lines[0].strip() != "---":
+def entry_metadata(root: Path, md_file: Path, record: Dict) -> Optional[Dict]:
+    """Return the metadata dict stats needs from a scan record (None without frontmatter)."""
+    fm = record["frontmatter"]
+    if fm is None:
         return None
 
-    end_idx = None
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            end_idx = i
-            break
+    rel_path = md_file.relative_to(root)
+    # Category is the immediate subdirectory of entries/
+    parts = rel_path.parts
+    category = parts[1] if len(parts) > 2 else ""
 
-    if end_idx is None:
-        return None
+    tags = fm.get("tags", [])
+    if not isinstance(tags, list):
+        tags = []
 
-    fm_lines = lines[1:end_idx]
-    data: Dict = {}
+    related = fm.get("related", [])
+    if not isinstance(related, list):
+        related = [] if not related else [related]
 
-    for line in fm_lines:
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
+    return {
+        "path": str(rel_path),
+        "title": fm.get("title", md_file.stem),
+        "type": fm.get("type", ""),
+        "tags": tags,
+        "domain": fm.get("domain", ""),
+        "confidence": fm.get("confidence", ""),
+        "complexity": fm.get("complexity", ""),
+        "created": fm.get("created", ""),
+        "updated": fm.get("updated", ""),
+        "related": related,
+        "category": category,
+    }
 
-        match = re.match(r"^(\w[\w-]*)\s*:\s*(.*)", line)
-        if not match:
-            continue
 
-        key = match.group(1).strip()
-        raw_value = match.group(2).strip()
-
-        if raw_value.startswith("[") and raw_value.endswith("]"):
-            inner = raw_value[1:-1].strip()
-            if inner:
-                items = [item.strip().strip("'\"") for item in inner.split(",")]
-                data[key] = [item for item in items if item]
-            else:
-                data[key] = []
-        elif (raw_value.startswith('"') and raw_value.endswith('"')) or \
-             (raw_value.startswith("'") and raw_value.endswith("'")):
-            data[key] = raw_value[1:-1]
-        else:
-            comment_match = re.match(r"^([^#]+?)(?:\s+#.*)?$", raw_value)
-            if comment_match:
-                data[key] = comment_match.group(1).strip()
-            else:
-                data[key] = raw_value
-
-    return data
+def iter_entries(
+    root: Path, jobs: Optional[int] = None, timings: Optional[Dict[str, float]] = None
+) -> Iterator[Dict]:
+    """Yield metadata dicts for all entries under entries/ as they are scanned.
 
+    timings is passed on to entry_cache.iter_scan().
+    """
+    for md_file, record in iter_scan(root, jobs=jobs, timings=timings):
+        entry = entry_metadata(root, md_file, record)
+        if entry is not None:
+            yield entry
 
-# ---------------------------------------------------------------------------
-# Entry scanning
-# ---------------------------------------------------------------------------
 
-def scan_entries(root: Path) -> List[Dict]:
+def scan_entries(root: Path, jobs: Optional[int] = None) -> List[Dict]:
     """Scan all .md files under entries/ and return metadata dicts."""
-    entries_dir = root / "entries"
-    if not entries_dir.is_dir():
-        return []
-
-    results = []
-    for md_file in sorted(entries_dir.rglob("*.md")):
-        text = md_file.read_text(encoding="utf-8")
-        fm = parse_frontmatter(text)
-        if fm is None:
-            continue
-
-        rel_path = md_file.relative_to(root)
-        # Category is the immediate subdirectory of entries/
-        parts = rel_path.parts
-        category = parts[1] if len(parts) > 2 else ""
-
-        tags = fm.get("tags", [])
-        if not isinstance(tags, list):
-            tags = []
-
-        related = fm.get("related", [])
-        if not isinstance(related, list):
-            related = [] if not related else [related]
-
-        results.append({
-            "path": str(rel_path),
-            "title": fm.get("title", md_file.stem),
-            "type": fm.get("type", ""),
-            "tags": tags,
-            "domain": fm.get("domain", ""),
-            "confidence": fm.get("confidence", ""),
-            "complexity": fm.get("complexity", ""),
-            "created": fm.get("created", ""),
-            "updated": fm.get("updated", ""),
-            "related": related,
-            "category": category,
-        })
-
-    return results
+    return list(iter_entries(root, jobs))
 
 
 # ---------------------------------------------------------------------------
 # Statistics computation
 # ---------------------------------------------------------------------------
 
-def compute_stats(entries: List[Dict]) -> Dict:
-    """Compute all statistics from the list of entry metadata dicts."""
+@timed("aggregate")
+def compute_stats_sqlite(conn: sqlite3.Connection) -> Dict:
+    """Compute the same statistics as compute_stats() with SQL aggregates.
 
-    total = len(entries)
+    Rows are visited in path order, so ties are broken exactly as in
+    compute_stats() and the rendered report is identical.
+    """
+    valid = "frontmatter IS NOT NULL"
+    eff = "CASE WHEN updated != '' THEN updated ELSE created END"
 
-    # 1. Per-category counts
-    category_counts: Counter = Counter()
-    for e in entries:
-        category_counts[e["category"] or "(uncategorized)"] += 1
+    total, tag_uses = conn.execute(
+        f"SELECT COUNT(*), (SELECT COUNT(*) FROM entry_tags t JOIN entries e ON e.id = t.entry_id"
+        f" WHERE e.{valid} AND e.tags_listed) FROM entries WHERE {valid}"
+    ).fetchone()
 
-    # 2. Per-domain counts
-    domain_counts: Counter = Counter()
-    for e in entries:
-        domain_counts[e["domain"] or "(unknown)"] += 1
+    def grouped(expr: str) -> Counter:
+        return Counter(dict(conn.execute(
+            f"SELECT {expr} COLLATE BINARY AS k, COUNT(*) FROM entries WHERE {valid}"
+            f" GROUP BY k ORDER BY MIN(sort_key)"
+        ).fetchall()))
 
-    # 3. Tag frequency
+    # First-seen order matters for most_common() ties
     tag_counter: Counter = Counter()
-    for e in entries:
-        for tag in e["tags"]:
-            tag_counter[tag] += 1
-
-    total_unique_tags = len(tag_counter)
-    total_tag_uses = sum(len(e["tags"]) for e in entries)
-    avg_tags = total_tag_uses / total if total else 0.0
+    for (tag,) in conn.execute(
+        f"SELECT t.tag FROM entry_tags t JOIN entries e ON e.id = t.entry_id"
+        f" WHERE e.{valid} AND e.tags_listed ORDER BY e.sort_key, t.pos"
+    ):
+        tag_counter[tag] += 1
 
-    # 4. Confidence distribution
-    confidence_counts: Counter = Counter()
-    for e in entries:
-        confidence_counts[e["confidence"] or "(unset)"] += 1
-
-    # 5. Date-sorted lists — use updated if present, else created
-    def effective_date(e: Dict) -> str:
-        return e["updated"] if e["updated"] else e["created"]
-
-    dated = [(effective_date(e), e) for e in entries]
-    dated_valid = [(d, e) for d, e in dated if d]
-    dated_sorted = sorted(dated_valid, key=lambda x: x[0], reverse=True)
+    def entry_list(where: str, order: str = "sort_key", limit: int = -1) -> List:
+        return conn.execute(
+            f"SELECT {eff}, title, path FROM entries WHERE {valid} AND {where}"
+            f" ORDER BY {order} LIMIT ?", (limit,)
+        ).fetchall()
 
-    top5_recent = dated_sorted[:5]
-    top5_oldest = list(reversed(dated_sorted[-5:])) if len(dated_sorted) >= 5 else list(reversed(dated_sorted))
+    def dated(order: str) -> List:
+        rows = entry_list(f"{eff} != ''", order, 5)
+        return [(d, {"title": title, "path": path}) for d, title, path in rows]
 
-    # 6. Missing optional fields
-    missing_updated = [e for e in entries if not e["updated"]]
-    missing_complexity = [e for e in entries if not e["complexity"]]
-    missing_related = [e for e in entries if not e["related"]]
+    def missing(where: str) -> List[Dict]:
+        return [{"title": title, "path": path} for _, title, path in entry_list(where)]
 
     return {
         "total": total,
-        "category_counts": category_counts,
-        "domain_counts": domain_counts,
+        "category_counts": grouped("CASE WHEN category != '' THEN category ELSE '(uncategorized)' END"),
+        "domain_counts": grouped("CASE WHEN domain != '' THEN domain ELSE '(unknown)' END"),
+        "type_counts": grouped("CASE WHEN type != '' THEN type ELSE '(unknown)' END"),
         "tag_counter": tag_counter,
-        "total_unique_tags": total_unique_tags,
-        "avg_tags": avg_tags,
-        "confidence_counts": confidence_counts,
-        "top5_recent": top5_recent,
-        "top5_oldest": top5_oldest,
-        "missing_updated": missing_updated,
-        "missing_complexity": missing_complexity,
-        "missing_related": missing_related,
+        "total_unique_tags": len(tag_counter),
+        "avg_tags": tag_uses / total if total else 0.0,
+        "confidence_counts": grouped("CASE WHEN confidence != '' THEN confidence ELSE '(unset)' END"),
+        "top5_recent": dated(f"{eff} DESC, sort_key"),
+        "top5_oldest": dated(f"{eff}, sort_key DESC"),
+        "missing_updated": missing("updated = ''"),
+        "missing_complexity": missing("complexity = ''"),
+        "missing_related": missing("NOT related"),
     }
 
 
+class StatsAggregator:
+    """Accumulate the statistics of compute_stats() one entry at a time.
+
+    Every figure is updated in a single pass and only the five most and
+    least recently updated entries are kept, so entries can be fed straight
+    from a scan without first collecting them in a list.
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.tag_uses = 0
+        self.category_counts: Counter = Counter()
+        self.domain_counts: Counter = Counter()
+        self.type_counts: Counter = Counter()
+        self.confidence_counts: Counter = Counter()
+        self.tag_counter: Counter = Counter()
+        # (effective date, -scan position, entry): ties go to the entry scanned first
+        # among the most recent and to the one scanned last among the oldest
+        self.recent: List[Tuple[str, int, Dict]] = []
+        self.oldest: List[Tuple[str, int, Dict]] = []
+        self.missing_updated: List[Dict] = []
+        self.missing_complexity: List[Dict] = []
+        self.missing_related: List[Dict] = []
+
+    def add(self, e: Dict) -> None:
+        """Count one entry metadata dict (see entry_metadata())."""
+        position = self.total
+        self.total += 1
+
+        self.category_counts[e["category"] or "(uncategorized)"] += 1
+        self.domain_counts[e["domain"] or "(unknown)"] += 1
+        self.type_counts[e["type"] or "(unknown)"] += 1
+        self.confidence_counts[e["confidence"] or "(unset)"] += 1
+        for tag in e["tags"]:
+            self.tag_counter[tag] += 1
+        self.tag_uses += len(e["tags"])
+
+        # Use updated if present, else created. A later entry with the same
+        # date ranks below the kept ones for recent and above them for oldest.
+        eff_date = e["updated"] if e["updated"] else e["created"]
+        if eff_date:
+            item = (eff_date, -position, e)
+            if len(self.recent) < TOP_DATED or eff_date > self.recent[-1][0]:
+                self.recent.append(item)
+                self.recent.sort(key=lambda x: (x[0], x[1]), reverse=True)
+                del self.recent[TOP_DATED:]
+            if len(self.oldest) < TOP_DATED or eff_date <= self.oldest[-1][0]:
+                self.oldest.append(item)
+                self.oldest.sort(key=lambda x: (x[0], x[1]))
+                del self.oldest[TOP_DATED:]
+
+        if not e["updated"]:
+            self.missing_updated.append(e)
+        if not e["complexity"]:
+            self.missing_complexity.append(e)
+        if not e["related"]:
+            self.missing_related.append(e)
+
+    def result(self) -> Dict:
+        """Return the statistics dict in the layout of compute_stats()."""
+        return {
+            "total": self.total,
+            "category_counts": self.category_counts,
+            "domain_counts": self.domain_counts,
+            "type_counts": self.type_counts,
+            "tag_counter": self.tag_counter,
+            "total_unique_tags": len(self.tag_counter),
+            "avg_tags": self.tag_uses / self.total if self.total else 0.0,
+            "confidence_counts": self.confidence_counts,
+            "top5_recent": [(d, e) for d, _, e in self.recent],
+            "top5_oldest": [(d, e) for d, _, e in self.oldest],
+            "missing_updated": self.missing_updated,
+            "missing_complexity": self.missing_complexity,
+            "missing_related": self.missing_related,
+        }
+
+
+@timed("aggregate")
+def compute_stats(entries: Iterable[Dict]) -> Dict:
+    """Compute all statistics from entry metadata dicts in a single pass."""
+    aggregator = StatsAggregator()
+    for e in entries:
+        aggregator.add(e)
+    return aggregator.result()
+
+
 # ---------------------------------------------------------------------------
 # Terminal output
 # ---------------------------------------------------------------------------
 
+@timed("render")
 def render_terminal(stats: Dict) -> str:
     lines: List[str] = []
 
@@ -277,6 +356,7 @@ def render_terminal(stats: Dict) -> str:
 # Markdown output
 # ---------------------------------------------------------------------------
 
+@timed("render")
 def render_markdown(stats: Dict) -> str:
     lines: List[str] = []
 
@@ -380,6 +460,186 @@ def render_markdown(stats: Dict) -> str:
     return "\n".join(lines)
 
 
+# ---------------------------------------------------------------------------
+# JSON output
+# ---------------------------------------------------------------------------
+
+@timed("render")
+def render_json(stats: Dict) -> str:
+    """Render the statistics as a JSON document (counts sorted by key, tags by frequency)."""
+    def dated(items: List) -> List[Dict]:
+        return [{"date": d, "title": e["title"], "path": e["path"]} for d, e in items]
+
+    data = {
+        "total": stats["total"],
+        "unique_tags": stats["total_unique_tags"],
+        "avg_tags": round(stats["avg_tags"], 3),
+        "categories": dict(sorted(stats["category_counts"].items())),
+        "domains": dict(sorted(stats["domain_counts"].items())),
+        "types": dict(sorted(stats["type_counts"].items())),
+        "confidence": dict(sorted(stats["confidence_counts"].items())),
+        "tags": dict(stats["tag_counter"].most_common()),
+        "most_recent": dated(stats["top5_recent"]),
+        "least_recent": dated(stats["top5_oldest"]),
+        "missing": {
+            field: [e["path"] for e in stats[f"missing_{field}"]]
+            for field in ("updated", "complexity", "related")
+        },
+    }
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+# ---------------------------------------------------------------------------
+# Prometheus output
+# ---------------------------------------------------------------------------
+
+def escape_label(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@timed("render")
+def render_prometheus(stats: Dict, timings: Dict[str, float]) -> str:
+    """Render the statistics and this run's timings as Prometheus gauges."""
+    lines: List[str] = []
+
+    def gauge(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> None:
+        lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}{name} gauge")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{escape_label(v)}"' for key, v in labels.items())
+            lines.append(f"{METRIC_PREFIX}{name}{{{label_text}}} {value}" if label_text
+                         else f"{METRIC_PREFIX}{name} {value}")
+
+    def by(label: str, counts: Counter) -> List[Tuple[Dict[str, str], float]]:
+        return [({label: key}, count) for key, count in sorted(counts.items())]
+
+    gauge("entries", "Entries with frontmatter.", [({}, stats["total"])])
+    gauge("entries_by_domain", "Entries per domain.", by("domain", stats["domain_counts"]))
+    gauge("entries_by_type", "Entries per type.", by("type", stats["type_counts"]))
+    gauge("entries_by_confidence", "Entries per confidence level.", by("confidence", stats["confidence_counts"]))
+    gauge("entries_by_category", "Entries per entries/ subdirectory.", by("category", stats["category_counts"]))
+    gauge("tags_unique", "Distinct tags (tag cardinality).", [({}, stats["total_unique_tags"])])
+    gauge("tag_assignments", "Tags summed over all entries.", [({}, sum(stats["tag_counter"].values()))])
+    gauge("entries_missing_field", "Entries without an optional frontmatter field.",
+          [({"field": field}, len(stats[f"missing_{field}"])) for field in ("updated", "complexity", "related")])
+    gauge("scan_duration_seconds", "Listing, stat calls and cache load of the last stats run.",
+          [({}, round(timings.get("scan", 0.0), 6))])
+    gauge("parse_duration_seconds", "Time the last stats run waited for entries to be parsed.",
+          [({}, round(timings.get("parse", 0.0), 6))])
+    gauge("entries_parsed", "Entries the last stats run parsed (metadata cache misses).",
+          [({}, timings.get("parsed", 0))])
+    gauge("stats_duration_seconds", "Wall time of the last stats run, scan and aggregation included.",
+          [({}, round(timings.get("total", 0.0), 6))])
+    gauge("stats_last_run_timestamp_seconds", "Unix time the last stats run finished.",
+          [({}, int(time.time()))])
+    lines.append("")
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Performance history (--perf)
+# ---------------------------------------------------------------------------
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the nearest-rank percentile of a non-empty list of values."""
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def period_key(ts: object, period: str) -> Optional[str]:
+    """Return the day, ISO week or month of an ISO timestamp (None if invalid)."""
+    try:
+        when = datetime.fromisoformat(str(ts))
+    except ValueError:
+        return None
+    if period == "day":
+        return when.strftime("%Y-%m-%d")
+    if period == "week":
+        year, week, _ = when.isocalendar()
+        return f"{year}-W{week:02d}"
+    return when.strftime("%Y-%m")
+
+
+def summarize_runs(runs: List[Dict]) -> Dict:
+    """Return run count, largest entry count, wall-time percentiles and peak RSS."""
+    walls = [run["wall"] for run in runs]
+    entries = [run["entries"] for run in runs if isinstance(run.get("entries"), int)]
+    rss = [run["peak_rss_kb"] for run in runs if isinstance(run.get("peak_rss_kb"), int)]
+    summary: Dict = {"runs": len(runs), "entries": max(entries) if entries else None}
+    for pct in PERF_PERCENTILES:
+        summary[f"p{pct}"] = round(percentile(walls, pct), 4)
+    summary["max"] = round(max(walls), 4)
+    summary["peak_rss_kb"] = max(rss) if rss else None
+    return summary
+
+
+def compute_perf(records: Iterable[Dict], period: str) -> Dict:
+    """Group telemetry records by command and period and summarize each group.
+
+    Returns {"runs", "period", "commands": {command: {"periods": {key:
+    summary}, "all": summary, "phases": {phase: {"p50", "p90"}}}}}.
+    """
+    grouped: Dict[str, Dict[str, List[Dict]]] = {}
+    total = 0
+    for record in records:
+        key = period_key(record.get("ts"), period)
+        if key is None or not isinstance(record.get("wall"), (int, float)):
+            continue
+        grouped.setdefault(str(record["command"]), {}).setdefault(key, []).append(record)
+        total += 1
+
+    commands: Dict[str, Dict] = {}
+    for command, periods in sorted(grouped.items()):
+        runs = [run for key in sorted(periods) for run in periods[key]]
+        phase_seconds: Dict[str, List[float]] = {}
+        for run in runs:
+            phases = run.get("phases")
+            if isinstance(phases, dict):
+                for name, seconds in phases.items():
+                    phase_seconds.setdefault(name, []).append(seconds)
+        commands[command] = {
+            "periods": {key: summarize_runs(periods[key]) for key in sorted(periods)},
+            "all": summarize_runs(runs),
+            "phases": {
+                name: {"p50": round(percentile(values, 50), 4), "p90": round(percentile(values, 90), 4)}
+                for name, values in sorted(phase_seconds.items(), key=lambda item: -percentile(item[1], 50))
+            },
+        }
+    return {"runs": total, "period": period, "commands": commands}
+
+
+@timed("render")
+def render_perf(perf: Dict) -> str:
+    """Render compute_perf() output as one latency table per command."""
+    lines = [f"Performance history: {perf['runs']} runs by {perf['period']} (wall seconds)"]
+    if not perf["commands"]:
+        lines.append("")
+        lines.append("  No telemetry recorded yet.")
+    header = f"  {'period':<12} {'runs':>6} {'entries':>8} " + " ".join(
+        f"{'p' + str(pct):>8}" for pct in PERF_PERCENTILES) + f" {'max':>8} {'rss MiB':>8}"
+
+    def row(label: str, summary: Dict) -> str:
+        entries = "-" if summary["entries"] is None else str(summary["entries"])
+        rss = "-" if summary["peak_rss_kb"] is None else f"{summary['peak_rss_kb'] / 1024:.0f}"
+        return (f"  {label:<12} {summary['runs']:>6} {entries:>8} "
+                + " ".join(f"{summary['p' + str(pct)]:>8.3f}" for pct in PERF_PERCENTILES)
+                + f" {summary['max']:>8.3f} {rss:>8}")
+
+    for command, data in perf["commands"].items():
+        lines.append("")
+        lines.append(command)
+        lines.append("-" * len(command))
+        lines.append(header)
+        for key, summary in data["periods"].items():
+            lines.append(row(key, summary))
+        lines.append(row("all", data["all"]))
+        if data["phases"]:
+            lines.append("  phases p50: " + "  ".join(
+                f"{name} {values['p50']:.3f}" for name, values in data["phases"].items()))
+    return "\n".join(lines)
+
+
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
@@ -393,19 +653,84 @@ def main() -> int:
         action="store_true",
         help="Write statistics to STATS.md in the repo root instead of stdout.",
     )
+    parser.add_argument(
+        "--backend", choices=("files", "sqlite"), default="files",
+        help="Aggregate from the entry cache (default) or the SQLite store",
+    )
+    parser.add_argument(
+        "--format", choices=FORMATS, default="text",
+        help="Output format: text (default), json or prometheus (textfile collector)",
+    )
+    parser.add_argument(
+        "--output", metavar="FILE",
+        help="Write the report to FILE (atomically) instead of stdout",
+    )
+    parser.add_argument(
+        "--perf", action="store_true",
+        help="Report run latency percentiles per command over time from the telemetry log",
+    )
+    parser.add_argument(
+        "--perf-period", choices=PERF_PERIODS, default="week",
+        help="With --perf: group runs by day, week (default) or month",
+    )
+    add_jobs_argument(parser)
+    add_profile_argument(parser)
     args = parser.parse_args()
+    if args.perf and args.format == "prometheus":
+        parser.error("--perf supports --format text or json")
+    start_profile(args)
 
     root = get_root()
-    entries = scan_entries(root)
-    stats = compute_stats(entries)
+    if args.perf:
+        perf = compute_perf(iter_records(root), args.perf_period)
+        content = json.dumps(perf, indent=2) if args.format == "json" else render_perf(perf)
+        sys.stdout.write(content + "\n")
+        return 0
+
+    start_telemetry(root, "stats")
+    start = time.perf_counter()
+    timings: Dict[str, float] = {}
+    if args.backend == "sqlite":
+        try:
+            conn = open_store(root)
+        except StoreError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        try:
+            stat_keys: Dict[str, List[int]] = {}
+            scanned = list(iter_scan(root, jobs=args.jobs, stats=stat_keys, timings=timings))
+            sync_store(root, conn, scanned, stat_keys)
+            stats = compute_stats_sqlite(conn)
+        finally:
+            conn.close()
+    else:
+        stats = compute_stats(iter_entries(root, jobs=args.jobs, timings=timings))
+    timings["total"] = time.perf_counter() - start
 
     if args.markdown:
         content = render_markdown(stats)
         out_path = root / "STATS.md"
-        out_path.write_text(content, encoding="utf-8")
+        with span("write"):
+            out_path.write_text(content, encoding="utf-8")
         print(f"Written to {out_path}")
+        return 0
+
+    if args.format == "json":
+        content = render_json(stats) + "\n"
+    elif args.format == "prometheus":
+        content = render_prometheus(stats, timings)
+    else:
+        content = render_terminal(stats) + "\n"
+
+    if args.output:
+        try:
+            atomic_write_text(Path(args.output), content)
+        except OSError as e:
+            print(f"ERROR: cannot write {args.output}: {e}", file=sys.stderr)
+            return 1
     else:
-        print(render_terminal(stats))
+        with span("write"):
+            sys.stdout.write(content)
 
     return 0
 
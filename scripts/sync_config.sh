@@ -146,7 +146,7 @@ try:
     with open('$CLAUDE_JSON') as f:
         local = json.load(f)
     with open('$MCP_TEMPLATE') as f:
-        servers = json.load(f)
+        servers = json.loads(f.read().replace('{{HOME}}', '$HOME'))
     if 'mcpServers' not in local:
         local['mcpServers'] = {}
     local['mcpServers'].update(servers)
@@ -164,7 +164,7 @@ except Exception as e:
             python3 -c "
 import json
 with open('$MCP_TEMPLATE') as f:
-    servers = json.load(f)
+    servers = json.loads(f.read().replace('{{HOME}}', '$HOME'))
 with open('$CLAUDE_JSON', 'w') as f:
     json.dump({'mcpServers': servers}, f, indent=4)
 "
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Per-run telemetry log for trend analysis.
+
+Every run of curate, rebuild_index, search, validate, lint_tags and stats
+appends one JSON line to .kf_cache/telemetry.jsonl when it exits:
+
+  ts           UTC start time (ISO 8601)
+  command      script name
+  args         command-line arguments
+  entries      entries found by the run's latest scan (None if it scanned none)
+  wall         seconds from start_telemetry() to exit
+  phases       {phase: seconds} self time per span (see instrument.py)
+  files_read   files read through entry_parser, outside pool workers
+  bytes_read   bytes read by those reads
+  peak_rss_kb  peak resident set size of the process (None where unknown)
+
+Once the log reaches TELEMETRY_MAX_BYTES it is renamed to telemetry.jsonl.1
+(older logs shift up to .TELEMETRY_BACKUPS, the oldest is dropped), so the
+history stays bounded. `stats.py --perf` reads it back as percentile
+latencies per command over time.
+
+Set KF_NO_TELEMETRY=1 to record nothing. Write failures (read-only
+checkout) are ignored.
+
+Usage (as a library):
+    from telemetry import start_telemetry
+    start_telemetry(root, "search")
+"""
+
+import atexit
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from entry_cache import get_cache_dir
+from instrument import Recorder, start_recording
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+TELEMETRY_FILE_NAME = "telemetry.jsonl"
+TELEMETRY_MAX_BYTES = 1024 * 1024
+TELEMETRY_BACKUPS = 3
+
+
+def telemetry_enabled() -> bool:
+    """Return False when KF_NO_TELEMETRY is set to a non-empty value."""
+    return not os.environ.get("KF_NO_TELEMETRY")
+
+
+def telemetry_paths(root: Path) -> List[Path]:
+    """Return the log and its rotated backups, oldest first."""
+    path = get_cache_dir(root) / TELEMETRY_FILE_NAME
+    backups = [path.with_name(f"{path.name}.{n}") for n in range(TELEMETRY_BACKUPS, 0, -1)]
+    return backups + [path]
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def peak_rss_kb() -> Optional[int]:
+    """Return the process's peak resident set size in KiB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_record(recorder: Recorder, command: str, args: List[str], started: datetime) -> Dict:
+    """Return the telemetry record of a finished run."""
+    return {
+        "ts": started.isoformat(timespec="seconds"),
+        "command": command,
+        "args": args,
+        "entries": recorder.entries,
+        "wall": round(time.perf_counter() - recorder.started, 6),
+        "phases": {name: round(seconds, 6) for name, seconds in sorted(recorder.seconds.items())},
+        "files_read": recorder.files_read,
+        "bytes_read": recorder.bytes_read,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def rotate(path: Path) -> None:
+    """Shift path to path.1, path.1 to path.2, ... dropping the oldest."""
+    for n in range(TELEMETRY_BACKUPS - 1, 0, -1):
+        older = path.with_name(f"{path.name}.{n}")
+        if older.exists():
+            os.replace(older, path.with_name(f"{path.name}.{n + 1}"))
+    os.replace(path, path.with_name(f"{path.name}.1"))
+
+
+def append_record(root: Path, record: Dict) -> None:
+    """Append one record to the log, rotating it first if it is full."""
+    path = get_cache_dir(root) / TELEMETRY_FILE_NAME
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if path.stat().st_size >= TELEMETRY_MAX_BYTES:
+                rotate(path)
+        except FileNotFoundError:
+            pass
+        # One write of one line in append mode, so concurrent runs do not interleave
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError:
+        pass
+
+
+def start_telemetry(root: Path, command: str) -> None:
+    """Record this run's phases and append its telemetry record at exit."""
+    if not telemetry_enabled():
+        return
+    recorder = start_recording()
+    started = datetime.now(timezone.utc)
+    args = sys.argv[1:]
+    atexit.register(lambda: append_record(root, run_record(recorder, command, args, started)))
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def iter_records(root: Path) -> Iterator[Dict]:
+    """Yield the logged records, oldest first; unreadable lines are skipped."""
+    for path in telemetry_paths(root):
+        try:
+            f = open(path, encoding="utf-8")
+        except OSError:
+            continue
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and "command" in record and "wall" in record:
+                    yield record
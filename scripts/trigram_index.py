@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Trigram index for substring and regex search in search.py.
+
+Word tokenization cannot serve substrings such as "kafka-ret" or exact
+identifiers such as `netconf_driver`. This index maps every three-character
+sequence of each entry's lowercased text to the entries containing it. A
+substring query is narrowed to the entries holding all of its trigrams, and
+only those candidates are read to verify the match. Regex queries are
+pre-filtered on the literal runs every match must contain.
+
+The index lives in .kf_cache/trigrams.json. It is updated incrementally: an
+entry whose stat changed gets a fresh doc id and its old id is tombstoned,
+so only changed entries are re-read. Once tombstones exceed
+MAX_DEAD_FRACTION of the ids, the index is rebuilt from scratch.
+
+Usage (as a library):
+    from trigram_index import ensure_trigram_index, substring_search, regex_search
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_parse
+
+from entry_cache import atomic_write_text, cache_enabled, get_cache_dir, scan_state
+from entry_parser import read_text
+from instrument import timed
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+TRIGRAM_FILE_NAME = "trigrams.json"
+# Bump when the normalisation or file layout changes
+TRIGRAM_VERSION = 1
+MAX_DEAD_FRACTION = 0.25
+
+
+# ---------------------------------------------------------------------------
+# Trigram extraction
+# ---------------------------------------------------------------------------
+
+def trigrams(text: str) -> Set[str]:
+    """Return the set of trigrams in already-lowercased text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(pattern: str) -> Optional[List[str]]:
+    """Return literal runs that every match of a regex must contain.
+
+    Only top-level literal sequences are used; groups, classes, repeats and
+    anchors end a run. Returns None when the pattern has top-level
+    alternation (no literal is guaranteed) or cannot be parsed.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError):
+        return None
+
+    runs: List[str] = []
+    current: List[str] = []
+    for op, arg in parsed:
+        if op == sre_parse.LITERAL:
+            current.append(chr(arg))
+            continue
+        if op == sre_parse.BRANCH:
+            return None
+        if current:
+            runs.append("".join(current))
+            current = []
+    if current:
+        runs.append("".join(current))
+    return [run.lower() for run in runs]
+
+
+# ---------------------------------------------------------------------------
+# Load / save / update
+# ---------------------------------------------------------------------------
+
+def empty_index() -> Dict:
+    return {"version": TRIGRAM_VERSION, "docs": [], "postings": {}}
+
+
+def load_trigram_index(root: Path) -> Dict:
+    """Load the persisted trigram index, or an empty one."""
+    try:
+        data = json.loads((get_cache_dir(root) / TRIGRAM_FILE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return empty_index()
+    if not isinstance(data, dict) or data.get("version") != TRIGRAM_VERSION:
+        return empty_index()
+    return data
+
+
+def save_trigram_index(root: Path, index: Dict) -> None:
+    """Persist the trigram index. Failures (read-only checkout) are ignored."""
+    try:
+        atomic_write_text(get_cache_dir(root) / TRIGRAM_FILE_NAME,
+                          json.dumps(index, ensure_ascii=False, separators=(",", ":")))
+    except OSError:
+        pass
+
+
+def add_document(index: Dict, rel_path: str, stat: List[int], text: str) -> None:
+    """Append a document under a new doc id and post its trigrams."""
+    doc_id = len(index["docs"])
+    index["docs"].append([rel_path, stat])
+    postings = index["postings"]
+    for gram in trigrams(text.lower()):
+        posting = postings.get(gram)
+        if posting is None:
+            postings[gram] = [doc_id]
+        else:
+            posting.append(doc_id)
+
+
+def update_trigram_index(
+    index: Dict,
+    scanned: List[Tuple[Path, Dict]],
+    stats: Dict[str, List[int]],
+) -> bool:
+    """Bring the index in line with the current entries. Returns True if changed."""
+    live = {doc[0]: doc_id for doc_id, doc in enumerate(index["docs"]) if doc is not None}
+    changed = False
+
+    # Tombstone removed entries and stale versions of modified ones
+    for rel_path, doc_id in live.items():
+        if index["docs"][doc_id][1] != stats.get(rel_path):
+            index["docs"][doc_id] = None
+            changed = True
+
+    dead = sum(1 for doc in index["docs"] if doc is None)
+    if index["docs"] and dead > MAX_DEAD_FRACTION * len(index["docs"]):
+        index.clear()
+        index.update(empty_index())
+        live = {}
+
+    for md_file, record in scanned:
+        rel_path = record["path"]
+        doc_id = live.get(rel_path)
+        if doc_id is not None and index["docs"][doc_id] is not None:
+            continue
+        add_document(index, rel_path, stats[rel_path], read_text(md_file))
+        changed = True
+
+    return changed
+
+
+@timed("index")
+def ensure_trigram_index(
+    root: Path,
+    scanned: Optional[List[Tuple[Path, Dict]]] = None,
+    stats: Optional[Dict[str, List[int]]] = None,
+) -> Dict:
+    """Return an up-to-date trigram index, re-reading only changed entries."""
+    if scanned is None or stats is None:
+        scanned, stats = scan_state(root)
+    index = load_trigram_index(root) if cache_enabled() else empty_index()
+    if update_trigram_index(index, scanned, stats) and cache_enabled():
+        save_trigram_index(root, index)
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Query
+# ---------------------------------------------------------------------------
+
+def candidate_paths(index: Dict, literals: List[str]) -> Optional[Set[str]]:
+    """Return live paths containing every trigram of every literal.
+
+    Returns None when the literals yield no trigram (no narrowing possible).
+    """
+    grams: Set[str] = set()
+    for literal in literals:
+        grams |= trigrams(literal)
+    if not grams:
+        return None
+
+    postings = index["postings"]
+    lists = sorted((postings.get(gram, []) for gram in grams), key=len)
+    ids = set(lists[0])
+    for posting in lists[1:]:
+        if not ids:
+            break
+        ids.intersection_update(posting)
+
+    docs = index["docs"]
+    return {docs[doc_id][0] for doc_id in ids if docs[doc_id] is not None}
+
+
+def verify(root: Path, rel_paths: Set[str], predicate) -> Set[str]:
+    """Read each candidate and keep those whose text passes predicate."""
+    matched = set()
+    for rel_path in rel_paths:
+        try:
+            text = read_text(root / rel_path)
+        except OSError:
+            continue
+        if predicate(text):
+            matched.add(rel_path)
+    return matched
+
+
+def substring_search(root: Path, index: Dict, needle: str, allowed: Set[str]) -> Set[str]:
+    """Return the allowed paths whose text contains needle (case-insensitive)."""
+    needle = needle.lower()
+    candidates = candidate_paths(index, [needle])
+    if candidates is None:
+        candidates = allowed
+    return verify(root, candidates & allowed, lambda text: needle in text.lower())
+
+
+def regex_search(root: Path, index: Dict, pattern: str, allowed: Set[str]) -> Set[str]:
+    """Return the allowed paths whose text matches pattern (case-insensitive).
+
+    Raises re.error for an invalid pattern.
+    """
+    compiled = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+    literals = required_literals(pattern)
+    candidates = candidate_paths(index, literals) if literals else None
+    if candidates is None:
+        candidates = allowed
+    return verify(root, candidates & allowed, lambda text: compiled.search(text) is not None)
@@ -5,16 +5,45 @@ Checks YAML frontmatter fields and required markdown sections.
 Standard entries require: Problem, Approach, Recipe.
 Quick entries (complexity: low or type: debug/tool) require: Problem, Solution.
 
+Results of --all and --changed are cached in .kf_cache/validate.json by
+content hash and ruleset (a digest of the rules below and RULESET_VERSION),
+so only entries whose content changed since they were last validated are
+checked again; an entry whose stat key is unchanged is not even read.
+Editing the valid types, domains or the rules themselves invalidates the
+cache.
+
+--changed validates only entries that git reports as modified, added or
+untracked relative to HEAD (or to a given ref), for pre-commit hooks.
+
+--format json prints one document with every file's errors and timing plus
+the summary; --format jsonl prints a line per file as soon as it is
+validated, in file order, then a {"summary": ...} line. The summary only
+counts results, so it is identical for any --jobs value or cache state.
+
 Usage:
-    python validate.py <file>         # validate a single file
-    python validate.py --all          # validate all entries in entries/
+    python validate.py <file>           # validate a single file
+    python validate.py --all            # validate all entries in entries/
+    python validate.py --all --jobs 8   # ... on 8 worker processes
+    python validate.py --changed        # entries changed since HEAD
+    python validate.py --changed main   # entries changed since the ref main
+    python validate.py --all --format jsonl > report.jsonl
 """
 
-import os
-import re
+import argparse
+import hashlib
+import json
+import subprocess
 import sys
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from entry_cache import (
+    add_jobs_argument, atomic_write_text, cache_enabled, get_cache_dir, iter_entry_files, iter_map_files, stat_key,
+)
+from entry_parser import parse_entry, read_text, section_names
+from instrument import add_profile_argument, record_entries, span, start_profile, timed
+from telemetry import start_telemetry
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -23,112 +52,26 @@ from typing import Dict, List, Optional, Tuple
 VALID_TYPES = {"pattern", "decision", "domain", "integration", "debugging", "tool", "research"}
 VALID_DOMAINS = {"optical-networking", "software-engineering", "ml-ai", "devops", "research-methods", "general"}
 VALID_CONFIDENCE = {"low", "medium", "high"}
-REQUIRED_FRONTMATTER = {"title", "type", "tags", "domain", "created", "confidence"}
+# Ordered, so errors are reported in the same order on every run
+REQUIRED_FRONTMATTER = ("title", "type", "tags", "domain", "created", "confidence")
 
-STANDARD_REQUIRED_SECTIONS = {"Problem", "Approach", "Recipe"}
-QUICK_REQUIRED_SECTIONS = {"Problem", "Solution"}
+STANDARD_REQUIRED_SECTIONS = ("Problem", "Approach", "Recipe")
+QUICK_REQUIRED_SECTIONS = ("Problem", "Solution")
 QUICK_TYPES = {"debugging", "tool"}
 
+FORMATS = ("text", "json", "jsonl")
+
+RESULTS_FILE_NAME = "validate.json"
+# Bump when the checks in validate_parsed() change; the rule sets above are
+# part of the ruleset digest already
+RULESET_VERSION = 2
+
 
 def get_root() -> Path:
     """Return the knowledge_framework root directory relative to this script."""
     return Path(__file__).resolve().parent.parent
 
 
-# ---------------------------------------------------------------------------
-# YAML frontmatter parser (no pyyaml dependency)
-# ---------------------------------------------------------------------------
-
-def parse_frontmatter(text: str) -> Tuple[Optional[Dict], List[str]]:
-    """Parse YAML frontmatter between --- markers.
-
-    Returns (parsed_dict_or_None, list_of_parse_errors).
-    """
-    errors: List[str] = []
-    lines = text.split("\n")
-
-    # Find opening ---
-    if not lines or lines[0].strip() != "---":
-        return None, ["No YAML frontmatter found (file must start with ---)"]
-
-    end_idx = None
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            end_idx = i
-            break
-
-    if end_idx is None:
-        return None, ["YAML frontmatter not closed (missing closing ---)"]
-
-    fm_lines = lines[1:end_idx]
-    data: Dict = {}
-
-    for line in fm_lines:
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
-
-        # Handle key: value
-        match = re.match(r"^(\w[\w-]*)\s*:\s*(.*)", line)
-        if not match:
-            continue
-
-        key = match.group(1).strip()
-        raw_value = match.group(2).strip()
-
-        # Parse list values: [item1, item2, ...]
-        if raw_value.startswith("[") and raw_value.endswith("]"):
-            inner = raw_value[1:-1].strip()
-            if inner:
-                items = [item.strip().strip("'\"") for item in inner.split(",")]
-                data[key] = [item for item in items if item]
-            else:
-                data[key] = []
-        # Parse quoted strings
-        elif (raw_value.startswith('"') and raw_value.endswith('"')) or \
-             (raw_value.startswith("'") and raw_value.endswith("'")):
-            data[key] = raw_value[1:-1]
-        # Plain value
-        else:
-            # Handle inline comment: value  # comment
-            comment_match = re.match(r"^([^#]+?)(?:\s+#.*)?$", raw_value)
-            if comment_match:
-                data[key] = comment_match.group(1).strip()
-            else:
-                data[key] = raw_value
-
-    return data, errors
-
-
-# ---------------------------------------------------------------------------
-# Section parser
-# ---------------------------------------------------------------------------
-
-def parse_sections(text: str) -> set:
-    """Return the set of ## heading names found in the markdown body."""
-    sections = set()
-    # Skip frontmatter
-    lines = text.split("\n")
-    in_frontmatter = False
-    body_started = False
-    fm_count = 0
-
-    for line in lines:
-        if line.strip() == "---":
-            fm_count += 1
-            if fm_count == 2:
-                body_started = True
-            continue
-        if not body_started and fm_count < 2:
-            continue
-
-        match = re.match(r"^##\s+(.+)$", line)
-        if match:
-            sections.add(match.group(1).strip())
-
-    return sections
-
-
 # ---------------------------------------------------------------------------
 # Validation logic
 # ---------------------------------------------------------------------------
@@ -138,19 +81,26 @@ def validate_file(filepath: Path) -> Tuple[bool, List[str]]:
 
     Returns (passed: bool, errors: list[str]).
     """
-    errors: List[str] = []
-
     if not filepath.exists():
         return False, [f"File not found: {filepath}"]
 
     if not filepath.suffix == ".md":
         return False, [f"Not a markdown file: {filepath}"]
 
-    text = filepath.read_text(encoding="utf-8")
+    return validate_parsed(parse_entry(read_text(filepath)))
+
+
+@timed("validate")
+def validate_parsed(parsed: Dict) -> Tuple[bool, List[str]]:
+    """Validate an entry already parsed by entry_parser.parse_entry().
+
+    Returns (passed: bool, errors: list[str]).
+    """
+    errors: List[str] = []
 
     # --- Frontmatter validation ---
-    frontmatter, parse_errors = parse_frontmatter(text)
-    errors.extend(parse_errors)
+    frontmatter = parsed["frontmatter"]
+    errors.extend(parsed["errors"])
 
     if frontmatter is None:
         return False, errors
@@ -190,7 +140,7 @@ def validate_file(filepath: Path) -> Tuple[bool, List[str]]:
         errors.append("'tags' must be a list (e.g., [tag1, tag2])")
 
     # --- Section validation ---
-    sections = parse_sections(text)
+    sections = section_names(parsed)
 
     # Determine if this is a quick entry
     complexity = frontmatter.get("complexity", "")
@@ -210,58 +160,266 @@ def validate_file(filepath: Path) -> Tuple[bool, List[str]]:
     return passed, errors
 
 
+# ---------------------------------------------------------------------------
+# Result cache
+# ---------------------------------------------------------------------------
+
+def ruleset_digest() -> str:
+    """Return a digest of RULESET_VERSION and every rule set validation uses."""
+    rules = [RULESET_VERSION] + [sorted(rule) if isinstance(rule, set) else list(rule) for rule in (
+        VALID_TYPES, VALID_DOMAINS, VALID_CONFIDENCE, REQUIRED_FRONTMATTER,
+        STANDARD_REQUIRED_SECTIONS, QUICK_REQUIRED_SECTIONS, QUICK_TYPES,
+    )]
+    return hashlib.sha1(json.dumps(rules).encode("utf-8")).hexdigest()
+
+
+def load_results(root: Path, ruleset: str) -> Dict:
+    """Load the result cache for ruleset, or an empty one.
+
+    Layout: {"files": {rel_path: [stat_key, content hash]},
+             "results": {content hash: [passed, errors]}}.
+    """
+    try:
+        data = json.loads((get_cache_dir(root) / RESULTS_FILE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = None
+    if not isinstance(data, dict) or data.get("ruleset") != ruleset:
+        return {"files": {}, "results": {}}
+    return {"files": data.get("files", {}), "results": data.get("results", {})}
+
+
+def save_results(root: Path, ruleset: str, cache: Dict) -> None:
+    """Persist the result cache. Failures (read-only checkout) are ignored."""
+    data = {"ruleset": ruleset, "files": cache["files"], "results": cache["results"]}
+    try:
+        atomic_write_text(get_cache_dir(root) / RESULTS_FILE_NAME,
+                          json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+    except OSError:
+        pass
+
+
+def validate_item(
+    item: Tuple[Path, Optional[str]]
+) -> Tuple[Optional[List[int]], str, Optional[bool], List[str], float]:
+    """Read, hash and validate one (path, cached content hash) item (pool worker).
+
+    Returns (stat key, content hash, passed, errors, milliseconds). A file
+    whose hash equals the cached hash, which has a result for the current
+    ruleset, is not validated: passed is None and errors empty. The stat
+    key is taken before reading, so a file modified meanwhile is simply read
+    again next time.
+    """
+    filepath, cached_digest = item
+    start = time.perf_counter()
+    key = stat_key(filepath.stat())
+    text = read_text(filepath)
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    if digest == cached_digest:
+        passed, errors = None, []
+    else:
+        passed, errors = validate_parsed(parse_entry(text))
+    elapsed = (time.perf_counter() - start) * 1000
+    return key, digest, passed, errors, elapsed
+
+
+def iter_validate_files(
+    root: Path, files: List[Path], jobs: Optional[int] = None, prune: bool = False
+) -> Iterator[Dict]:
+    """Validate files under root, yielding one result per file in order.
+
+    A file whose stat key matches the cache is answered without reading it;
+    any other file is read and hashed on the worker pool, and validated only
+    if its content hash differs from the one cached for its path (as after
+    a fresh checkout, which changes every stat key but no content). Only
+    that one hash is sent to the worker; a file whose content moved from
+    another path is validated again, then answered from the cache. With
+    prune (for --all), cache entries of paths not in files are dropped so
+    deleted and renamed entries do not accumulate. Results are yielded
+    as soon as they and all earlier ones are known, as
+    {"path", "passed", "errors", "ms", "cached"} ("ms" is the worker's read
+    and validation time, 0 for files answered from their stat key). The
+    cache is saved once the last result has been consumed.
+    """
+    use_cache = cache_enabled()
+    ruleset = ruleset_digest()
+    cache = load_results(root, ruleset) if use_cache else {"files": {}, "results": {}}
+    known, results = cache["files"], cache["results"]
+
+    hits: List[Optional[List]] = []
+    misses: List[Tuple[Path, Optional[str]]] = []
+    with span("scan"):
+        for filepath in files:
+            entry = known.get(filepath.relative_to(root).as_posix())
+            result = None
+            if entry is not None and entry[1] in results:
+                try:
+                    if stat_key(filepath.stat()) == entry[0]:
+                        result = results[entry[1]]
+                except OSError:
+                    pass
+                if result is None:
+                    misses.append((filepath, entry[1]))
+            else:
+                misses.append((filepath, None))
+            hits.append(result)
+    record_entries(len(files))
+
+    pruned = False
+    if prune:
+        live_paths = {filepath.relative_to(root).as_posix() for filepath in files}
+        stale = [rel_path for rel_path in known if rel_path not in live_paths]
+        for rel_path in stale:
+            del known[rel_path]
+        pruned = bool(stale)
+
+    # Workers hash the misses and validate those whose content is not cached
+    computed = iter_map_files(validate_item, misses, jobs)
+    for filepath, result in zip(files, hits):
+        rel_path = filepath.relative_to(root).as_posix()
+        if result is not None:
+            yield {"path": rel_path, "passed": result[0], "errors": result[1], "ms": 0.0, "cached": True}
+            continue
+        with span("validate"):
+            key, digest, passed, errors, elapsed = next(computed)
+        # Always set when the worker skipped validation (passed is None)
+        cached = results.get(digest)
+        if cached is not None:
+            passed, errors = cached[0], cached[1]
+        results[digest] = [passed, errors]
+        known[rel_path] = [key, digest]
+        yield {"path": rel_path, "passed": passed, "errors": errors, "ms": round(elapsed, 3),
+               "cached": cached is not None}
+
+    if use_cache and (misses or pruned):
+        live = {entry[1] for entry in known.values()}
+        cache["results"] = {digest: result for digest, result in results.items() if digest in live}
+        save_results(root, ruleset, cache)
+
+
+def changed_files(root: Path, ref: str) -> List[Path]:
+    """Return entries changed relative to ref: modified, staged, added or untracked.
+
+    Raises subprocess.CalledProcessError (or OSError without git).
+    """
+    def git(*args: str) -> List[str]:
+        out = subprocess.run(["git", "-C", str(root), *args], check=True, capture_output=True, text=True).stdout
+        return [line for line in out.splitlines() if line]
+
+    with span("git"):
+        names = set(git("diff", "--name-only", "--relative", "--diff-filter=d", ref, "--", "entries"))
+        names.update(git("ls-files", "--others", "--exclude-standard", "--", "entries"))
+    return sorted(root / name for name in names if name.endswith(".md") and (root / name).is_file())
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+@timed("render")
+def report(results: Iterator[Dict], fmt: str) -> int:
+    """Print results as they arrive, then the summary; return the exit code.
+
+    The summary (passed, failed and total counts) depends only on the files
+    validated, never on timings, worker count or the cache.
+    """
+    summary = {"passed": 0, "failed": 0, "total": 0}
+    collected: List[Dict] = []
+    for result in results:
+        summary["passed" if result["passed"] else "failed"] += 1
+        summary["total"] += 1
+        if fmt == "jsonl":
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+        elif fmt == "json":
+            collected.append(result)
+        elif result["passed"]:
+            print(f"  PASS  {result['path']}", flush=True)
+        else:
+            print(f"  FAIL  {result['path']}")
+            for err in result["errors"]:
+                print(f"        - {err}")
+            sys.stdout.flush()
+
+    if fmt == "jsonl":
+        print(json.dumps({"summary": summary}))
+    elif fmt == "json":
+        print(json.dumps({"files": collected, "summary": summary}, ensure_ascii=False, indent=2))
+    else:
+        print(f"\nResults: {summary['passed']} passed, {summary['failed']} failed, {summary['total']} total")
+    return 1 if summary["failed"] > 0 else 0
+
+
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
 
 def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Validate knowledge entries against the knowledge framework schema.",
+    )
+    parser.add_argument("file", nargs="?", help="Entry file to validate")
+    parser.add_argument("--all", action="store_true", help="Validate all entries in entries/")
+    parser.add_argument("--changed", nargs="?", const="HEAD", metavar="REF",
+                        help="Validate entries changed relative to REF (default: HEAD), untracked ones included")
+    parser.add_argument("--format", choices=FORMATS, default="text",
+                        help="Output format: text (default), json (one document) or jsonl (a line per file, "
+                             "written as results arrive, then a summary line)")
+    add_jobs_argument(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profile(args)
+
     root = get_root()
+    start_telemetry(root, "validate")
 
-    if len(sys.argv) < 2:
-        print("Usage: python validate.py <file> | --all")
+    if not args.all and args.changed is None and args.file is None:
+        print("Usage: python validate.py <file> | --all | --changed [REF]")
         return 1
 
-    if sys.argv[1] == "--all":
+    if args.all or args.changed is not None:
         entries_dir = root / "entries"
         if not entries_dir.is_dir():
             print(f"ERROR: entries directory not found at {entries_dir}")
             return 1
 
-        files = sorted(entries_dir.rglob("*.md"))
-        if not files:
-            print("No .md files found in entries/")
-            return 0
-
-        total_pass = 0
-        total_fail = 0
-
-        for f in files:
-            passed, errors = validate_file(f)
-            rel = f.relative_to(root)
-            if passed:
-                print(f"  PASS  {rel}")
-                total_pass += 1
-            else:
-                print(f"  FAIL  {rel}")
-                for err in errors:
-                    print(f"        - {err}")
-                total_fail += 1
+        if args.changed is not None:
+            try:
+                files = changed_files(root, args.changed)
+            except (OSError, subprocess.CalledProcessError) as e:
+                detail = getattr(e, "stderr", None) or str(e)
+                print(f"ERROR: could not list changed entries: {detail.strip()}")
+                return 1
+            if not files and args.format == "text":
+                print(f"No entries changed relative to {args.changed}")
+                return 0
+        else:
+            files = iter_entry_files(entries_dir)
+            if not files and args.format == "text":
+                print("No .md files found in entries/")
+                return 0
 
-        print(f"\nResults: {total_pass} passed, {total_fail} failed, {total_pass + total_fail} total")
-        return 1 if total_fail > 0 else 0
+        # Only a full listing may drop cache entries of paths it did not see
+        prune = args.all and args.changed is None
+        return report(iter_validate_files(root, files, args.jobs, prune=prune), args.format)
 
     else:
-        filepath = Path(sys.argv[1])
+        filepath = Path(args.file)
         if not filepath.is_absolute():
             filepath = Path.cwd() / filepath
 
+        start = time.perf_counter()
         passed, errors = validate_file(filepath)
+        elapsed = (time.perf_counter() - start) * 1000
         rel = filepath.name
         try:
             rel = filepath.relative_to(root)
         except ValueError:
             pass
 
+        if args.format != "text":
+            result = {"path": Path(rel).as_posix(), "passed": passed, "errors": errors,
+                      "ms": round(elapsed, 3), "cached": False}
+            return report(iter([result]), args.format)
+
         if passed:
             print(f"PASS  {rel}")
             return 0
@@ -86,7 +86,8 @@ log "Found $ACTIVE_PROJECTS active projects"
 # --- Step 3: Check existing entries ---
 EXISTING_ENTRIES=""
 if [ -f "$KB_DIR/index.md" ]; then
-  EXISTING_ENTRIES=$(cat "$KB_DIR/index.md")
+  # Every entry is listed once across the domain shards
+  EXISTING_ENTRIES=$(cat "$KB_DIR/index.md" "$KB_DIR"/index/domain/*.md 2>/dev/null)
 fi
 
 EXISTING_DRAFTS=""